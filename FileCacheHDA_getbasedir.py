@@ -1,4 +1,4 @@
-import os
+import jupiter_cachepaths
 node = kwargs['node']
 # from A:/Projects/3d/Maya_projects/Tiktok_mini/03_Workflow/Shots/shot2-a-2-8/Scenefiles/fx/Effects/geo/untitled.filecache2/v1/untitled.filecache2_v1.0001.bgeo.sc
 # A:/Projects/3d/Houdini_essential/vellum_meat/03_Workflow/Shots/a-rnd/Scenefiles/fx/Effects/shot_a-rnd_fx_Effects_v0001__lch_.hip
@@ -6,32 +6,15 @@ node = kwargs['node']
 # A:/Projects/3d/Houdini_essential/vellum_meat/88_Cache/Shots/a-rnd/Scenefiles/fx/Effects
 # A:/Projects/3d/Houdini_essential/vellum_meat/88_Cache/Shots/a-rnd/fx/Effects
 # A:/Projects/3d/Houdini_essential/vellum_meat/88_Cache/Shots/a-rnd/S
-job = hou.getenv('JOB')
-cachedir = hou.getenv('CacheDir')
-file = hou.hipFile.path()
-filename = hou.hipFile.basename()
-
-if cachedir == None:
+if hou.getenv('CacheDir') == None:
     sceneroot = hou.node('/obj/')
     sceneroot.createNode('jupiter_setup', run_init_scripts=True)
-    job = hou.getenv('JOB')
-    cachedir = hou.getenv('CacheDir')
-
-# make the path
-t = file.lstrip(job).split('/')[0]
-basedir = file.lstrip(job+'/').replace(t,cachedir).rstrip(filename)
 
-if 'Scenefiles' in file.split('/'):
-    basedir = basedir.replace('/Scenefiles', '')
+# make the path, parsed once per hip path and template, shared by every filecache node
+basedir = jupiter_cachepaths.basedir_for_hip(hou.hipFile.path(), hou.getenv('JOB'), hou.getenv('CacheDir'))
 
-# remove tail
-if basedir.endswith('/'): 
-    basedir = basedir.rstrip('/')
-
-# text path exists
-if not os.path.exists(basedir):
-    os.makedirs(basedir)
-    hou.ui.displayMessage(f"{basedir}\nJust been Created")
+# folder is created before the first write or openPath, not for every new node
+jupiter_cachepaths.defer_makedirs(basedir)
 
 # set 3 directory parameter
 node.parm('basedir').set(basedir)
@@ -46,5 +29,8 @@ framestring_orig = r"`ifs (ch('timedependent'), '.' + fpadzero(4, if(ch('substep
 total = total.replace(framestring, framestring_orig)
 node.parm('file').set(total)
 
+# unlink deduplicated frames before Save to Disk writes into a version
+node.hdaModule().installWriteHooks(node)
+
 # to A:/Projects/3d/Maya_projects/Tiktok_mini/08_Cache/Shots/shot2-a-2-8/fx/Effects/CACHENAME/v3/CHACHENAME_V3.0001.bgeo.sc
 # to A:/Projects/3d/Maya_projects/Tiktok_mini/07_Cache/Shots/shot2-a-2-8/fx/Effects/Cache_geo1filecacheprism2/v1/Cache_geo1filecacheprism2_v1.0001.bgeo.sc
\ No newline at end of file
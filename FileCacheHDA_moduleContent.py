@@ -111,25 +111,160 @@ def enableLoadFromDisk(node):
         
 def saveToDisk(kwargs):
 
+    import jupiter_cachedag
+
     node = kwargs['node']     
              
     hardenBaseName(node)
     enableLoadFromDisk(node)
     node.node('read_back').parm('reload').pressButton()
     node.setColor(hou.Color((0.435, 0.921, 0.360)))
+    jupiter_cachedag.store_fingerprint(node)
+    writeManifest(node)
     
+def prepareWrite(node):
+
+    import jupiter_cachededup
+    import jupiter_cachepaths
+
+    # folders collected at node creation, and frames hardlinked to other versions by dedup get their own copy
+    # so the cook writes new files instead of writing through the links into every other version
+    jupiter_cachepaths.make_pending_dirs()
+    if node.evalParm('filemethod') == 0:
+        jupiter_cachededup.unshare_version(node.evalParm('cachedir'))
+
+def installWriteHooks(node):
+
+    # prepareWrite before every render of the ROPs inside the node, Save to Disk writes frames in place
+    # called from OnCreated and OnLoaded, render event callbacks are not saved with the hip file
+    # only in the session of the artist: queue, split and PDG workers are prepared once by the process starting them
+    if not hou.isUIAvailable():
+        return
+
+    def jupiterPreRender(rop, event_type, time):
+        if event_type == hou.ropRenderEventType.PreRender:
+            prepareWrite(node)
+
+    for rop in node.allSubChildren():
+        if isinstance(rop, hou.RopNode):
+            for callback in rop.renderEventCallbacks():
+                if getattr(callback, '__name__', '') == 'jupiterPreRender':
+                    rop.removeRenderEventCallback(callback)
+            rop.addRenderEventCallback(jupiterPreRender)
+
 def saveToDiskInBackground(kwargs):
 
     import nodegraphtopui
+    import jupiter_cachedag
+    import jupiter_cachequeue
     
     node = kwargs['node']  
         
+    prepareWrite(node)
+    def written():
+        jupiter_cachedag.store_fingerprint(node)
+        writeManifest(node)
+
+    jupiter_cachequeue.when_cooked(node, written)
     nodegraphtopui.dirtyAll(kwargs['node'].parm('targettopnetwork').evalAsNode(), False)
     nodegraphtopui.cookOutputNode(kwargs['node'].parm('targettopnetwork').evalAsNode())
     
     hardenBaseName(node)
     enableLoadFromDisk(node)
-    
+
+def writeManifest(node):
+
+    import jupiter_cacheinventory
+    from jupiter_cachenode import CacheNodeInfo
+
+    # frame range, sizes and writer of the version next to its folder, the cleaner reads it instead of the frames
+    if node.evalParm('filemethod') == 0:
+        jupiter_cacheinventory.write_manifest(CacheNodeInfo.from_node(node, hou.hipFile.path()))
+
+def saveToDiskInQueue(kwargs):
+
+    import jupiter_cachequeue
+
+    node = kwargs['node']
+
+    # this node plus every other selected filecache, harden/load from disk is done per node by the queue
+    nodes = [node] + [n for n in hou.selectedNodes() if n != node]
+    jupiter_cachequeue.enqueue_selected(nodes)
+
+def cacheDirtyUpstream(kwargs):
+
+    import jupiter_cachedag
+
+    # this node and every filecache upstream of it, only the ones missing on disk or out of date
+    jupiter_cachedag.cache_dirty([kwargs['node']])
+
+def saveToDiskSplit(kwargs):
+
+    import jupiter_cachesplit
+
+    # frames written by several hython processes, refused for anything with a solver upstream
+    node = kwargs['node']
+    procs = node.evalParm('splitprocs') if node.parm('splitprocs') else jupiter_cachesplit.default_procs()
+    jupiter_cachesplit.split_write(node, procs)
+
+def togglePrefetch(kwargs):
+
+    import jupiter_cacheprefetch
+    from jupiter_cacheinventory import format_size
+
+    node = kwargs['node']
+
+    # read the next frames of read_back ahead of playback, turning it off shows how often it was in time
+    prefetcher = jupiter_cacheprefetch.disable(node)
+    if prefetcher is None:
+        jupiter_cacheprefetch.enable(node)
+        return
+    st = prefetcher.stats()
+    hou.ui.displayMessage(f"Prefetched {format_size(st['bytes'])}\n"
+                          f"hits {st['hits']}, late {st['late']}, misses {st['misses']} "
+                          f"({st['hit_rate'] * 100:.0f}% in time)")
+
+def readPath(node):
+
+    # read_back file: python expression hou.pwd().parent().hdaModule().readPath(hou.pwd().parent())
+    # evaluated on read_back, hou.phm() there would be the module of the file SOP, not of this HDA
+    path = node.evalParm('file') if node.evalParm('filemethod') else node.evalParm('sopoutput')
+    if node.userData('jupiter_mirror') != '1':
+        return path
+
+    import jupiter_cachemirror
+    return jupiter_cachemirror.mirror_store().resolve(path)
+
+def toggleMirror(kwargs):
+
+    import jupiter_cachemirror
+
+    node = kwargs['node']
+
+    # opt in: versions read by this node are copied to local scratch and read from there when complete
+    enabled = node.userData('jupiter_mirror') != '1'
+    node.setUserData('jupiter_mirror', '1' if enabled else '0')
+    node.node('read_back').parm('reload').pressButton()
+    hou.ui.setStatusMessage(f"Local mirror {'on' if enabled else 'off'}: "
+                            f"{jupiter_cachemirror.mirror_store().summary()}")
+
+def dedupVersions(kwargs):
+
+    import os
+    import threading
+    import hdefereval
+    import jupiter_cachededup
+
+    node = kwargs['node']
+    root = os.path.dirname(node.evalParm('cachedir'))
+
+    # hardlink frames identical across versions of this cache, hashing runs in the background
+    def run():
+        report = jupiter_cachededup.dedup_cache_root(root)
+        hdefereval.executeDeferred(lambda: hou.ui.displayMessage(report.summary(), title="Dedup " + root))
+
+    threading.Thread(target=run, daemon=True).start()
+
 def getOpenCommand(filepath):
 
     import platform
@@ -146,8 +281,10 @@ def getOpenCommand(filepath):
     
 def openPath(kwargs):
     import os
+    import jupiter_cachepaths
     
     node = kwargs['node']     
+    jupiter_cachepaths.make_pending_dirs()
     
     dir = node.evalParm("basedir") 
     if node.evalParm("filemethod"):
@@ -163,13 +300,52 @@ def openPath(kwargs):
         os.makedirs(dir)
         hou.ui.displayMessage(f"{dir}\nJust been Created")
         hou.ui.showInFileBrowser(dir)
+
+def versionListing(node, summaries=False, deep=False):
+    import os
+    import jupiter_cacheversions
+
+    # version names next to the current one, listed again only when the cache folder changed
+    # summaries (size, range) for the menu come from the $CacheDir index, only new or changed versions are walked
+    root = os.path.dirname(node.evalParm('cachedir'))
+    filetype = ['.bgeo.sc', '.vdb'][node.evalParm('filetype')]
+    return jupiter_cacheversions.version_listing(root, filetype, hou.getenv('CacheDir'), summaries, deep)
+
 def verBump(kwargs, operation='add'):  
     node = kwargs['node']          
         
-    if 'add' in operation:
+    if 'next' in operation:
+        node.parm("ver").set(versionListing(node).next_free())
+    elif 'latest' in operation:
+        node.parm("ver").set(max(versionListing(node).latest, 1))
+    elif 'add' in operation:
         node.parm("ver").set(node.evalParm("ver") + 1)
     else:
         node.parm("ver").set(max(node.evalParm("ver") - 1,1))
+
+def jumpToVersion(kwargs, number=None):
+    node = kwargs['node']
+
+    if number is None:
+        number = hou.ui.readInput("Jump to version", buttons=("OK", "Cancel"),
+                                  initial_contents=str(node.evalParm("ver")))
+        if number[0] != 0 or not number[1].strip().isdigit():
+            return
+        number = number[1]
+    node.parm("ver").set(max(int(number), 1))
+
+def versionMenu(kwargs):
+    node = kwargs['node']
+
+    # menu script of the version dropdown: every version on disk with size and frame range
+    menu = []
+    for number, label in versionListing(node, summaries=True, deep=True).menu_items():
+        menu += [str(number), label]
+    return menu
+
+def versionMenuSelect(kwargs):
+    jumpToVersion(kwargs, kwargs['script_value'])
+    kwargs['parm'].set(0)
         
 def subverBump(kwargs, operation='add'):
     node = kwargs['node']
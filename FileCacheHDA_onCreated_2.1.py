@@ -1,32 +1,30 @@
-import os
 import hou
+import jupiter_cachepaths
 node = kwargs['node']
 
 if hou.getenv('CacheDir') == None or hou.getenv("PRISM_STEP") == None:
     sceneroot = hou.node('/obj/')
     sceneroot.createNode('jupiter_set_job', run_init_scripts=True)
 
-job = hou.getenv('JOB')
 cachedir = hou.getenv('CacheDir')
 prismstep = hou.getenv("PRISM_STEP")
 prismcat = hou.getenv("PRISM_CATEGORY")
 prismseq = hou.getenv("PRISM_SEQUENCE")
 prismshot = hou.getenv("PRISM_SHOT")
 
-# make the path
-try:
-    basedir = cachedir +'/Shots/'+ prismseq +'-'+ prismshot +'/'+ prismstep +'/'+ prismcat
-    # test path exists
-    if not os.path.exists(basedir):
-        os.makedirs(basedir)
-        hou.ui.displayMessage(f"{basedir}\nJust been Created")
+# make the path, resolved once per set of Prism variables and shared by every filecache node
+basedir = jupiter_cachepaths.prism_basedir(cachedir, prismseq, prismshot, prismstep, prismcat)
+if basedir is not None:
+    # folder is created before the first write or openPath, not for every new node
+    jupiter_cachepaths.defer_makedirs(basedir)
     # set 3 directory parameter
     node.parm('basedir').set(basedir)
-except TypeError:
-    hou.ui.displayMessage(f"Please Put This File in Prism Workflow")
-    basedir = cachedir + '/Shots'
+else:
     node.parm('basedir').set(r'$CacheDir/Shots')
 
 parent = kwargs['node'].parent()
 nodeself = kwargs['node'].name()
-node.parm('basename').set('Cache'+f'_{parent}'+f'_{nodeself}')
\ No newline at end of file
+node.parm('basename').set('Cache'+f'_{parent}'+f'_{nodeself}')
+
+# unlink deduplicated frames before Save to Disk writes into a version
+node.hdaModule().installWriteHooks(node)
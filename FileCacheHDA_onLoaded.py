@@ -0,0 +1,4 @@
+node = kwargs['node']
+
+# render event callbacks are not saved with the hip file, add the pre-render hook again
+node.hdaModule().installWriteHooks(node)
@@ -6,13 +6,54 @@ Author:         ati
 Date Created:   June 17, 2021 - 10:48:09
 """
 
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import hou
+import hdefereval
 import viewerstate.utils as su
 import resourceutils as ru
 import toolutils
+from hutil.Qt import QtCore
+
+from jupiter_cacheinventory import format_size, inventory_path
 
 cachedir = "cachedir"
 cachename = "cachename"
+cachesize = "cachesize"
+cacheframes = "cacheframes"
+cachemissing = "cachemissing"
+cachewritten = "cachewritten"
+
+_path_parms = ("filemethod", "timedependent", "basename", "filetype", "basedir", "enableversion",
+               "version", "enablesubversion", "subversion", "sopoutput", "file", "substeps",
+               "ver", "subver", "cachedir", "cachename", "framestr")
+_debounce_ms = 100          # parm changes reach the HUD at most 10 times a second
+_stats_pool = ThreadPoolExecutor(max_workers=1)
+_stats_cache = {}           # cache folder -> (folder mtime, hud rows), shared by every filecache node
+
+
+def _readStats(directory, filetype):
+    """Runs in _stats_pool, never on the UI thread."""
+    try:
+        mtime = os.stat(directory).st_mtime
+    except OSError:
+        return {cachesize: "not cached", cacheframes: "-", cachemissing: "-", cachewritten: "-"}
+    cached = _stats_cache.get(directory)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    v = inventory_path(directory, filetype)
+    if v is None:
+        return {cachesize: "not cached", cacheframes: "-", cachemissing: "-", cachewritten: "-"}
+    rows = {
+        cachesize: format_size(v.total_bytes),
+        cacheframes: f"{v.frame_count} ({v.startfr}-{v.endfr})" if not v.mark_singleframe else "single frame",
+        cachemissing: str(v.missing_frames + v.bad_files),
+        cachewritten: time.strftime("%Y-%m-%d %H:%M", time.localtime(v.mtime)),
+    }
+    _stats_cache[directory] = (mtime, rows)
+    return rows
 
 class State(object):
     def __init__(self, state_name, scene_viewer):
@@ -24,10 +65,20 @@ class State(object):
             "rows": [
                 {"id": cachedir, "label": "Cache Folder"},      
                 {"id": cachename, "label": "Cache Name"},                        
+                {"id": cachesize, "label": "Size on Disk"},
+                {"id": cacheframes, "label": "Frames"},
+                {"id": cachemissing, "label": "Missing / Bad"},
+                {"id": cachewritten, "label": "Last Write"},
             ]
         }
         
         self.scene_viewer.hudInfo(hud_template=template)
+
+        self.pending_node = None
+        self.stats_dir = None
+        self.timer = QtCore.QTimer()
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self._flushParmInfo)
            
     def updateInfoBox(self, node):
         """ Updates our info box to reflect the current state settings.
@@ -42,34 +93,54 @@ class State(object):
         
         node = kwargs["node"]
         parmtup = kwargs["parm_tuple"]
-        name = parmtup.name()        
         
-        rows = {}
-        if name in ("filemethod",
-                    "timedependent",
-                    "basename",
-                    "filetype",                    
-                    "basedir",
-                    "enableversion",
-                    "version",
-                    "enablesubversion",
-                    "subversion",
-                    "sopoutput"):
-            self._fillCacheInfo(node,rows)
-            self.scene_viewer.hudInfo(hud_values=rows)
+        # fires for every step of a drag or scrub, only remember the node and refresh once the timer runs out
+        if parmtup is not None and parmtup.name() in _path_parms:
+            self.pending_node = node
+            if not self.timer.isActive():
+                self.timer.start(_debounce_ms)
 
-    def _fillCacheInfo(self, node, rows):
-        """Updates cache path related parms"""
-        
+    def _flushParmInfo(self):
+        node, self.pending_node = self.pending_node, None
+        try:
+            node.path()
+        except (AttributeError, hou.ObjectWasDeleted):
+            return
+        self.updateInfoBox(node)
+
+    def _resolvePath(self, node):
+        """Cache folder, name and file type. Evaluated every time, the paths depend on $JOB, $CacheDir
+        and the frame too, the debounce keeps this to 10 times a second."""
+        filetype = [".bgeo.sc", ".vdb"][node.evalParm("filetype")]
         if node.evalParm("filemethod"):
-            import os
-            rows[cachedir], rows[cachename] = os.path.split(node.evalParm("file"))             
+            folder, name = os.path.split(node.evalParm("file"))
         else:      
-            rows[cachedir] = node.evalParm("cachedir") 
-            rows[cachename] = node.evalParm("cachename")     
+            folder = node.evalParm("cachedir") 
+            name = node.evalParm("cachename")     
             
             if node.evalParm("timedependent"):
-                rows[cachename] = rows[cachename].replace(node.evalParm("framestr"), ".$F4")    
+                name = name.replace(node.evalParm("framestr"), ".$F4")    
+        return folder, name, filetype
+
+    def _fillCacheInfo(self, node, rows):
+        """Updates cache path related parms"""
+        
+        rows[cachedir], rows[cachename], filetype = self._resolvePath(node)
+        # last known stats right away, fresh ones are read off the UI thread
+        rows.update(_stats_cache.get(rows[cachedir], (0, {cachesize: "...", cacheframes: "...",
+                                                          cachemissing: "...", cachewritten: "..."}))[1])
+        self._requestStats(rows[cachedir], filetype)
+
+    def _requestStats(self, directory, filetype):
+        self.stats_dir = directory
+        future = _stats_pool.submit(_readStats, directory, filetype)
+        future.add_done_callback(lambda f: hdefereval.executeDeferred(lambda: self._showStats(directory, f)))
+
+    def _showStats(self, directory, future):
+        # a newer request replaced this one while it was running
+        if directory != self.stats_dir or future.exception() is not None:
+            return
+        self.scene_viewer.hudInfo(hud_values=future.result())
             
     def onEnter(self, kwargs):
         """ Initializes the info
@@ -89,6 +160,8 @@ class State(object):
         
         node = kwargs.get("node")
         
+        self.timer.stop()
+        self.stats_dir = None
         if node:
             node.removeEventCallback([hou.nodeEventType.ParmTupleChanged],
                                      self.updateParmInfo)
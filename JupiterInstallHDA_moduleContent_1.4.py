@@ -1,4 +1,9 @@
+import hashlib
+import importlib
 import os
+import shutil
+import sys
+import time
 import hou
 from PySide2 import QtCore, QtUiTools, QtWidgets
 
@@ -26,7 +31,7 @@ class InstallWindow(QtWidgets.QWidget):
         # A:/AppBase/Houdini/localLib/otls/object_Neilforest.dev.jupiter_install.1.0.hda
         self.hda_path = node.type().definition().libraryFilePath()
         self.hda_typename = node.type().name()
-        self.houdini_path = hou.getenv('HOUDINI_PATH')
+        self.houdini_path = hou.getenv('HOUDINI_PATH') or ''
         self.userpref_path = hou.getenv('HOUDINI_USER_PREF_DIR')
         self.userpackage_path = self.userpref_path + '/packages'
         if not os.path.exists(self.userpackage_path):
@@ -75,9 +80,12 @@ class InstallWindow(QtWidgets.QWidget):
                 hou.node('/obj/Jupiter_Updated').destroy()
                 node.setName('Jupiter_Updated')
             node.setColor(self.updated_node_color)
+            syncLibrary(self.lib_path)
 
         # Set UI details
         shelf_file = f'{self.lib_path}/toolbar/jupiter_tools_shelf.shelf'
+        if useIndex():
+            shelf_file = f'{self.userpref_path}/jupiter_index/toolbar/jupiter.shelf'
         hou.shelves.loadFile(shelf_file)
         hou.shelves.reloadShelfFiles()
         node.setUserData('nodeshape', 'star')
@@ -90,7 +98,8 @@ class InstallWindow(QtWidgets.QWidget):
         self.ui.line_libpath.setText(self.lib_path)
         self.ui.line_HDApath.setText(self.hda_path)
         # hou.ui.displayMessage('HDA_PATH Set to {}'.format(self.hda_path))
-        if self.lib_path in self.houdini_path:
+        # indexed packages keep the library off HOUDINI_PATH and set JUPITER_LIB instead
+        if self.lib_path in self.houdini_path or self.lib_path == hou.getenv('JUPITER_LIB'):
             if self.action == 'install':
                 hou.ui.displayMessage(
                     'Target Library Path Already Exists in HOUDINI_PATH')
@@ -120,11 +129,10 @@ class InstallWindow(QtWidgets.QWidget):
                 self.action = 'update'
             else:
                 self.action = 'install'
-            # Get the json template from the Extra Files section
-            f = node.type().definition().sections()['JSON_TEMPLATE'].contents()
-            f = f.replace('@___lib_path___@', self.lib_path)
+            f = packageContents(node, self.lib_path)
             with open(self.jsonfile_path, "w") as jsonfile:
                 jsonfile.write(f)
+            buildIndex(self.lib_path)
             # Set UI and Parameters
             self.ui.line_jsonfilepath.setText(self.jsonfile_path)
             node.parm('str_currentjson').set(self.jsonfile_path)
@@ -137,25 +145,135 @@ class InstallWindow(QtWidgets.QWidget):
         node.setColor(self.updated_node_color)
 
 
+def libModule(lib_path, name):
+    # Library modules are only on sys.path after a restart with the package installed
+    scripts = f'{lib_path}/scripts/python'
+    if os.path.isdir(scripts) and scripts not in sys.path:
+        sys.path.append(scripts)
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        return None
+
+
+def useIndex():
+    # opt in with JUPITER_LIB_INDEX=1: the library leaves HOUDINI_PATH, only HDAs, shelves and scripts are found
+    # viewer_states, icons, presets, OPcustomize and menus of the library are not, keep the default for those
+    return os.environ.get('JUPITER_LIB_INDEX', '0') == '1'
+
+
+def packageContents(node, lib_path):
+    libindex = libModule(lib_path, 'jupiter_libindex') if useIndex() else None
+    if libindex is not None:
+        return libindex.package_json(lib_path, hou.getenv('HOUDINI_USER_PREF_DIR'))
+    # Get the json template from the Extra Files section
+    f = node.type().definition().sections()['JSON_TEMPLATE'].contents()
+    return f.replace('@___lib_path___@', lib_path)
+
+
+def buildIndex(lib_path, force=True):
+    # OPlibraries, merged shelf and stamp in $HOUDINI_USER_PREF_DIR/jupiter_index, read at the next launch
+    libindex = libModule(lib_path, 'jupiter_libindex') if useIndex() else None
+    if libindex is None:
+        return False
+    userpref_path = hou.getenv('HOUDINI_USER_PREF_DIR')
+    if not force and not libindex.index_stale(lib_path, userpref_path):
+        return False
+    hdas, shelves = libindex.build_index(lib_path, userpref_path)
+    print(f'Jupiter Library index: {hdas} HDA files, {shelves} shelf files')
+    return True
+
+
+def syncLibrary(lib_path):
+    # Install, reload or uninstall only the HDA files that changed since the last sync
+    # A fresh install needs a restart anyway, the package json makes Houdini scan the whole library
+    jupiter_hdalibrary = libModule(lib_path, 'jupiter_hdalibrary')
+    if jupiter_hdalibrary is None:
+        return None
+    report = jupiter_hdalibrary.sync_library(lib_path)
+    if report.changes():
+        print(f'Jupiter Library sync: {report.summary()}')
+    return report
+
+
+def packageFingerprint(node):
+    # library path, HDA file mtime and the installed package json
+    # None when the package json is missing or not the one this HDA would write, indexed or not
+    hda_path = node.type().definition().libraryFilePath()
+    lib_path = hda_path.split('/otls/')[0]
+    jsonfile_path = hou.getenv('HOUDINI_USER_PREF_DIR') + '/packages/jupiter_localLib.json'
+    expected = packageContents(node, lib_path)
+    try:
+        with open(jsonfile_path, "r") as jsonfile:
+            installed = jsonfile.read()
+        hda_mtime = os.path.getmtime(hda_path)
+    except OSError:
+        return None
+    if installed != expected:
+        return None
+    h = hashlib.sha1()
+    h.update(f'{lib_path}|{hda_mtime}|'.encode())
+    h.update(installed.encode())
+    return h.hexdigest()
+
+
+def fingerprintFile():
+    # per user, not per hip: every scene opened on this machine shares the installed library
+    return hou.getenv('HOUDINI_USER_PREF_DIR') + '/jupiter_install.fingerprint'
+
+
+def storedFingerprint():
+    try:
+        with open(fingerprintFile(), "r") as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def storeFingerprint(node):
+    fingerprint = packageFingerprint(node)
+    if fingerprint:
+        with open(fingerprintFile(), "w") as f:
+            f.write(fingerprint)
+
+
+def updateParms(node):
+    lib_path = node.type().definition().libraryFilePath().split('/otls/')[0]
+    jsonfile_path = hou.getenv('HOUDINI_USER_PREF_DIR') + '/packages/jupiter_localLib.json'
+    if node.evalParm('str_currentjson') != jsonfile_path:
+        node.parm('str_currentjson').set(jsonfile_path)
+    if node.evalParm('str_currentlib') != lib_path:
+        node.parm('str_currentlib').set(lib_path)
+
+
 def onCreated(node):
     if "Jupiter_Installed" in hou.node('/obj/').children():
         oldernode = hou.node('/obj/Jupiter_Installed')
         oldernode.destroy()
     win = InstallWindow(node, 'install')
     win.show()
+    storeFingerprint(node)
 
 
 def onLoaded(node):
-    # TODO: DOING NOTHING JUST UPDATE PARAMETERS
-    # self.ui.label_title.setText('Jupiter Library Has Been Updated!')
-    # self.ui.label_restart.hide()
-    # self.ui.line_libpath.setText(self.lib_path)
-    # self.ui.line_HDApath.setText(self.hda_path)
-    # self.ui.line_jsonfilepath.setText(self.jsonfile_path)
-    # node.parm('str_currentjson').set(self.jsonfile_path)
-    # node.parm('str_currentlib').set(self.lib_path)
-    win = InstallWindow(node, 'update')
-    win.show()
+    # Fast path: same library, same HDA file and the package json already installed, only update parameters.
+    # The install window (ui loading, package json, shelves) only runs when one of them changed.
+    start = time.perf_counter()
+    fingerprint = packageFingerprint(node)
+    if fingerprint is not None and fingerprint == storedFingerprint():
+        updateParms(node)
+        # two stats on the library, the index is only rebuilt when otls/ or toolbar/ changed
+        lib_path = node.evalParm('str_currentlib')
+        buildIndex(lib_path, force=False)
+        # one stat per HDA file, reloads HDAs overwritten in place, those leave the folder mtime alone
+        syncLibrary(lib_path)
+        path = 'fast'
+    else:
+        win = InstallWindow(node, 'update')
+        win.show()
+        storeFingerprint(node)
+        path = 'full'
+    print(f'Jupiter Install onLoaded ({path} path): {(time.perf_counter() - start) * 1000:.1f} ms')
 
 
 def uninstall(node):
@@ -176,13 +294,23 @@ def uninstall(node):
         # Remove JSON
         if os.path.exists(jsonfile_path):
             os.remove(jsonfile_path)
-        # Remove All HDA from Scanned Library
-        otls_path = lib_path + '/otls'
-        for files in os.listdir(otls_path):
-            otl = os.path.join(otls_path, files)
-            if os.path.isfile(otl):
-                hou.hda.uninstallFile(
-                    otl, oplibraries_file='Scanned Asset Library Directories')
+        if os.path.exists(fingerprintFile()):
+            os.remove(fingerprintFile())
+        shutil.rmtree(userpref_path + '/jupiter_index', ignore_errors=True)
+        # Remove All HDA from Scanned Library, the indexed files in one batch
+        jupiter_hdalibrary = libModule(lib_path, 'jupiter_hdalibrary')
+        if jupiter_hdalibrary is not None:
+            failed = jupiter_hdalibrary.uninstall_library(lib_path)
+        else:
+            failed = []
+            otls_path = lib_path + '/otls'
+            for files in os.listdir(otls_path):
+                otl = os.path.join(otls_path, files)
+                if os.path.isfile(otl):
+                    hou.hda.uninstallFile(
+                        otl, oplibraries_file='Scanned Asset Library Directories')
+        for otl, error in failed:
+            print(f'Could not uninstall {otl}: {error}')
         # Remove Embedded HDA
         hou.hda.uninstallFile('Embedded')
         hou.ui.displayMessage('Successfully Uninstalled')
@@ -1,5 +1,7 @@
 import os
 import hou
+import jupiter_autosave
+import jupiter_projectconfig
 import PySide2
 
 
@@ -21,9 +23,7 @@ def onCreated(node):
         if os.path.exists(prismjob):
             job = prismjob
         else:
-            p = filepath.split('/')
-            workflow = list(filter(lambda a: 'Workflow' in a, p))[0]
-            job = filepath.split('/' + workflow)[0]
+            job = jupiter_projectconfig.job_from_hip(filepath)[0]
             # get 'A:\Projects\3d\Maya_projects\Tiktok_mini' in
             # A:\Projects\3d\Maya_projects\Tiktok_mini\03_Workflow\Shots\shot2-a-2-2\Scenefiles\fx\Effects\shot_shot2-a-2-2_fx_Effects_v0010__lch_.hip
     except Exception as e:
@@ -68,14 +68,22 @@ def onLoaded(node):
     node.setUserData('nodeshape', 'star')
 
     if node.parm('autosave_btn').eval():
-        hou.setPreference('autoSave', '1')
+        jupiter_autosave.start(autosave_budget(node))
+
+
+# percent of session time autosave may take, JUPITER_AUTOSAVE_BUDGET when the node has no budget parm
+def autosave_budget(node):
+    parm = node.parm('autosave_budget')
+    return parm.eval() if parm is not None else None
 
 
 def autoSave(node, *arg):
+    # Jupiter autosave instead of Houdini's, it waits for idle time and adapts its interval to the save cost
     if not node.parm('autosave_btn').eval():
+        jupiter_autosave.stop()
         hou.setPreference('autoSave', '0')
     else:
-        hou.setPreference('autoSave', '1')
+        jupiter_autosave.start(autosave_budget(node))
 
 
 def update_parm(node, *arg):
@@ -129,14 +137,9 @@ def reset_job(node):
 
 # update $CacheDir
 def update_cachedir(*arg):
+    # from the project config at the job root, the job folder is only listed the first time
     job = hou.getenv('JOB')
-    try:
-        d = os.listdir(job)
-        cachefolder = list(filter(lambda a: ('Cache' in a), d))[0]
-        cachedir = os.path.join(job, cachefolder)
-    except IndexError:
-        cachedir = os.path.join(job, "88_Cache")
-        os.makedirs(cachedir)
+    cachedir = jupiter_projectconfig.resolve_project(job)['cachedir']
     # set houdini env
     if os.path.exists(cachedir):
         hou.putenv("CacheDir", cachedir)
@@ -1,5 +1,6 @@
 import os
 import hou
+import jupiter_projectconfig
 import PySide2
 
 
@@ -19,9 +20,7 @@ def onCreated(node):
 
     ################################## SET $JOB DIR ######################################
     try:
-        p = filepath.split('/')
-        workflow = list(filter(lambda a: 'Workflow' in a, p))[0]
-        job = filepath.split('/' + workflow)[0]
+        job = jupiter_projectconfig.job_from_hip(filepath)[0]
         # get 'A:\Projects\3d\Maya_projects\Tiktok_mini' in 
         # A:\Projects\3d\Maya_projects\Tiktok_mini\03_Workflow\Shots\shot2-a-2-2\Scenefiles\fx\Effects\shot_shot2-a-2-2_fx_Effects_v0010__lch_.hip
     except Exception:
@@ -128,14 +127,9 @@ def reset_job(node):
 
 # update $CacheDir
 def update_cachedir(node, *arg):
+    # from the project config at the job root, the job folder is only listed the first time
     job = hou.getenv('JOB')
-    try:
-        d = os.listdir(job)
-        cachefolder = list(filter(lambda a: 'Cache' in a, d))[0]
-        cachedir = os.path.join(job,cachefolder)
-    except IndexError:
-        cachedir = str(job) + '/88_Cache'
-        os.makedirs(cachedir)
+    cachedir = jupiter_projectconfig.resolve_project(job)['cachedir']
     # set houdini env
     hou.putenv("CacheDir", cachedir)
     if cachedir == hou.getenv('CacheDir'):
@@ -0,0 +1,84 @@
+"""Scan speed of the cache cleaner hot path on synthetic trees.
+
+cd benchmarks && python -m pytest                   # 1k and 100k files
+JUPITER_BENCH_1M=1 python -m pytest                  # plus 1M files
+python -m pytest --benchmark-compare                  # against the last --benchmark-autosave run
+"""
+import os
+
+import pytest
+
+import fakehou
+from jupiter_cachediscovery import find_cache_nodes
+from jupiter_cacheindex import CacheIndex
+from jupiter_cacheinventory import folder_size, scan_cache_root, scan_version
+from jupiter_cachenode import CacheNodeInfo, node_status, tag_version
+
+sizes = pytest.mark.parametrize("files", [1000, 100000, 1000000])
+
+
+def cleaner_flow(index=None):
+	"""What SingleCacheNode does per node without the Qt side: parms, one walk, tags, node status."""
+	report = []
+	for node in find_cache_nodes():
+		n = CacheNodeInfo.from_node(node)
+		try:
+			inventory = scan_cache_root(n.main_folder, n.filetype, index)
+		except FileNotFoundError:
+			continue
+		tags = [tag_version(n, v) for v in inventory.versions if not v.mark_dirty]
+		report.append((n.path, inventory.total_bytes, node_status(tags)))
+	return report
+
+
+@pytest.fixture
+def scene(cache_tree):
+	def make(files):
+		root, nodes = cache_tree(files)
+		fakehou.clear()
+		for d in nodes:
+			fakehou.filecache_node(**d)
+		return root, nodes
+	return make
+
+
+@sizes
+def test_folder_size(benchmark, cache_tree, files):
+	root, _ = cache_tree(files)
+	total = benchmark(folder_size, root)
+	assert total > 0
+
+
+@sizes
+def test_version_scan(benchmark, cache_tree, files):
+	# VersionWidget only reads VersionInventory now, this is the walk and frame analysis behind it
+	root, nodes = cache_tree(files)
+	version_folder = nodes[0]["cachedir"]
+	parent = os.path.dirname(version_folder)
+	entry = next(e for e in os.scandir(parent) if e.path.replace('\\', '/') == version_folder)
+	v = benchmark(scan_version, entry, ".bgeo.sc")
+	assert v.frame_count and not v.mark_dirty
+
+
+@sizes
+def test_cleaner_flow(benchmark, scene, files):
+	scene(files)
+	report = benchmark(cleaner_flow)
+	assert report
+
+
+@sizes
+def test_cleaner_flow_indexed(benchmark, scene, tmp_path, files):
+	# reopening the cleaner on an unchanged tree, every version comes from the mtime index
+	scene(files)
+	index = CacheIndex(str(tmp_path / "index.json"))
+	cleaner_flow(index)
+	report = benchmark(cleaner_flow, index)
+	assert report
+
+
+@sizes
+def test_find_cache_nodes(benchmark, scene, files):
+	_, nodes = scene(files)
+	found = benchmark(find_cache_nodes)
+	assert len(found) == len(nodes)
@@ -0,0 +1,55 @@
+"""Frame sequence analysis of substep caches as FileCacheHDA names them, fpadzero(4, 3, $FF)."""
+import pytest
+
+from jupiter_framesequence import FrameSequence
+
+substeps = pytest.mark.parametrize("substeps", [1, 2, 3, 4, 5, 6, 7])
+
+
+def substep_names(substeps, frames=48, skip=()):
+	names = []
+	for i in range(frames * substeps):
+		if i in skip:
+			continue
+		frame = 1001 + i / substeps
+		whole, sub = divmod(round(frame * 1000), 1000)
+		if substeps == 1:
+			names.append(f"cache_v1.{whole:04d}.bgeo.sc")
+		else:
+			names.append(f"cache_v1.{whole:04d}.{sub:03d}.bgeo.sc")
+	return names
+
+
+def analyze(names):
+	seq = FrameSequence(".bgeo.sc")
+	for name in names:
+		seq.add(name, 1024)
+	return seq.analyze()
+
+
+@substeps
+def test_substep_step(substeps):
+	seq = analyze(substep_names(substeps))
+	assert seq.substep == substeps and seq.inc == 1
+	assert not seq.missing
+	assert len(seq.ranges) == 1
+
+
+@substeps
+def test_substep_gap(substeps):
+	seq = analyze(substep_names(substeps, skip=(10 * substeps,)))
+	assert seq.substep == substeps
+	assert len(seq.missing) == 1 and abs(seq.missing[0] - 1011) < 1e-3
+	assert len(seq.ranges) == 2
+
+
+def test_thirds_range_string():
+	seq = analyze(substep_names(3, frames=10))
+	assert seq.format_ranges() == "1001-1010.67"
+
+
+@pytest.mark.parametrize("files", [1000, 100000])
+def test_analyze(benchmark, files):
+	names = substep_names(4, frames=files // 4)
+	seq = benchmark(analyze, names)
+	assert seq.substep == 4 and not seq.missing
@@ -0,0 +1,24 @@
+"""Playbar callback bookkeeping of jupiter_cacheprefetch, with the fake hou from conftest."""
+import hou
+
+import fakehou
+import jupiter_cacheprefetch
+
+
+def test_enable_keeps_callback():
+	fakehou.clear()
+	a = fakehou.filecache_node("/obj/geo1/filecache1", "/tmp/cache/a/v1", "v1")
+	b = fakehou.filecache_node("/obj/geo1/filecache2", "/tmp/cache/b/v1", "v1")
+	jupiter_cacheprefetch.enable(a, window=4)
+	assert hou.playbar.eventCallbacks() == (jupiter_cacheprefetch._on_playbar,)
+	# enabling again or a second node does not register it twice
+	jupiter_cacheprefetch.enable(a, window=4)
+	jupiter_cacheprefetch.enable(b, window=4)
+	assert hou.playbar.eventCallbacks() == (jupiter_cacheprefetch._on_playbar,)
+	assert jupiter_cacheprefetch.disable(a) is not None
+	assert hou.playbar.eventCallbacks() == (jupiter_cacheprefetch._on_playbar,)
+	# disabling a node that is not prefetching leaves the others alone
+	assert jupiter_cacheprefetch.disable(a) is None
+	assert hou.playbar.eventCallbacks() == (jupiter_cacheprefetch._on_playbar,)
+	jupiter_cacheprefetch.disable(b)
+	assert hou.playbar.eventCallbacks() == ()
@@ -0,0 +1,115 @@
+"""Houdini launch time with the Jupiter library on HOUDINI_PATH against the jupiter_libindex package.
+
+A synthetic library (copies of one HDA, shelf files and scripts) is written under JUPITER_BENCH_DIR or a temp folder,
+put it on the file server to see the cost of the directory scans. The launch benchmarks need hython on PATH
+(or JUPITER_BENCH_HYTHON) and copy JUPITER_BENCH_HDA, the first HDA in $HFS/houdini/otls otherwise.
+Packages in the user pref dir are loaded as well, uninstall the Jupiter package before comparing.
+
+cd benchmarks && python -m pytest bench_startup.py
+"""
+import json
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from jupiter_libindex import build_index, package_json
+
+sizes = pytest.mark.parametrize("files", [100, 1000])
+modes = pytest.mark.parametrize("mode", ["hpath", "index"])
+# loads every HDA definition and every shelf tool, what a UI session does at startup
+launch_script = ("import hou; hou.shelves.tools(); "
+				 "print(sum('jupiter_bench_' in f for f in hou.hda.loadedFiles()))")
+shelf_template = """<?xml version="1.0" encoding="UTF-8"?>
+<shelfDocument>
+  <tool name="jupiter_bench_{i}" label="Bench {i}" icon="MISC_python">
+    <script scriptType="python"><![CDATA[print({i})]]></script>
+  </tool>
+</shelfDocument>
+"""
+
+
+def find_hython():
+	return os.environ.get("JUPITER_BENCH_HYTHON") or shutil.which("hython")
+
+
+def find_hda():
+	hda = os.environ.get("JUPITER_BENCH_HDA")
+	if hda:
+		return hda
+	otls = f"{os.environ.get('HFS', '')}/houdini/otls"
+	if os.path.isdir(otls):
+		names = sorted(n for n in os.listdir(otls) if n.endswith(".hda"))
+		if names:
+			return f"{otls}/{names[0]}"
+	return None
+
+
+def make_library(root, files, hda=None):
+	"""<root>/otls with files HDAs, <root>/toolbar with files // 10 shelves, <root>/scripts/python."""
+	for folder in ("otls", "toolbar", "scripts/python"):
+		os.makedirs(f"{root}/{folder}", exist_ok=True)
+	for i in range(files):
+		path = f"{root}/otls/jupiter_bench_{i:05d}.hda"
+		if hda:
+			shutil.copyfile(hda, path)
+		else:
+			with open(path, 'wb') as f:
+				f.truncate(64 * 1024)
+	for i in range(max(files // 10, 1)):
+		with open(f"{root}/toolbar/jupiter_bench_{i:04d}.shelf", 'w') as f:
+			f.write(shelf_template.format(i=i))
+	with open(f"{root}/scripts/python/jupiter_bench.py", 'w') as f:
+		f.write("")
+	return root
+
+
+@pytest.fixture(scope="module")
+def library(tmp_path_factory):
+	base = os.environ.get("JUPITER_BENCH_DIR") or str(tmp_path_factory.mktemp("libraries"))
+	hda = find_hda() if find_hython() else None
+	libraries = {}
+
+	def make(files):
+		if files not in libraries:
+			root = f"{base}/lib_{files}".replace('\\', '/')
+			if not os.path.isdir(f"{root}/otls"):
+				make_library(root, files, hda)
+			libraries[files] = root
+		return libraries[files]
+	return make
+
+
+def package_dir(tmp_path, lib, mode):
+	packages = tmp_path / "packages"
+	packages.mkdir()
+	if mode == "hpath":
+		text = json.dumps({"hpath": lib}, indent=4)
+	else:
+		pref = str(tmp_path / "pref").replace('\\', '/')
+		build_index(lib, pref)
+		text = package_json(lib, pref)
+	(packages / "jupiter_localLib.json").write_text(text)
+	return str(packages)
+
+
+@sizes
+def test_build_index(benchmark, library, tmp_path, files):
+	# what the installer pays when otls/ or toolbar/ changed
+	lib = library(files)
+	hdas, shelves = benchmark(build_index, lib, str(tmp_path))
+	assert hdas == files and shelves == max(files // 10, 1)
+
+
+@sizes
+@modes
+def test_launch(benchmark, library, tmp_path, files, mode):
+	hython = find_hython()
+	if not hython or not find_hda():
+		pytest.skip("needs hython and an HDA to copy, set JUPITER_BENCH_HYTHON / JUPITER_BENCH_HDA")
+	env = dict(os.environ, HOUDINI_PACKAGE_DIR=package_dir(tmp_path, library(files), mode))
+	run = lambda: subprocess.run([hython, "-c", launch_script], env=env, check=True, capture_output=True, text=True)
+	result = benchmark.pedantic(run, rounds=5, warmup_rounds=1)
+	# both modes have to load every library HDA, or the index was ignored
+	assert result.stdout.strip().splitlines()[-1] == str(files)
@@ -0,0 +1,69 @@
+"""Synthetic filecache trees for the cleaner benchmarks.
+
+Layout matches FileCacheHDA_getbasedir: <root>/Shots/<shot>/fx/Effects/<cachename>/v<ver>/<cachename>_v<ver>.<frame>.bgeo.sc
+Files are sparse (truncate, no data written) so a million file tree only costs inodes.
+"""
+import os
+
+# cycled over cache nodes: name, filetype, substeps, files per version
+kinds = (
+	("seq", ".bgeo.sc", 1),
+	("substep", ".bgeo.sc", 4),
+	("vdb", ".vdb", 1),
+	("single", ".bgeo.sc", 0),  # one file per version, timedependent off
+	("dirty", ".bgeo.sc", -1),  # version folders without files
+	("mixed", ".bgeo.sc", -2),  # substep and plain frames in one folder
+)
+frame_bytes = 256 * 1024
+
+
+def touch(path, size):
+	with open(path, 'wb') as f:
+		f.truncate(size)
+
+
+def frame_names(cachename, ver, filetype, substeps, frames):
+	prefix = f"{cachename}_v{ver}"
+	if substeps == 0:
+		return [f"{prefix}{filetype}"]
+	if substeps == -1:
+		return []
+	names = []
+	sub = max(substeps, 1)
+	for i in range(frames):
+		frame, step = divmod(i, sub)
+		if substeps == -2 and i % 2:
+			names.append(f"{prefix}.{1001 + frame:04d}.{step * 250:03d}{filetype}")
+		elif substeps > 1:
+			names.append(f"{prefix}.{1001 + frame:04d}.{step * 1000 // sub:03d}{filetype}")
+		else:
+			names.append(f"{prefix}.{1001 + frame:04d}{filetype}")
+	return names
+
+
+def make_cache_tree(root, total_files, frames_per_version=200, versions_per_node=5, shots=4):
+	"""Write about total_files cache files under root, returns one dict per cache node for fakehou."""
+	per_node = frames_per_version * versions_per_node
+	num_nodes = max(1, total_files // per_node)
+	nodes = []
+	for n in range(num_nodes):
+		kind, filetype, substeps = kinds[n % len(kinds)]
+		shot = f"sh{n % shots:03d}"
+		cachename = f"Cache_geo{n}_{kind}"
+		main_folder = f"{root}/Shots/{shot}/fx/Effects/{cachename}"
+		for ver in range(1, versions_per_node + 1):
+			version_folder = f"{main_folder}/v{ver}"
+			os.makedirs(version_folder, exist_ok=True)
+			for name in frame_names(cachename, ver, filetype, substeps, frames_per_version):
+				touch(f"{version_folder}/{name}", frame_bytes)
+		sub = max(substeps, 1)
+		nodes.append({
+			"path": f"/obj/{shot}/{cachename}",
+			"cachedir": f"{main_folder}/v{versions_per_node}",
+			"version": versions_per_node,
+			"framerange": (1001, 1001 + frames_per_version // sub - 1, 1),
+			"substeps": sub,
+			"filetype": int(filetype == ".vdb"),
+			"timedependent": int(substeps != 0),
+		})
+	return nodes
@@ -0,0 +1,52 @@
+import json
+import os
+import sys
+
+import pytest
+
+here = os.path.dirname(os.path.abspath(__file__))
+sys.path[:0] = [here, os.path.dirname(here)]
+
+import cachetree  # noqa: E402
+import fakehou  # noqa: E402
+
+# hou has to be in place before jupiter_cachediscovery is imported
+fakehou.install(extra_types=[f"filler_type_{i}" for i in range(3000)])
+
+# files: (frames per version, versions per node)
+tree_sizes = {1000: (50, 3), 100000: (500, 5), 1000000: (2000, 5)}
+
+
+def pytest_collection_modifyitems(config, items):
+	if os.environ.get("JUPITER_BENCH_1M"):
+		return
+	skip = pytest.mark.skip(reason="1M file tree, set JUPITER_BENCH_1M=1")
+	for item in items:
+		if "1000000" in item.name:
+			item.add_marker(skip)
+
+
+@pytest.fixture(scope="session")
+def cache_tree(tmp_path_factory):
+	"""cache_tree(files) -> (root, node dicts), generated once per size and session.
+
+	Set JUPITER_BENCH_DIR to keep the trees between runs, writing a million files is slow on its own.
+	"""
+	base = os.environ.get("JUPITER_BENCH_DIR") or str(tmp_path_factory.mktemp("cachetrees"))
+	trees = {}
+
+	def make(files):
+		if files not in trees:
+			root = f"{base}/tree_{files}"
+			marker = f"{root}/.nodes"
+			frames, versions = tree_sizes[files]
+			if os.path.exists(marker):
+				with open(marker) as f:
+					nodes = json.load(f)
+			else:
+				nodes = cachetree.make_cache_tree(root, files, frames, versions)
+				with open(marker, 'w') as f:
+					json.dump(nodes, f)
+			trees[files] = (root, nodes)
+		return trees[files]
+	return make
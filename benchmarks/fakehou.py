@@ -0,0 +1,134 @@
+"""Minimal stand-in for the hou module, enough for the cache cleaner flow outside Houdini.
+
+import fakehou; fakehou.install(nodes)  # before importing jupiter_cachediscovery
+"""
+import sys
+import types
+
+
+class Parm:
+	def __init__(self, value):
+		self.value = value
+
+	def eval(self):
+		return self.value
+
+	def evalAsInt(self):
+		return int(self.value)
+
+	def evalAsString(self):
+		return str(self.value)
+
+
+class ParmTuple(Parm):
+	def eval(self):
+		return tuple(self.value)
+
+
+class NodeType:
+	def __init__(self, name):
+		self._name = name
+		self._instances = []
+
+	def name(self):
+		return self._name
+
+	def instances(self):
+		return tuple(self._instances)
+
+
+class NodeTypeCategory:
+	def __init__(self, name):
+		self._name = name
+		self._types = {}
+
+	def name(self):
+		return self._name
+
+	def nodeTypes(self):
+		return self._types
+
+
+class Node:
+	def __init__(self, path, nodetype, parms):
+		self._path = path
+		self._type = nodetype
+		self._parms = parms
+		nodetype._instances.append(self)
+
+	def path(self):
+		return self._path
+
+	def type(self):
+		return self._type
+
+	def parm(self, name):
+		return Parm(self._parms[name])
+
+	def parmTuple(self, name):
+		return ParmTuple(self._parms[name])
+
+	def evalParm(self, name):
+		return self._parms[name]
+
+	def sessionId(self):
+		return id(self)
+
+	def allSubChildren(self):
+		return tuple(n for n in _nodes if n._path.startswith(self._path.rstrip('/') + '/'))
+
+
+_nodes = []
+_categories = {}
+
+
+def filecache_node(path, cachedir, version, framerange=(1, 100, 1), substeps=1, filetype=0,
+				   timedependent=1, nodetype="filecache::2.0", category="Sop"):
+	"""A filecache-like node with the parms jupiter_cachenode.CacheNodeInfo reads."""
+	cat = _categories.setdefault(category, NodeTypeCategory(category))
+	t = cat._types.get(nodetype) or cat._types.setdefault(nodetype, NodeType(nodetype))
+	node = Node(path, t, {
+		"loadfromdisk": 1, "filetype": filetype, "timedependent": timedependent, "filemethod": 0,
+		"version": version, "basename": path.rsplit('/', 1)[-1], "f": framerange, "substeps": substeps,
+		"cachedir": cachedir,
+	})
+	_nodes.append(node)
+	return node
+
+
+def install(extra_types=()):
+	"""Register the module as hou, returns it. Filler node types make the type lookup realistic."""
+	hou = types.ModuleType("hou")
+	for name in ("Sop", "Object", "Lop", "Dop", "Cop2", "Top", "Driver"):
+		_categories.setdefault(name, NodeTypeCategory(name))
+	for i, name in enumerate(extra_types):
+		cat = list(_categories.values())[i % len(_categories)]
+		cat._types.setdefault(name, NodeType(name))
+	root = Node("/", NodeType("root"), {})
+	hou.node = lambda path: root if path == "/" else next(
+		(n for n in _nodes if n._path == path.rstrip('/')), Node(path.rstrip('/'), NodeType("subnet"), {}))
+	hou.nodeTypeCategories = lambda: dict(_categories)
+	hou.hipFileEventType = types.SimpleNamespace(AfterLoad=1, AfterClear=2, AfterMerge=3)
+	hou.hipFile = types.SimpleNamespace(addEventCallback=lambda cb: None, path=lambda: "/tmp/bench.hip")
+	hou.getenv = lambda name, default=None: None
+	hou.OperationFailed = type("OperationFailed", (Exception,), {})
+	hou.ObjectWasDeleted = type("ObjectWasDeleted", (Exception,), {})
+	hou.playbarEvent = types.SimpleNamespace(Started=0, Stopped=1, FrameChanged=2)
+	callbacks = []
+
+	def remove_callback(cb):
+		if cb not in callbacks:
+			raise hou.OperationFailed("callback not registered")
+		callbacks.remove(cb)
+	hou.playbar = types.SimpleNamespace(
+		callbacks=callbacks, addEventCallback=callbacks.append, removeEventCallback=remove_callback,
+		eventCallbacks=lambda: tuple(callbacks))
+	sys.modules["hou"] = hou
+	return hou
+
+
+def clear():
+	_nodes.clear()
+	for cat in _categories.values():
+		for t in cat._types.values():
+			t._instances.clear()
@@ -0,0 +1,244 @@
+"""Throttled autosave into rotating backup slots, replacing Houdini's fixed interval autosave.
+
+import jupiter_autosave; jupiter_autosave.start(budget=2.0)
+
+A save is written with hou.hipFile.saveAsBackup (the scene name and its unsaved state stay untouched) and moved
+into the oldest of JUPITER_AUTOSAVE_SLOTS slots, $HIP/backup/<hipname>_autosave<n>.hip, with one os.replace.
+Each save is timed. The next one is due after save duration / budget, so at a 2% budget a 10 s save runs every
+500 s, clamped to JUPITER_AUTOSAVE_MIN / JUPITER_AUTOSAVE_MAX seconds, and is never started while the time spent
+saving would go over the budget of the session so far. A due save waits until the mouse and keyboard have been
+idle for a few seconds, playback stopped and the cache queue finished. saveAsBackup leaves the scene modified,
+so changes are tracked from the undo stack and hip file events: no new backup until the scene changed again.
+"""
+import os
+import shutil
+import time
+
+import hou
+from hutil.Qt import QtCore, QtGui, QtWidgets
+
+default_budget = float(os.environ.get('JUPITER_AUTOSAVE_BUDGET', 2.0))  # percent of session time
+min_interval = float(os.environ.get('JUPITER_AUTOSAVE_MIN', 120))
+max_interval = float(os.environ.get('JUPITER_AUTOSAVE_MAX', 1800))
+slots = int(os.environ.get('JUPITER_AUTOSAVE_SLOTS', 3))
+idle_seconds = 3
+disk_throughput = 200 * 1024 * 1024  # bytes per second, first estimate before anything was measured
+_service = None
+
+
+def slot_paths(hip_path):
+	"""$HIP/backup/<hipname>_autosave1.hip ... or JUPITER_AUTOSAVE_DIR instead of $HIP/backup."""
+	hip_dir, hip_name = os.path.split(hip_path)
+	folder = os.environ.get('JUPITER_AUTOSAVE_DIR') or os.path.join(hip_dir, 'backup')
+	name = os.path.splitext(hip_name)[0]
+	return [os.path.join(folder, f'{name}_autosave{i}.hip') for i in range(1, slots + 1)]
+
+
+def oldest_slot(paths):
+	def age(path):
+		try:
+			return os.stat(path).st_mtime
+		except OSError:
+			return -1.0  # free slot first
+	return min(paths, key=age)
+
+
+def move_into_slot(source, slot):
+	# the slot is replaced in one rename, a crash mid save never leaves a half written backup behind
+	os.makedirs(os.path.dirname(slot), exist_ok=True)
+	try:
+		os.replace(source, slot)
+	except OSError:
+		# JUPITER_AUTOSAVE_DIR on another drive, copy next to the slot first
+		tmp = f'{slot}.{os.getpid()}.tmp'
+		shutil.copyfile(source, tmp)
+		os.replace(tmp, slot)
+		os.remove(source)
+
+
+def undo_token():
+	"""Changes to the undo stack since the last call, every edit to the scene adds to it."""
+	labels = hou.undos.undoLabels() if hasattr(hou.undos, 'undoLabels') else ()
+	return len(labels), labels[0] if labels else '', hou.undos.memoryUsage()
+
+
+def cache_queue_busy():
+	try:
+		import jupiter_cachequeue
+	except ImportError:
+		return False
+	return jupiter_cachequeue._queue is not None and jupiter_cachequeue._queue.running()
+
+
+# Timers run on the main thread between UI events: a save only starts while Houdini is not cooking in the
+# foreground, the checks below cover interaction and background cooks.
+class AutosaveService(QtCore.QObject):
+	def __init__(self, budget=default_budget):
+		super().__init__()
+		# same clamp for JUPITER_AUTOSAVE_BUDGET=0 or below, interval() divides by it
+		self.set_budget(budget)
+		self.started = time.monotonic()
+		self.spent = 0.0  # seconds spent saving this session
+		self.saves = 0
+		self.skipped = 0
+		self.estimate = None  # expected seconds per save, moving average of measured saves
+		self.last_path = None
+		self.changed_at = time.monotonic()  # last change to the scene seen
+		self.backup_at = None  # last backup, or manual save
+		self.token = None
+		self.last_input = time.monotonic()
+		self.cursor = None
+		self.due = QtCore.QTimer(self)
+		self.due.setSingleShot(True)
+		self.due.timeout.connect(self.onDue)
+		self.idle = QtCore.QTimer(self)
+		self.idle.setInterval(1000)
+		self.idle.timeout.connect(self.onIdleCheck)
+
+	def set_budget(self, budget):
+		self.budget = max(float(budget), 0.1)
+
+	def expected_duration(self):
+		if self.estimate is not None:
+			return self.estimate
+		try:
+			size = os.path.getsize(hou.hipFile.path())
+		except OSError:
+			size = 0
+		return 0.5 + size / disk_throughput
+
+	def interval(self):
+		return min(max(self.expected_duration() * 100.0 / self.budget, min_interval), max_interval)
+
+	def start(self):
+		hou.setPreference('autoSave', '0')
+		self.token = undo_token()
+		hou.hipFile.addEventCallback(self.onHipFileEvent)
+		self.schedule()
+
+	def stop(self):
+		self.due.stop()
+		self.idle.stop()
+		try:
+			hou.hipFile.removeEventCallback(self.onHipFileEvent)
+		except hou.OperationFailed:
+			pass
+
+	def onHipFileEvent(self, event_type):
+		now = time.monotonic()
+		if event_type == hou.hipFileEventType.AfterSave:
+			# saved by hand, nothing to back up until the next change
+			self.backup_at = now
+		elif event_type in (hou.hipFileEventType.AfterLoad, hou.hipFileEventType.AfterClear):
+			self.backup_at = now
+			self.token = undo_token()
+		elif event_type == hou.hipFileEventType.AfterMerge:
+			self.changed_at = now
+
+	def changed_since_backup(self):
+		if not hou.undos.areEnabled():
+			# no undo stack to compare, every due save counts as changed
+			return True
+		token = undo_token()
+		if token != self.token:
+			self.token = token
+			self.changed_at = time.monotonic()
+		return self.backup_at is None or self.changed_at > self.backup_at
+
+	def active(self):
+		return self.due.isActive() or self.idle.isActive()
+
+	def schedule(self, seconds=None):
+		self.idle.stop()
+		self.due.start(int((self.interval() if seconds is None else seconds) * 1000))
+
+	def onDue(self):
+		if not hou.hipFile.hasUnsavedChanges() or not self.changed_since_backup():
+			self.schedule()
+			return
+		self.cursor = QtGui.QCursor.pos()
+		self.last_input = time.monotonic()
+		self.idle.start()
+
+	def busy(self):
+		if QtWidgets.QApplication.mouseButtons() != QtCore.Qt.NoButton:
+			return True
+		if QtWidgets.QApplication.activePopupWidget() or QtWidgets.QApplication.activeModalWidget():
+			return True
+		if hou.playbar.isPlaying() or hou.hipFile.isLoadingHipFile() or hou.hipFile.isShuttingDown():
+			return True
+		return cache_queue_busy()
+
+	def over_budget(self):
+		elapsed = time.monotonic() - self.started
+		return (self.spent + self.expected_duration()) > elapsed * self.budget / 100.0
+
+	def onIdleCheck(self):
+		cursor = QtGui.QCursor.pos()
+		if cursor != self.cursor or self.busy():
+			self.cursor = cursor
+			self.last_input = time.monotonic()
+			return
+		if time.monotonic() - self.last_input < idle_seconds:
+			return
+		self.idle.stop()
+		if self.over_budget():
+			self.skipped += 1
+			self.schedule()
+			return
+		self.save()
+		self.schedule()
+
+	def save(self):
+		hip_path = hou.hipFile.path()
+		start = time.perf_counter()
+		try:
+			backup = hou.hipFile.saveAsBackup()
+			slot = oldest_slot(slot_paths(hip_path))
+			move_into_slot(backup, slot)
+		except (OSError, hou.OperationFailed) as e:
+			hou.ui.setStatusMessage(f'Jupiter autosave failed: {e}', severity=hou.severityType.Warning)
+			self.skipped += 1
+			return None
+		duration = time.perf_counter() - start
+		self.spent += duration
+		self.saves += 1
+		self.estimate = duration if self.estimate is None else 0.5 * self.estimate + 0.5 * duration
+		self.backup_at = time.monotonic()
+		self.token = undo_token()
+		self.last_path = slot
+		hou.ui.setStatusMessage(f'Jupiter autosave: {slot} in {duration:.1f}s, next in {self.interval():.0f}s')
+		return slot
+
+	def stats(self):
+		elapsed = max(time.monotonic() - self.started, 1e-6)
+		return {
+			"saves": self.saves,
+			"skipped": self.skipped,
+			"spent": self.spent,
+			"overhead": self.spent / elapsed * 100.0,
+			"budget": self.budget,
+			"interval": self.interval(),
+			"last": self.last_path,
+		}
+
+
+def autosave_service():
+	global _service
+	if _service is None:
+		_service = AutosaveService()
+	return _service
+
+
+def start(budget=None):
+	service = autosave_service()
+	if budget is not None:
+		service.set_budget(budget)
+	if not service.active():
+		service.start()
+	return service
+
+
+def stop():
+	if _service is not None:
+		_service.stop()
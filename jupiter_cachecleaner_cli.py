@@ -0,0 +1,158 @@
+"""Headless cache cleaner, same tagging rules as jupiter_cachecleaner without hou nodes or Qt.
+
+hython jupiter_cachecleaner_cli.py shot_a.hip shot_b.hip --output report.json
+hython jupiter_cachecleaner_cli.py shot_a.hip --dump-manifest nodes.json
+python jupiter_cachecleaner_cli.py --manifest nodes.json --format csv --output report.csv
+python jupiter_cachecleaner_cli.py --manifest nodes.json --delete --dry-run
+
+Each cache root is scanned in its own worker process. Versions tagged currentversion are never deleted,
+framesdontmatch versions only with --clean-mismatched.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from jupiter_cachedelete import DeleteJob, delete_versions
+from jupiter_cacheindex import CacheIndex
+from jupiter_cacheinventory import VersionInventory, scan_cache_root
+from jupiter_cachenode import CacheNodeInfo, node_status, tag_version
+
+report_fields = ("hipfile", "node", "status", "version", "path", "size", "start", "end", "inc", "substep",
+				 "frames", "missing", "bad", "tag", "clean")
+
+
+def nodes_from_hip(hip_files):
+	"""Load every hip under hython and read its filecache nodes."""
+	import hou
+	from jupiter_cachediscovery import find_cache_nodes
+	nodes = []
+	for hip in hip_files:
+		hou.hipFile.load(hip, suppress_save_prompt=True, ignore_load_warnings=True)
+		nodes += [CacheNodeInfo.from_node(node, hipfile=hip) for node in find_cache_nodes()]
+	return nodes
+
+
+def nodes_from_manifest(manifest):
+	with open(manifest, 'r') as f:
+		return [CacheNodeInfo.from_dict(d) for d in json.load(f)]
+
+
+def scan_root_worker(root, filetype, index_file):
+	"""Runs in a worker process, returns picklable index entries for every version of one cache root."""
+	index = CacheIndex(index_file) if index_file else None
+	try:
+		inventory = scan_cache_root(root, filetype, index)
+	except FileNotFoundError:
+		return root, []
+	return root, [(v.name, v.path, v.to_index(filetype)) for v in inventory.versions]
+
+
+def scan_roots(nodes, index=None, workers=None):
+	roots = {}
+	for n in nodes:
+		roots.setdefault(n.main_folder, n.filetype)
+	index_file = index.index_file if index is not None else None
+	versions = {}
+	with ProcessPoolExecutor(max_workers=workers) as pool:
+		futures = [pool.submit(scan_root_worker, root, filetype, index_file) for root, filetype in roots.items()]
+		for future in futures:
+			root, entries = future.result()
+			versions[root] = []
+			for name, path, entry in entries:
+				v = VersionInventory.from_index(name, path, entry)
+				versions[root].append(v)
+				if index is not None:
+					index.store(v, entry["filetype"])
+			if index is not None:
+				index.prune(root, [v.path for v in versions[root]])
+	return versions
+
+
+def build_report(nodes, versions, clean_mismatched=False):
+	rows = []
+	for n in nodes:
+		node_rows = []
+		for v in versions.get(n.main_folder, []):
+			tag = "dirty" if v.mark_dirty else tag_version(n, v)
+			node_rows.append({
+				"hipfile": n.hipfile, "node": n.path, "version": v.name, "path": v.path,
+				"size": v.total_bytes, "start": v.startfr, "end": v.endfr, "inc": v.inc, "substep": v.substep,
+				"frames": v.frame_count, "missing": v.missing_frames, "bad": v.bad_files, "tag": tag,
+			})
+		status = node_status([r["tag"] for r in node_rows])
+		for r in node_rows:
+			r["status"] = status
+		rows.extend(node_rows)
+	# a version is only cleaned when no node (in any hip) still uses it, dirty folders are left alone.
+	# framesdontmatch is the node's own version with another range, unattended runs keep it by default
+	keep_tags = ("currentversion", "dirty") if clean_mismatched else ("currentversion", "dirty", "framesdontmatch")
+	keep = set(r["path"] for r in rows if r["tag"] in keep_tags)
+	for r in rows:
+		r["clean"] = int(r["path"] not in keep)
+	return rows
+
+
+def write_report(rows, fmt, output):
+	f = open(output, 'w', newline='') if output else sys.stdout
+	try:
+		if fmt == 'csv':
+			writer = csv.DictWriter(f, fieldnames=report_fields)
+			writer.writeheader()
+			writer.writerows(rows)
+		else:
+			json.dump(rows, f, indent=2)
+			f.write('\n')
+	finally:
+		if output:
+			f.close()
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description="Report or clean filecache versions without the cleaner window")
+	parser.add_argument('hipfiles', nargs='*', help="hip files to scan, needs hython")
+	parser.add_argument('--manifest', help="json list of filecache node parms instead of hip files")
+	parser.add_argument('--dump-manifest', help="write the node parms read from the hip files and exit")
+	parser.add_argument('--format', choices=('json', 'csv'), default='json')
+	parser.add_argument('--output', help="report file, stdout when omitted")
+	parser.add_argument('--cachedir', default=os.environ.get('CacheDir'), help="$CacheDir holding the cache index")
+	parser.add_argument('--workers', type=int, default=None, help="worker processes, one cache root each")
+	parser.add_argument('--delete', action='store_true', help="delete every version marked clean")
+	parser.add_argument('--dry-run', action='store_true', help="with --delete only report what would go")
+	parser.add_argument('--clean-mismatched', action='store_true',
+						help="also clean the current version of nodes whose frame range does not match")
+	args = parser.parse_args(argv)
+
+	nodes = []
+	if args.manifest:
+		nodes += nodes_from_manifest(args.manifest)
+	if args.hipfiles:
+		nodes += nodes_from_hip(args.hipfiles)
+	if not nodes:
+		parser.error("no filecache nodes, pass hip files (hython) or --manifest")
+	if args.dump_manifest:
+		with open(args.dump_manifest, 'w') as f:
+			json.dump([n.to_dict() for n in nodes], f, indent=2)
+		return 0
+
+	index = CacheIndex.for_cachedir(args.cachedir)
+	rows = build_report(nodes, scan_roots(nodes, index, args.workers), args.clean_mismatched)
+	if index is not None:
+		index.save()
+	write_report(rows, args.format, args.output)
+
+	if args.delete:
+		jobs = {}
+		for r in rows:
+			if r["clean"]:
+				jobs[r["path"]] = DeleteJob(r["path"], r["tag"], f'{r["node"]} {r["version"]}')
+		report = delete_versions(list(jobs.values()), dry_run=args.dry_run)
+		print(report.summary(), file=sys.stderr)
+		return int(bool(report.failed))
+	return 0
+
+
+if __name__ == '__main__':
+	sys.exit(main())
@@ -1,48 +1,26 @@
 import os
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 # from PySide2 import QtWidgets
 # from PySide2.QtCore import QProcess
-from fractions import Fraction
 
 from hutil.Qt import QtCore, QtGui, QtWidgets
 # from QtCore import QProcess, QObject, SIGNAL, QProcess
 
 import hou
 
+from jupiter_cachedelete import DeleteJob, delete_versions
+from jupiter_cachediscovery import find_cache_nodes
+from jupiter_cacheindex import CacheIndex
+from jupiter_cacheinventory import CacheInventory, format_size, inventory_version, list_cache_root
+from jupiter_cachenode import CacheNodeInfo, node_status, tag_version
 from widgets import jupiter_cacheclean_main_ui as main_ui
-from widgets import jupiter_cacheclean_nodewidget_ui as nodewidget_ui
-from widgets import jupiter_cacheclean_versionwidget_ui as versionwidget_ui
 
-_green = "background-color: rgb(5, 98, 75);"
-_grey = "background-color: rgb(40, 44, 52);"
-_red = "background-color: rgb(98, 48, 84);"
-
-
-# TODO: Adding delete folder function to top of the menu
-# TODO: Checkbox controls delete or not
-def folder_size(path):
-	total = 0
-	for entry in os.scandir(path):
-		if entry.is_file():
-			total += entry.stat().st_size
-		elif entry.is_dir():
-			total += folder_size(entry.path)
-	return total
-
-
-def format_size(size: int) -> str:
-	for unit in ("B", "K", "M", "G", "T"):
-		if size < 1024:
-			break
-		size /= 1024
-	return f"{size:.2f}{unit}"
-
-
-def fsize(path):
-	try:
-		return format_size(folder_size(path))
-	except TypeError:
-		print('No Such Directory')
+_green = (5, 98, 75)
+_grey = (40, 44, 52)
+_red = (98, 48, 84)
+_scan_threads = 16  # concurrent version folder walks, I/O bound so more than cpu count is fine
 
 
 def readQssFile(filePath):
@@ -60,6 +38,206 @@ def showinnetworkeditor(path):
 	pass
 
 
+_columns = ("Cache", "Size", "Frames", "Files", "Tag")
+_col_cache, _col_size, _col_frames, _col_files, _col_tag = range(len(_columns))
+_RawRole = QtCore.Qt.UserRole + 1  # unformatted value, used by delegates and for sorting
+_tag_text = {
+	"currentversion": "Current Version",
+	"notcurrentversion": "Not Current Version",
+	"framesdontmatch": "Frames Dont Match",
+	"notsingleframe": "Not SingleFrame",
+}
+_tag_color = {
+	"currentversion": _green,
+	"notcurrentversion": _grey,
+	"framesdontmatch": _red,
+	"notsingleframe": _grey,
+}
+
+
+class CacheTreeModel(QtCore.QAbstractItemModel):
+	# Top level rows are SingleCacheNode, children are its VersionWidget list.
+	# internalPointer is the model itself for node rows and the parent SingleCacheNode for version rows.
+	def __init__(self, parent=None):
+		super(CacheTreeModel, self).__init__(parent)
+		self.cache_nodes = []
+
+	def add_node(self, single):
+		row = len(self.cache_nodes)
+		self.beginInsertRows(QtCore.QModelIndex(), row, row)
+		single.row = row
+		self.cache_nodes.append(single)
+		self.endInsertRows()
+
+	def add_version(self, single, version):
+		row = len(single.versions)
+		self.beginInsertRows(self.createIndex(single.row, 0, self), row, row)
+		single.versions.append(version)
+		self.endInsertRows()
+		self.node_changed(single)
+
+	def remove_version(self, single, version):
+		row = single.versions.index(version)
+		self.beginRemoveRows(self.createIndex(single.row, 0, self), row, row)
+		del single.versions[row]
+		self.endRemoveRows()
+		single.n.inventory.total_bytes -= version.version_bytes
+		single.n.local_main_folder_size = format_size(single.n.inventory.total_bytes)
+		# tags and status of the versions left, without a rescan
+		single.drop_version(version)
+		if single.versions:
+			self.dataChanged.emit(self.createIndex(0, 0, single),
+								  self.createIndex(len(single.versions) - 1, len(_columns) - 1, single))
+		self.node_changed(single)
+
+	def checked_versions(self):
+		for single in self.cache_nodes:
+			for v in single.versions:
+				if v.mark_clean:
+					yield single, v
+
+	def node_changed(self, single):
+		self.dataChanged.emit(self.createIndex(single.row, 0, self),
+							  self.createIndex(single.row, len(_columns) - 1, self))
+
+	def item(self, index):
+		# (SingleCacheNode, None) for node rows, (SingleCacheNode, VersionWidget) for version rows
+		ptr = index.internalPointer()
+		if ptr is self:
+			return self.cache_nodes[index.row()], None
+		return ptr, ptr.versions[index.row()]
+
+	def index(self, row, column, parent=QtCore.QModelIndex()):
+		if not self.hasIndex(row, column, parent):
+			return QtCore.QModelIndex()
+		if not parent.isValid():
+			return self.createIndex(row, column, self)
+		return self.createIndex(row, column, self.cache_nodes[parent.row()])
+
+	def parent(self, index):
+		if not index.isValid():
+			return QtCore.QModelIndex()
+		ptr = index.internalPointer()
+		if ptr is self:
+			return QtCore.QModelIndex()
+		return self.createIndex(ptr.row, 0, self)
+
+	def rowCount(self, parent=QtCore.QModelIndex()):
+		if not parent.isValid():
+			return len(self.cache_nodes)
+		if parent.column() == 0 and parent.internalPointer() is self:
+			return len(self.cache_nodes[parent.row()].versions)
+		return 0
+
+	def columnCount(self, parent=QtCore.QModelIndex()):
+		return len(_columns)
+
+	def headerData(self, section, orientation, role=QtCore.Qt.DisplayRole):
+		if orientation == QtCore.Qt.Horizontal and role == QtCore.Qt.DisplayRole:
+			return _columns[section]
+		return None
+
+	def flags(self, index):
+		if not index.isValid():
+			return QtCore.Qt.NoItemFlags
+		_flags = QtCore.Qt.ItemIsEnabled | QtCore.Qt.ItemIsSelectable
+		if index.column() == _col_cache and index.internalPointer() is not self:
+			_flags |= QtCore.Qt.ItemIsUserCheckable
+		return _flags
+
+	def data(self, index, role=QtCore.Qt.DisplayRole):
+		if not index.isValid():
+			return None
+		single, v = self.item(index)
+		column = index.column()
+		if v is None:
+			return self.node_data(single, column, role)
+		if role == QtCore.Qt.CheckStateRole and column == _col_cache:
+			return QtCore.Qt.Checked if v.mark_clean else QtCore.Qt.Unchecked
+		if role == _RawRole:
+			return (v.version, v.version_bytes, (v.startfr, v.endfr, v.version_inc, v.version_substep,
+												 v.mark_singleframe), v.version_files, v.tag)[column]
+		if role == QtCore.Qt.DisplayRole:
+			return (v.version, v.version_size, f"{v.startfr}-{v.endfr}", str(v.version_files),
+					_tag_text.get(v.tag, v.tag))[column]
+		if role == QtCore.Qt.ToolTipRole:
+			return f"{v.version_path}\n{v.missing_frames} missing frames, {v.bad_files} zero byte or truncated files"
+		if role == QtCore.Qt.ForegroundRole and column == _col_files and (v.missing_frames or v.bad_files):
+			return QtGui.QColor(200, 120, 160)
+		return None
+
+	def node_data(self, single, column, role):
+		n = single.n
+		if role == _RawRole:
+			return (n.current_nodepath, n.inventory.total_bytes,
+					(int(n.current_framerange[0]), int(n.current_framerange[1]), int(n.current_framerange[2]),
+					 n.current_substeps, n.current_timedependent == "SingleFramed"),
+					len(single.versions), single.status)[column]
+		if role == QtCore.Qt.DisplayRole:
+			return (n.current_nodepath, n.local_main_folder_size,
+					f"{single.node_dict['startfr']}-{single.node_dict['endfr']}", str(len(single.versions)),
+					single.status)[column]
+		if role == QtCore.Qt.ToolTipRole:
+			return "\n".join(f"{k}: {val}" for k, val in single.node_dict.items())
+		if role == QtCore.Qt.ForegroundRole and column == _col_cache and n.current_loaded == "Unload":
+			return QtGui.QColor(200, 120, 160)
+		return None
+
+	def setData(self, index, value, role=QtCore.Qt.EditRole):
+		if role != QtCore.Qt.CheckStateRole or not index.isValid():
+			return False
+		single, v = self.item(index)
+		if v is None:
+			return False
+		v.mark_clean = int(value == QtCore.Qt.Checked or value == 2)
+		print("clean_button is", ["off", "on"][v.mark_clean], "for", v.version)
+		self.dataChanged.emit(index, index)
+		return True
+
+
+class SizeDelegate(QtWidgets.QStyledItemDelegate):
+	# version size as a bar relative to the whole cache node
+	def paint(self, painter, option, index):
+		size = index.data(_RawRole) or 0
+		total = index.parent().sibling(index.parent().row(), _col_size).data(_RawRole) if index.parent().isValid() else 0
+		if total:
+			rect = QtCore.QRect(option.rect)
+			rect.setWidth(int(rect.width() * min(size / total, 1.0)))
+			painter.fillRect(rect, QtGui.QColor(*_green).darker(130))
+		super(SizeDelegate, self).paint(painter, option, index)
+
+
+class FrameRangeDelegate(QtWidgets.QStyledItemDelegate):
+	def initStyleOption(self, option, index):
+		super(FrameRangeDelegate, self).initStyleOption(option, index)
+		raw = index.data(_RawRole)
+		if not raw:
+			return
+		start, end, inc, substep, singleframe = raw
+		if singleframe:
+			option.text = "(SingleFrame)"
+		else:
+			option.text = f"{start}-{end}  inc {inc}  substep {substep}"
+
+
+class TagDelegate(QtWidgets.QStyledItemDelegate):
+	def paint(self, painter, option, index):
+		tag = index.data(_RawRole)
+		color = _tag_color.get(tag)
+		if color is None and index.data() in ("Clean with Care", "Clean All"):
+			color = _red
+		elif color is None and index.data() == "Clean Others":
+			color = _green
+		if color is not None:
+			painter.save()
+			painter.setRenderHint(QtGui.QPainter.Antialiasing)
+			painter.setPen(QtCore.Qt.NoPen)
+			painter.setBrush(QtGui.QColor(*color))
+			painter.drawRoundedRect(option.rect.adjusted(2, 2, -2, -2), 4, 4)
+			painter.restore()
+		super(TagDelegate, self).paint(painter, option, index)
+
+
 class CacheCleanWindow(QtWidgets.QWidget):
 	def __init__(self):
 		super(CacheCleanWindow, self).__init__()
@@ -67,129 +245,129 @@ class CacheCleanWindow(QtWidgets.QWidget):
 		self.window = QtWidgets.QMainWindow()
 		self.ui = main_ui.Ui_MainWindow()
 		self.ui.setupUi(self.window)
-		self.window.show()
 		styleSheet = readQssFile(f'{os.path.dirname(__file__)}/widgets/ManjaroMix.qss')
 		self.window.setStyleSheet(styleSheet)
 
-	def createNodeWidgets(self, node_detail):
-		self.n_widget = QtWidgets.QGroupBox()
-		self.nui = nodewidget_ui.Ui_Widget()
-		self.nui.setupUi(self.n_widget)
-		self.ui.verticalLayout_6.addWidget(self.n_widget)
-
-		self.nui.label_currentpath.setText(node_detail["path"])
-		self.nui.label_loaded_or_not.setText(node_detail["loaded"])
-		self.nui.label_nodetype.setText(node_detail["nodetype"])
-		self.nui.label_timedep_or_not.setText(node_detail["timedependent"])
-		self.nui.label_filemethod.setText(node_detail["filemethod"])
-		self.nui.label_currentversion.setText(node_detail["currentversion"])
-		self.nui.label_cachename.setText(node_detail["cachename"])
-		self.nui.label_startfr.setText(node_detail["startfr"])
-		self.nui.label_endfr.setText(node_detail["endfr"])
-		self.nui.label_inc.setText(node_detail["inc"])
-		self.nui.label_substep.setText(node_detail["substep"])
-		self.nui.btn_show_in_network.clicked.connect(lambda: showinnetworkeditor(node_detail["path"]))
-		return self.nui
-
-	def createVersionWidget(self, version_detail):
-		self.v_widget = QtWidgets.QGroupBox()
-		self.vui = versionwidget_ui.Ui_Form()
-		self.vui.setupUi(self.v_widget)
-		self.nui.verticalLayout_3.addWidget(self.v_widget)
-
-		self.vui.singleFramed = version_detail["mark_singleframe"]
-		self.vui.label_versionnum.setText(version_detail["version"])
-		if self.vui.singleFramed:
-			self.vui.frame_6.hide()
-			self.vui.frame_8.hide()
-			self.vui.frame_9.hide()
-			self.vui.label_endfrnum.hide()
-			self.vui.label_10.setText("(SingleFrame)")
-		self.vui.label_sizestr.setText(version_detail["version_size"])
-		self.vui.label_formatstr.setText(version_detail['filetype'])
-		self.vui.label_startfrnum.setText(str(version_detail["start"]))
-		self.vui.label_endfrnum.setText(str(version_detail["end"]))
-		self.vui.label_incnum.setText(str(version_detail["inc"]))
-		self.vui.label_substepnum.setText(str(version_detail["substep"]))
-		self.vui.checkBox.setChecked(version_detail["clean"])
-		self.vui.cb = version_detail["clean"]
-		self.vui.tag = version_detail["tag"]
-		_version_path = version_detail["version_path"]
-		self.vui.btn_open.clicked.connect(lambda: os.startfile(_version_path))
-		self.vui.checkBox.stateChanged.connect(lambda x: self.enable_clean() if x else self.disable_clean())
-		return self.vui
-
-	def enable_clean(self):
-		self.vui.cb = 1
-		print(self.vui.checkBox)
-		print("clean_button is on for", self.vui.label_versionnum.text())
-
-	def disable_clean(self):
-		self.vui.cb = 0
-		print("clean_button is off for", self.vui.label_versionnum.text())
+		# one tree view for every node and version, rows are only painted when visible
+		self.model = CacheTreeModel(self.window)
+		self.proxy = QtCore.QSortFilterProxyModel(self.window)
+		self.proxy.setSourceModel(self.model)
+		self.proxy.setSortRole(_RawRole)
+		self.view = QtWidgets.QTreeView()
+		self.view.setModel(self.proxy)
+		self.view.setUniformRowHeights(True)
+		self.view.setSortingEnabled(True)
+		self.view.sortByColumn(_col_cache, QtCore.Qt.AscendingOrder)
+		self.view.setAlternatingRowColors(True)
+		self.size_delegate = SizeDelegate(self.view)
+		self.frames_delegate = FrameRangeDelegate(self.view)
+		self.tag_delegate = TagDelegate(self.view)
+		self.view.setItemDelegateForColumn(_col_size, self.size_delegate)
+		self.view.setItemDelegateForColumn(_col_frames, self.frames_delegate)
+		self.view.setItemDelegateForColumn(_col_tag, self.tag_delegate)
+		self.view.doubleClicked.connect(self.onDoubleClicked)
+		self.ui.verticalLayout_6.addWidget(self.view)
+
+		# delete checked versions in the background
+		self.deleter = None
+		self.toolbar = self.window.addToolBar("Clean")
+		self.toolbar.addAction("Dry Run", lambda: self.cleanChecked(dry_run=True))
+		self.toolbar.addAction("Delete Checked", lambda: self.cleanChecked(dry_run=False))
+		self.progress = QtWidgets.QProgressBar()
+		self.progress.setRange(0, 100)
+		self.progress_label = QtWidgets.QLabel()
+		self.window.statusBar().addWidget(self.progress_label)
+		self.window.statusBar().addPermanentWidget(self.progress)
+		self.window.show()
+
+	def onDoubleClicked(self, proxy_index):
+		# node row: show in network editor, version row: open the version folder
+		single, v = self.model.item(self.proxy.mapToSource(proxy_index))
+		if v is None:
+			showinnetworkeditor(single.n.current_nodepath)
+		else:
+			os.startfile(v.version_path)
+
+	def cleanChecked(self, dry_run=False):
+		if self.deleter is not None:
+			hou.ui.displayMessage("A clean is already running")
+			return
+		checked = list(self.model.checked_versions())
+		if not checked:
+			hou.ui.displayMessage("No version is checked for cleaning")
+			return
+		if not dry_run:
+			total = format_size(sum(v.version_bytes for _, v in checked))
+			noti = f'Confirm delete?\n{len(checked)} versions, {total} will be removed from disk'
+			result = hou.ui.displayMessage(noti, buttons=('Yes, Delete', 'Cancel'), title='Jupiter Cache Clean')
+			if result != 0:
+				return
+		jobs = [DeleteJob(v.version_path, v.tag, f"{single.n.current_nodepath} {v.version}") for single, v in checked]
+		self.checked = {v.version_path: (single, v) for single, v in checked}
+		self.deleter = CacheDeleter(jobs, dry_run)
+		self.deleter.progressed.connect(self.onCleanProgress, QtCore.Qt.QueuedConnection)
+		self.deleter.finished.connect(self.onCleanFinished, QtCore.Qt.QueuedConnection)
+		self.progress.setValue(0)
+		self.deleter.start()
+
+	def onCleanProgress(self, files, size, total_files, total_size):
+		if total_size:
+			self.progress.setValue(int(100 * size / total_size))
+		self.progress_label.setText(f"{files}/{total_files} files  {format_size(size)}/{format_size(total_size)}")
+
+	def onCleanFinished(self, report):
+		self.deleter = None
+		self.progress.setValue(100)
+		if not report.dry_run:
+			for path in report.deleted:
+				single, v = self.checked[path]
+				self.model.remove_version(single, v)
+		hou.ui.displayMessage(report.summary(), title='Jupiter Cache Clean')
+
+
+class CacheDeleter(QtCore.QObject):
+	# runs jupiter_cachedelete.delete_versions off the UI thread, its own pool does the unlinking
+	progressed = QtCore.Signal(object, object, object, object)  # files, bytes, total files, total bytes
+	finished = QtCore.Signal(object)  # DeleteReport
+
+	def __init__(self, jobs, dry_run=False):
+		super(CacheDeleter, self).__init__()
+		self.jobs = jobs
+		self.dry_run = dry_run
+
+	def start(self):
+		threading.Thread(target=self.run, daemon=True).start()
+
+	def run(self):
+		report = delete_versions(self.jobs, self.dry_run, progress=self.progressed.emit)
+		self.finished.emit(report)
 
 
 class VersionWidget:
-	def __init__(self, node, path, name, filetype):
-		# self.version_name = name
+	def __init__(self, node, inventory, filetype):
+		# inventory is a jupiter_cacheinventory.VersionInventory, no filesystem access here
+		self.inventory = inventory
 		self.node = node
 		self.filetype = filetype
-		self.version_path = os.path.realpath(path)
-		self.version = os.path.basename(path)
-		self.version_size = fsize(path)
+		self.version_path = os.path.realpath(inventory.path)
+		self.version = os.path.basename(inventory.path)
+		self.version_bytes = inventory.total_bytes
+		self.version_size = format_size(inventory.total_bytes)
 		self.tag = ""
 		self.mark_clean = 0
-		self.mark_dirty = 0
-		self.mark_singleframe = 0
-		self.version_inc = 1
-		self.version_substep = 1
-		cache_files = os.scandir(path)
-
-		print(f"===================={name}======================")
-		has_substep = 0
-		no_substep = 0
-		frames_list = []
-		float_frames_list = []
-		lst = len(os.listdir(path))
-		if lst == 1:
-			# single frame like: Cache_box_high3_v3.bgeo.sc
-			self.mark_singleframe = 1
-			no_substep = 1
-		elif not lst:
-			# only folder exist but no cache files
-			self.mark_dirty = 1
-		else:
-			for f in cache_files:
-				d = f.name.rstrip(filetype).split(name + '.')[-1]
-				if '.' in d:
-					# has substeps like: high_v3.0006.000.bgeo.sc
-					frame = d.split('.')[0]
-					has_substep = 1
-				else:
-					# has no substeps like: high_v3.0006.bgeo.sc
-					frame = d
-					no_substep = 1
-				frames_list.append(frame)
-				float_frames_list.append(float(d))
-
-		if has_substep and no_substep:
-			self.mark_dirty = 1
-		elif self.mark_dirty:
-			pass
-		elif self.mark_singleframe:
-			self.version_files = 1
-			self.endfr = 0
-			self.startfr = 0
-			self.version_inc = 1
-			self.version_substep = 1
-		else:
-			self.version_files = len(frames_list)
-			self.endfr = int(max(frames_list))
-			self.startfr = int(min(frames_list))
-			if self.version_files > 0:
-				fct = Fraction((float(float_frames_list[1]) - float(float_frames_list[0])) / 1)
-				self.version_inc = fct.numerator
-				self.version_substep = fct.denominator
+
+		print(f"===================={inventory.name}======================")
+		# summary comes from the inventory or straight from the cache index
+		self.mark_dirty = inventory.mark_dirty
+		self.mark_singleframe = inventory.mark_singleframe
+		if not self.mark_dirty:
+			self.version_files = inventory.frame_count
+			self.missing_frames = inventory.missing_frames
+			self.bad_files = inventory.bad_files
+			self.startfr = inventory.startfr
+			self.endfr = inventory.endfr
+			self.version_inc = inventory.inc
+			self.version_substep = inventory.substep
 
 	def make_version_dict(self):
 		self.version_report = {}
@@ -225,35 +403,29 @@ class VersionWidget:
 class NodeWidget:
 	def __init__(self, node):
 		# Prepare data for nodeWidget
-		self.current_nodepath = node.path()
-		self.current_nodetype = node.type().name()
-		_loaded = node.parm("loadfromdisk").eval()
-		self.current_loaded = ["Unload", "Loaded"][int(_loaded)]
-		_filetype = node.parm("filetype").eval()
-		self.current_filetype = [".bgeo.sc", ".vdb"][int(_filetype)]
-		_timedependent = node.parm("timedependent").eval()
-		self.current_timedependent = ["SingleFramed", "TimeDependent"][int(_timedependent)]
-		_filemethod = node.parm("filemethod").eval()
-		self.current_filemethod = ["Constructed", "Explicit"][int(_filemethod)]
-		_version = node.parm("version").evalAsInt()
-		self.current_version = "v" + str(_version)
-		self.current_cachename = node.parm("basename").eval()
-		self.current_framerange = node.parmTuple("f").eval()  # float3 use __getitem__(index)
-		self.current_substeps = node.parm("substeps").evalAsInt()
+		self.info = CacheNodeInfo.from_node(node)
+		self.current_nodepath = self.info.path
+		self.current_nodetype = self.info.nodetype
+		self.current_loaded = self.info.loaded
+		self.current_filetype = self.info.filetype
+		self.current_timedependent = self.info.timedependent
+		self.current_filemethod = self.info.filemethod
+		self.current_version = self.info.version
+		self.current_cachename = self.info.cachename
+		self.current_framerange = self.info.framerange
+		self.current_substeps = self.info.substeps
 		# All above is preparation
 
-		self.local_versions = []  # list of scandir entries
-		self.current_cachefolder = node.parm("cachedir").eval().replace("\\", "/")
-		try:
-			self.local_main_folder = os.path.dirname(self.current_cachefolder)
-			self.local_main_folder_size = fsize(self.local_main_folder)
-			for entry in os.scandir(self.local_main_folder):
-				if not entry.name.startswith('.') and entry.is_dir():
-					self.local_versions.append(entry)
-		except FileNotFoundError:
-			self.local_versions = 0
-			self.num_versions = 0
-			print("no node_main_folder exist on drive")
+		self.current_cachefolder = self.info.cachedir
+		self.local_main_folder = os.path.dirname(self.current_cachefolder)
+		# filled by CacheScanner as version folders are walked in the thread pool
+		self.inventory = CacheInventory(self.local_main_folder)
+		self.local_versions = self.inventory.versions  # list of VersionInventory
+		self.local_main_folder_size = format_size(0)
+
+	def add_version(self, version):
+		self.inventory.add(version)
+		self.local_main_folder_size = format_size(self.inventory.total_bytes)
 
 	def make_node_dict(self):
 		self.node_report = {}
@@ -272,104 +444,78 @@ class NodeWidget:
 
 
 class SingleCacheNode:
-	def __init__(self, node, _mainwindow):
+	# Built in the GUI thread, CacheScanner feeds it with scanned versions through signals
+	def __init__(self, node, _mainwindow, index=None):
 		self.win = _mainwindow
 		self.node = node
-		self.getnodepanel()
-		self.getversionpanel()
-
-	def getnodepanel(self):
+		self.index = index
 		self.n = NodeWidget(self.node)
-		if self.n.local_versions:
-			self.node_dict = {}
-			self.num_versions = len(self.n.local_versions)
-			# CORE #########################################################
-			self.node_dict = self.n.make_node_dict()
-			self.nui = self.win.createNodeWidgets(self.node_dict)
-
-	def getversionpanel(self):
+		self.row = -1  # row in CacheTreeModel
+		self.status = ""
+		self.num_versions = 0
+		self.versions = []  # non dirty VersionWidget, children rows in CacheTreeModel
 		self.all_vui_nested_dict = {}
 		self.all_version_nested_dict = {}
-		if self.n.local_versions:
-			for i in range(0, self.num_versions):
-				self.version_dict = {}
-				_temp_version_dict = {}
-				_temp_vui_dict = {}
-				versionfolder = self.n.local_versions[i]
-				path = versionfolder.path.replace('\\', '/')
-				name = versionfolder.name
-				# CORE #########################################################
-				self.v = VersionWidget(self, path, name, self.n.current_filetype)
-				if not self.v.mark_dirty:
-					# jump over dirty caches
-					self.compare_version_to_node()
-					self.version_dict = self.v.make_version_dict()
-					_temp_vui_dict[f"v{i + 1}"] = self.v
-					_temp_version_dict[f"v{i + 1}"] = self.version_dict
-					self.all_vui_nested_dict.update(_temp_vui_dict)
-					self.all_version_nested_dict.update(_temp_version_dict)
-					self.vui = self.win.createVersionWidget(self.version_dict)
-					self.colorize_vui()
-
-				# print("version_dict : ", self.version_dict)
 
+	def getnodepanel(self, num_versions, loose_bytes):
+		self.num_versions = num_versions
+		self.n.inventory.total_bytes = loose_bytes
+		if self.num_versions:
+			self.node_dict = {}
+			# CORE #########################################################
+			self.node_dict = self.n.make_node_dict()
+			self.win.model.add_node(self)
+
+	def getversionpanel(self, versionfolder):
+		self.n.add_version(versionfolder)
+		i = len(self.n.local_versions) - 1
+		self.version_dict = {}
+		# CORE #########################################################
+		self.v = VersionWidget(self, versionfolder, self.n.current_filetype)
+		if not self.v.mark_dirty:
+			# jump over dirty caches
+			self.compare_version_to_node()
+			self.preset_clean()
+			self.version_dict = self.v.make_version_dict()
+			self.all_vui_nested_dict[f"v{i + 1}"] = self.v
+			self.all_version_nested_dict[f"v{i + 1}"] = self.version_dict
+			self.win.model.add_version(self, self.v)
+		elif self.num_versions:
+			self.win.model.node_changed(self)
+
+	def finish(self):
+		if self.index is not None:
+			self.index.prune(self.n.local_main_folder, [v.path for v in self.n.local_versions])
+		if self.num_versions:
+			self.compare_node_to_version()
+			self.loopvui()
+
+	def drop_version(self, version):
+		"""Forget a deleted version and tag the remaining ones again, the node may have changed since the scan."""
+		for key in [k for k, vui in self.all_vui_nested_dict.items() if vui is version]:
+			del self.all_vui_nested_dict[key]
+			del self.all_version_nested_dict[key]
+		if version.inventory in self.n.local_versions:
+			self.n.local_versions.remove(version.inventory)
+		try:
+			self.n.info = CacheNodeInfo.from_node(self.node)
+		except hou.ObjectWasDeleted:
+			pass
+		for key, vui in self.all_vui_nested_dict.items():
+			tag = tag_version(self.n.info, vui.inventory)
+			if tag != vui.tag:
+				vui.tag = tag
+				vui.mark_clean = int(tag != "currentversion")
+				self.all_version_nested_dict[key].update(tag=tag, clean=vui.mark_clean)
 		self.compare_node_to_version()
-		self.loopvui()
 
 	def compare_version_to_node(self):
-		if self.n.current_timedependent == "SingleFramed":
-			if self.v.mark_singleframe and (self.v.version == self.n.current_version):
-				# node require singleframe and version is singleframe and version matched
-				self.v.tag = "currentversion"
-			elif self.v.mark_singleframe:
-				# versions don't matched
-				self.v.tag = "notcurrentversion"
-			else:
-				# node require singleframe and version is sequence
-				self.v.tag = "notsingleframe"
-		else:
-			if self.v.version != self.n.current_version:
-				# both sequence but versions don't match
-				self.v.tag = "notcurrentversion"
-			elif (self.v.version == self.n.current_version and
-				  self.v.startfr == int(self.n.current_framerange[0]) and
-				  self.v.endfr + 1 == int(self.n.current_framerange[1]) and
-				  self.v.version_inc == int(self.n.current_framerange[2]) and
-				  self.v.version_substep == int(self.n.current_substeps) and
-				  self.v.version_inc > 1):
-				# special occasion when increments endframe = endframe_set_on_node - 1
-				self.v.tag = "currentversion"
-			elif (self.v.startfr != int(self.n.current_framerange[0]) or
-				  self.v.endfr != int(self.n.current_framerange[1]) or
-				  self.v.version_inc != int(self.n.current_framerange[2]) or
-				  self.v.version_substep != int(self.n.current_substeps)):
-				# versions matched but sequences don't match
-				self.v.tag = "framesdontmatch"
-			else:
-				# all match which is desired version
-				self.v.tag = "currentversion"
+		self.v.tag = tag_version(self.n.info, self.v.inventory)
 
 	def compare_node_to_version(self):
-		if self.n.current_timedependent == "SingleFramed":
-			self.nui.frame_12.setStyleSheet(_red)
-		if self.n.current_loaded == "Unload":
-			self.nui.frame_11.setStyleSheet(_red)
-		clean_list = []
-		tag_list = []
-		size_list = []
-		for version, version_dict in self.all_version_nested_dict.items():
-			clean_list.append(int(version_dict["clean"]))
-			size_list.append(str(version_dict["version_size"]))
-			tag_list.append(str(version_dict["tag"]))
-		if "framesdontmatch" in tag_list:
-			self.nui.label_cleaned_or_not.setText("Clean with Care")
-			self.nui.label_cleaned_or_not.setStyleSheet(_red)
-		elif "currentversion" not in tag_list:
-			self.nui.label_cleaned_or_not.setText("Clean All")
-			self.nui.label_cleaned_or_not.setStyleSheet(_red)
-		else:
-			self.nui.label_cleaned_or_not.setText("Clean Others")
-			self.nui.label_cleaned_or_not.setStyleSheet(_green)
+		tag_list = [str(version_dict["tag"]) for version_dict in self.all_version_nested_dict.values()]
+		self.status = node_status(tag_list)
+		self.win.model.node_changed(self)
 
 	def loopvui(self):
 		tag_state_list = []
@@ -377,46 +523,97 @@ class SingleCacheNode:
 			tag_state_list.append(_vui.tag)
 		print(tag_state_list)
 
-	def colorize_vui(self):
-		if self.v.tag == "framesdontmatch":
-			self.vui.widget.setStyleSheet(_red)
-			self.vui.checkBox.setChecked(1)
-			self.vui.checkBox.setText("Frames Dont Match")
-
-		if self.v.tag == "notsingleframe":
-			self.vui.widget.setStyleSheet(_grey)
-			self.vui.checkBox.setChecked(1)
-			self.vui.checkBox.setText("Not SingleFrame")
-
-		if self.v.tag == "notcurrentversion":
-			self.vui.widget.setStyleSheet(_grey)
-			self.vui.checkBox.setChecked(1)
-
-		if self.v.tag == "currentversion":
-			self.vui.widget.setStyleSheet(_green)
-			self.vui.checkBox.setChecked(0)
-			self.vui.checkBox.setText("Current Version")
-			self.v.tag = "currentversion"
-		pass
+	def preset_clean(self):
+		# everything but the current version is checked for cleaning by default
+		self.v.mark_clean = int(self.v.tag != "currentversion")
+
+
+class CacheScanner(QtCore.QObject):
+	# Filesystem work runs in a bounded thread pool, widgets are only built in the slots below (GUI thread)
+	rootListed = QtCore.Signal(object, object, object)  # SingleCacheNode, [DirEntry], loose bytes (past a C++ int)
+	versionScanned = QtCore.Signal(object, object)  # SingleCacheNode, VersionInventory
+	scanFailed = QtCore.Signal(object, str)
+
+	def __init__(self, cache_nodes, index=None, max_workers=_scan_threads):
+		super(CacheScanner, self).__init__()
+		self.cache_nodes = cache_nodes
+		self.index = index
+		self.pool = ThreadPoolExecutor(max_workers=max_workers)
+		self.pending = {}  # SingleCacheNode: version folders still in the pool
+		self.start_time = 0
+		self.rootListed.connect(self.on_root_listed, QtCore.Qt.QueuedConnection)
+		self.versionScanned.connect(self.on_version_scanned, QtCore.Qt.QueuedConnection)
+		self.scanFailed.connect(self.on_scan_failed, QtCore.Qt.QueuedConnection)
+
+	def start(self):
+		self.start_time = time.time()
+		for single in self.cache_nodes:
+			self.pending[single] = None
+			self.pool.submit(self.list_root, single, single.n.local_main_folder, single.n.current_filetype)
+
+	# worker threads ###################################################
+	def list_root(self, single, root, filetype):
+		try:
+			entries, loose_bytes = list_cache_root(root)
+		except OSError:
+			self.scanFailed.emit(single, "no node_main_folder exist on drive")
+			return
+		except Exception as e:
+			self.scanFailed.emit(single, f"{root} could not be listed: {e!r}")
+			return
+		self.rootListed.emit(single, entries, loose_bytes)
+		for entry in entries:
+			self.pool.submit(self.scan_version, single, entry, filetype)
+
+	def scan_version(self, single, entry, filetype):
+		versionfolder = None
+		try:
+			versionfolder = inventory_version(entry, filetype, self.index)
+		except Exception as e:
+			# unreadable folder, bad manifest or index data: reported, never left pending
+			print(f"{entry.path} could not be scanned: {e!r}")
+		finally:
+			self.versionScanned.emit(single, versionfolder)
+
+	# GUI thread #######################################################
+	def on_root_listed(self, single, entries, loose_bytes):
+		single.getnodepanel(len(entries), loose_bytes)
+		self.pending[single] = len(entries)
+		self.check_finished(single)
+
+	def on_version_scanned(self, single, versionfolder):
+		try:
+			if versionfolder is not None:
+				single.getversionpanel(versionfolder)
+		finally:
+			self.pending[single] -= 1
+			self.check_finished(single)
+
+	def on_scan_failed(self, single, message):
+		print(message)
+		self.pending[single] = 0
+		self.check_finished(single)
+
+	def check_finished(self, single):
+		if self.pending[single]:
+			return
+		del self.pending[single]
+		single.finish()
+		if not self.pending:
+			self.pool.shutdown(wait=False)
+			if self.index is not None:
+				self.index.save()
+			print(f"scanned {len(self.cache_nodes)} cache nodes in {time.time() - self.start_time:.2f}s")
 
 
 pane = hou.ui.paneTabOfType(hou.paneTabType.NetworkEditor)
 pane_node = pane.pwd()
 
-fileCacheNode = []
-prismCacheNode = []
-all_sop_nodes = hou.node("/obj/").allSubChildren()
-for i in all_sop_nodes:
-	if "filecacheprism" in i.type().name():
-		print("found filecacheprism node: ", i.path())
-		prismCacheNode.append(i)
-	if i.type().name() == "filecache::2.0":
-		print("found hou filecache node: ", i.path())
-		prismCacheNode.append(i)
+# every context, node types from JUPITER_CACHE_NODETYPES or jupiter_cachediscovery.default_cache_nodetypes
+prismCacheNode = find_cache_nodes()
+print(f"found {len(prismCacheNode)} cache nodes")
 
 main_win = CacheCleanWindow()
-for n in prismCacheNode:
-	test = SingleCacheNode(n, main_win)
-	# for v in range(1, test.num_versions):
-	# 	exec(f"test.v{v}.podcast_detail()")
-	pass
+cache_index = CacheIndex.for_cachedir(hou.getenv('CacheDir'))
+scanner = CacheScanner([SingleCacheNode(n, main_win, cache_index) for n in prismCacheNode], cache_index)
+scanner.start()
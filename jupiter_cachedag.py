@@ -0,0 +1,187 @@
+"""Cache every dirty filecache node in dependency order.
+
+Filecache nodes feeding each other (sim -> post -> mesh) form a DAG through their upstream networks.
+A node is dirty when its version on disk is missing or does not match its frame range, or when its
+parms, the parms of the nodes it reads from, or an upstream cache changed since it was last written.
+Valid outputs are reused, dirty nodes go to jupiter_cachequeue in topological order so independent
+branches cook in parallel and a cache only starts once its upstream caches are written.
+
+import jupiter_cachedag; jupiter_cachedag.cache_dirty()
+"""
+import hashlib
+import os
+
+import hou
+
+from jupiter_cachediscovery import find_cache_nodes
+from jupiter_cacheindex import CacheIndex
+from jupiter_cacheinventory import inventory_version, list_cache_root
+from jupiter_cachenode import CacheNodeInfo, tag_version
+
+fingerprint_key = "jupiter_fingerprint2"  # without node paths, the old ones would all read as changed
+# parms that only change how the node is displayed, loaded or written, not what it writes
+_ignored_parms = {
+	"loadfromdisk", "loadfromdiskonsave", "hardenbasename", "reload",  # read back
+	"targettopnetwork", "splitprocs", "prefetchframes",  # how and where it cooks
+	"basedir", "cachedir", "cachename", "basename", "ver", "subver", "file", "sopoutput",  # where, output_valid checks it
+}
+_ignored_templates = (hou.parmTemplateType.Button, hou.parmTemplateType.FolderSet,
+					  hou.parmTemplateType.Folder, hou.parmTemplateType.Separator, hou.parmTemplateType.Label)
+
+
+def _hash_parms(h, node):
+	# type and parms only, the path is the key: a rename or a move into a subnet changes nothing written
+	h.update(node.type().name().encode())
+	for p in node.parms():
+		if p.name() in _ignored_parms or p.parmTemplate().type() in _ignored_templates:
+			continue
+		if p.isDisabled():
+			# disable when: the parm does not apply with the current settings
+			continue
+		# rawValue is the expression text when there is one, same result on every frame
+		h.update(f"{p.name()}={p.rawValue()};".encode())
+
+
+def upstream_paths(node):
+	"""Paths of every node upstream, through inputs and node references."""
+	seen = set()
+	stack = list(node.inputs()) + list(node.references())
+	while stack:
+		n = stack.pop()
+		if n is None or n.path() in seen:
+			continue
+		seen.add(n.path())
+		stack.extend(n.inputs())
+		stack.extend(n.references())
+	return seen
+
+
+class CacheGraph:
+	def __init__(self, caches):
+		self.caches = {n.path(): n for n in caches}
+		self.fingerprints = {}
+		self.upstream = {}
+
+	def upstream_caches(self, node):
+		"""Nearest filecache nodes upstream, through inputs and node references (object merges, ch())."""
+		path = node.path()
+		if path not in self.upstream:
+			found = {}
+			seen = set()
+			stack = list(node.inputs()) + list(node.references())
+			while stack:
+				n = stack.pop()
+				if n is None or n.path() in seen:
+					continue
+				seen.add(n.path())
+				if n.path() in self.caches:
+					found[n.path()] = n
+				else:
+					stack.extend(n.inputs())
+					stack.extend(n.references())
+			self.upstream[path] = list(found.values())
+		return self.upstream[path]
+
+	def fingerprint(self, node):
+		"""Hash of the parms of the node and of everything upstream up to the next caches, whose
+		own fingerprint stands in for their networks."""
+		path = node.path()
+		if path not in self.fingerprints:
+			h = hashlib.sha1()
+			_hash_parms(h, node)
+			seen = {path}
+			stack = list(node.inputs()) + list(node.references())
+			upstream = []
+			while stack:
+				n = stack.pop()
+				if n is None or n.path() in seen:
+					continue
+				seen.add(n.path())
+				if n.path() in self.caches:
+					upstream.append(n)
+					continue
+				_hash_parms(h, n)
+				stack.extend(n.inputs())
+				stack.extend(n.references())
+			for fingerprint in sorted(self.fingerprint(n) for n in upstream):
+				h.update(fingerprint.encode())
+			self.fingerprints[path] = h.hexdigest()
+		return self.fingerprints[path]
+
+	def topological(self, nodes):
+		"""nodes and every cache upstream of them, upstream first."""
+		order = []
+		done = set()
+
+		def visit(node, stack):
+			path = node.path()
+			if path in done or path in stack:  # a loop through references is cooked in visiting order
+				return
+			stack.add(path)
+			for up in self.upstream_caches(node):
+				visit(up, stack)
+			stack.discard(path)
+			done.add(path)
+			order.append(node)
+
+		for node in nodes:
+			visit(node, set())
+		return order
+
+
+def output_valid(node, index=None):
+	"""The current version exists, has no missing or zero byte frames and matches the node frame range.
+	Small frames are fine, a sim starting with little geometry is not a broken cache."""
+	info = CacheNodeInfo.from_node(node)
+	if info.filemethod == "Explicit":
+		return os.path.exists(node.parm("file").eval())
+	try:
+		entries, _ = list_cache_root(info.main_folder)
+	except FileNotFoundError:
+		return False
+	for entry in entries:
+		if entry.name == info.version:
+			v = inventory_version(entry, info.filetype, index)
+			return not (v.mark_dirty or v.missing_frames or v.zero_byte_files) and tag_version(info, v) == "currentversion"
+	return False
+
+
+def store_fingerprint(node):
+	"""Remember what the node was written with, called once its cache is on disk."""
+	graph = CacheGraph(find_cache_nodes())
+	node.setUserData(fingerprint_key, graph.fingerprint(node))
+
+
+def dirty_nodes(nodes=None):
+	"""(node, reason) for every dirty cache among nodes and their upstream caches, in cook order."""
+	graph = CacheGraph(find_cache_nodes())
+	index = CacheIndex.for_cachedir(hou.getenv("CacheDir"))
+	dirty = {}
+	result = []
+	for node in graph.topological(nodes if nodes is not None else list(graph.caches.values())):
+		stored = node.userData(fingerprint_key)
+		if any(up.path() in dirty for up in graph.upstream_caches(node)):
+			reason = "upstream"
+		elif not output_valid(node, index):
+			reason = "missing"
+		elif stored is not None and stored != graph.fingerprint(node):
+			reason = "parms changed"
+		else:
+			# valid output, caches written before fingerprints existed are trusted as they are
+			continue
+		dirty[node.path()] = reason
+		result.append((node, reason))
+	if index is not None:
+		index.save()
+	return result
+
+
+def cache_dirty(nodes=None):
+	"""Queue every dirty cache (of the scene, or of nodes and their upstream) and show the queue panel."""
+	import jupiter_cachequeue
+	dirty = dirty_nodes(nodes)
+	for node, reason in dirty:
+		print(f"{node.path()}: {reason}")
+	if dirty:
+		jupiter_cachequeue.enqueue_selected([node for node, _ in dirty])
+	return dirty
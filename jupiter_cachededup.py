@@ -0,0 +1,220 @@
+"""Replace byte-identical frames across the versions of a filecache with hardlinks.
+
+python jupiter_cachededup.py .../88_Cache/Shots/a-rnd/fx/Effects/Cache_geo1_filecache1 --dry-run
+python jupiter_cachededup.py <cache main folder> [<cache main folder> ...] --include-latest
+
+Files are bucketed by size, buckets with more than one inode are hashed on their first 64K, then in full.
+The oldest version keeps its file, later versions get a hardlink to it. The newest version of every
+cache is left alone by default, it is the one a re-cache writes into and a rewrite in place would
+change every linked version. jupiter_cachequeue unshares a version before cooking into it: linked frames
+are copied, never removed, so a partial range re-cache keeps the frames outside its range.
+"""
+import argparse
+import hashlib
+import os
+import re
+import shutil
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from jupiter_cacheinventory import format_size, hardlink_info, list_cache_root
+from jupiter_cachemanifest import is_linked, load_manifest, mark_linked, save_manifest, unmark_linked
+
+_hash_threads = 8
+_prefix_bytes = 1 << 16
+_chunk_bytes = 1 << 20
+_version_num_re = re.compile(r'^v(\d+)')
+
+
+class DedupReport:
+	def __init__(self, dry_run=False):
+		self.dry_run = dry_run
+		self.linked = 0
+		self.bytes = 0
+		self.unlinkable = []  # (path, original, error)
+		self.unlinkable_bytes = 0
+		self.lock = threading.Lock()
+
+	def summary(self):
+		verb = "Would save" if self.dry_run else "Saved"
+		lines = [f"{verb} {format_size(self.bytes)} by linking {self.linked} duplicate frames"]
+		if self.unlinkable:
+			lines.append(f"{format_size(self.unlinkable_bytes)} in {len(self.unlinkable)} duplicates "
+						 f"could not be linked:")
+			for path, original, error in self.unlinkable:
+				lines.append(f"duplicate {path} of {original}: {error}")
+		return "\n".join(lines)
+
+
+def version_number(name):
+	m = _version_num_re.match(name)
+	return int(m.group(1)) if m else -1
+
+
+def list_version_files(root, include_latest=False):
+	"""(version path, [(path, size, dev, ino)]) of a cache main folder, oldest version first."""
+	entries, _ = list_cache_root(root)
+	entries.sort(key=lambda e: (version_number(e.name), e.name))
+	if entries and not include_latest:
+		entries = entries[:-1]
+	versions = []
+	for entry in entries:
+		files = []
+		stack = [entry.path]
+		while stack:
+			for f in os.scandir(stack.pop()):
+				if f.is_dir(follow_symlinks=False):
+					stack.append(f.path)
+				elif f.is_file(follow_symlinks=False):
+					st = f.stat(follow_symlinks=False)
+					if st.st_size:
+						files.append((f.path.replace('\\', '/'), st.st_size, st.st_dev, st.st_ino))
+		versions.append((entry.path.replace('\\', '/'), files))
+	return versions
+
+
+def hash_file(path, limit=None):
+	h = hashlib.blake2b(digest_size=16)
+	remaining = limit
+	with open(path, 'rb') as f:
+		while True:
+			chunk = f.read(_chunk_bytes if remaining is None else min(_chunk_bytes, remaining))
+			if not chunk:
+				break
+			h.update(chunk)
+			if remaining is not None:
+				remaining -= len(chunk)
+				if not remaining:
+					break
+	return h.digest()
+
+
+def split_by_hash(pool, groups, limit=None):
+	"""Split every group of candidate files on a hash, keep the parts that still hold two inodes or more."""
+	result = []
+	for group, digests in zip(groups, [pool.map(lambda c: hash_file(c[0], limit), g) for g in groups]):
+		parts = {}
+		for candidate, digest in zip(group, digests):
+			parts.setdefault(digest, []).append(candidate)
+		result += [p for p in parts.values() if len(set((c[2], c[3]) for c in p)) > 1]
+	return result
+
+
+def find_duplicates(versions, max_workers=_hash_threads):
+	"""Groups of identical files, in version order, the first one is kept."""
+	by_size = {}
+	for _, files in versions:
+		for candidate in files:
+			by_size.setdefault(candidate[1], []).append(candidate)
+	groups = [g for g in by_size.values() if len(set((c[2], c[3]) for c in g)) > 1]
+	with ThreadPoolExecutor(max_workers=max_workers) as pool:
+		groups = split_by_hash(pool, [g for g in groups if g[0][1] > _prefix_bytes], _prefix_bytes) + \
+			[g for g in groups if g[0][1] <= _prefix_bytes]
+		return split_by_hash(pool, groups)
+
+
+def link_duplicate(original, duplicate):
+	# link next to the duplicate then rename over it, the frame is never missing
+	tmp = f'{duplicate}.{os.getpid()}.dedup'
+	os.link(original, tmp)
+	try:
+		os.replace(tmp, duplicate)
+	except OSError:
+		os.remove(tmp)
+		raise
+
+
+def dedup_cache_root(root, dry_run=False, include_latest=False, report=None, max_workers=_hash_threads):
+	"""Link identical frames of one cache main folder, blocks, run it off the UI thread."""
+	report = report or DedupReport(dry_run)
+	versions = list_version_files(root, include_latest)
+	# manifests still valid now are kept valid, linking only changes the folder mtime
+	manifests = {path: load_manifest(path) for path, _ in versions}
+	touched = set()
+	linked = set()  # folders of originals and links
+	for group in find_duplicates(versions, max_workers):
+		original = group[0]
+		for candidate in group[1:]:
+			if (candidate[2], candidate[3]) == (original[2], original[3]):
+				continue
+			if candidate[2] != original[2]:
+				error = "on another device"
+			elif dry_run:
+				error = None
+			else:
+				try:
+					link_duplicate(original[0], candidate[0])
+					error = None
+				except OSError as e:
+					error = str(e)
+			with report.lock:
+				if error is None:
+					report.linked += 1
+					report.bytes += candidate[1]
+				else:
+					report.unlinkable.append((candidate[0], original[0], error))
+					report.unlinkable_bytes += candidate[1]
+			if error is None:
+				touched.add(candidate[0].rsplit('/', 1)[0])
+				linked.update((candidate[0].rsplit('/', 1)[0], original[0].rsplit('/', 1)[0]))
+	if not dry_run:
+		for path, manifest in manifests.items():
+			if any(t == path or t.startswith(path + '/') for t in linked):
+				mark_linked(path)
+			if manifest is not None and any(t == path or t.startswith(path + '/') for t in touched):
+				manifest["summary"]["mtime"] = os.stat(path).st_mtime
+				save_manifest(path, manifest)
+	return report
+
+
+def dedup_cache_roots(roots, dry_run=False, include_latest=False, max_workers=_hash_threads):
+	report = DedupReport(dry_run)
+	for root in roots:
+		try:
+			dedup_cache_root(root, dry_run, include_latest, report, max_workers)
+		except OSError as e:
+			report.unlinkable.append((root, "", str(e)))
+	return report
+
+
+def unshare_version(path):
+	"""Give every frame of a version hardlinked elsewhere its own copy, before a cook writes into it again.
+
+	Copy on write: the copy is renamed over the link, frames the cook does not rewrite keep their data.
+	"""
+	if not is_linked(path):
+		return 0
+	copied = 0
+	try:
+		for f in os.scandir(path):
+			if f.is_file(follow_symlinks=False) and hardlink_info(f) is not None:
+				tmp = f'{f.path}.{os.getpid()}.tmp'
+				try:
+					shutil.copyfile(f.path, tmp)
+					os.replace(tmp, f.path)
+				except OSError:
+					if os.path.exists(tmp):
+						os.remove(tmp)
+					raise
+				copied += 1
+	except OSError:
+		return copied
+	unmark_linked(path)
+	return copied
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description="Hardlink identical frames across the versions of caches")
+	parser.add_argument('roots', nargs='+', help="cache main folders holding v1, v2, ...")
+	parser.add_argument('--dry-run', action='store_true', help="only report what would be linked")
+	parser.add_argument('--include-latest', action='store_true', help="also link frames of the newest version")
+	parser.add_argument('--workers', type=int, default=_hash_threads, help="hashing threads")
+	args = parser.parse_args(argv)
+	report = dedup_cache_roots(args.roots, args.dry_run, args.include_latest, args.workers)
+	print(report.summary())
+	return int(bool(report.unlinkable))
+
+
+if __name__ == '__main__':
+	sys.exit(main())
@@ -0,0 +1,149 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from jupiter_cacheinventory import format_size, hardlink_info
+from jupiter_cachemanifest import is_linked, remove_manifest, unmark_linked
+
+_delete_threads = 16  # concurrent unlinks, network shares are latency bound
+_chunk_files = 256  # files removed per pool task
+
+
+# Batch deletion of cache version folders checked in the cleaner window.
+# Version folders are listed once, their files removed in chunks by a thread pool,
+# then the emptied folders are removed bottom up. Progress is reported in files and bytes.
+class DeleteJob:
+	def __init__(self, path, tag="", label=""):
+		self.path = path
+		self.tag = tag
+		self.label = label or path
+
+
+class DeleteReport:
+	def __init__(self, dry_run=False):
+		self.dry_run = dry_run
+		self.files = 0
+		self.bytes = 0
+		self.total_files = 0
+		self.total_bytes = 0
+		self.deleted = []  # version paths
+		self.skipped = []  # (path, reason)
+		self.failed = []  # (path, error)
+		self.lock = threading.Lock()
+
+	def add(self, files, size):
+		with self.lock:
+			self.files += files
+			self.bytes += size
+			return self.files, self.bytes
+
+	def summary(self):
+		verb = "Would reclaim" if self.dry_run else "Reclaimed"
+		lines = [f"{verb} {format_size(self.bytes)} in {self.files} files from {len(self.deleted)} versions"]
+		for path, reason in self.skipped:
+			lines.append(f"skipped {path}: {reason}")
+		for path, error in self.failed:
+			lines.append(f"failed {path}: {error}")
+		return "\n".join(lines)
+
+
+def list_files(path, links=None):
+	"""All files under a version folder as (path, size), plus its folders deepest first.
+
+	Hardlinked files are listed with size 0 and collected in links, (st_dev, st_ino) -> [size, nlink, [paths]].
+	"""
+	files = []
+	dirs = [path]
+	i = 0
+	while i < len(dirs):
+		for entry in os.scandir(dirs[i]):
+			if entry.is_dir(follow_symlinks=False):
+				dirs.append(entry.path)
+				continue
+			st = entry.stat(follow_symlinks=False)
+			link = hardlink_info(entry, st) if links is not None else None
+			if link is None:
+				files.append((entry.path, st.st_size))
+				continue
+			key, nlink = link
+			links.setdefault(key, [st.st_size, nlink, []])[2].append(entry.path)
+			files.append((entry.path, 0))
+		i += 1
+	return files, dirs[::-1]
+
+
+def count_links(listed, links):
+	"""Give a hardlinked file its bytes on one of its paths when every link is deleted, nothing frees them otherwise."""
+	owners = {}
+	for size, nlink, paths in links.values():
+		if len(paths) >= nlink:
+			owners[paths[0]] = size
+	if not owners:
+		return listed
+	return [(job, [(path, owners.get(path, size)) for path, size in files], dirs) for job, files, dirs in listed]
+
+
+def remove_chunk(chunk, report, dry_run, progress):
+	files = 0
+	size = 0
+	for path, file_size in chunk:
+		if not dry_run:
+			try:
+				os.remove(path)
+			except OSError as e:
+				with report.lock:
+					report.failed.append((path, str(e)))
+				continue
+		files += 1
+		size += file_size
+	done = report.add(files, size)
+	if progress is not None:
+		progress(done[0], done[1], report.total_files, report.total_bytes)
+
+
+def delete_versions(jobs, dry_run=False, max_workers=_delete_threads, progress=None):
+	"""Remove every DeleteJob folder, never a job tagged currentversion. Blocks, run it off the UI thread.
+
+	progress(files_done, bytes_done, files_total, bytes_total) is called from worker threads.
+	"""
+	report = DeleteReport(dry_run)
+	listed = []
+	links = {}
+	for job in jobs:
+		if job.tag == "currentversion":
+			report.skipped.append((job.path, "current version of its node"))
+			continue
+		if not os.path.isdir(job.path):
+			report.skipped.append((job.path, "not a directory"))
+			continue
+		try:
+			# only versions marked by jupiter_cachededup are checked for links
+			files, dirs = list_files(job.path, links if is_linked(job.path) else None)
+		except OSError as e:
+			report.failed.append((job.path, str(e)))
+			continue
+		listed.append((job, files, dirs))
+	listed = count_links(listed, links)
+	for job, files, dirs in listed:
+		report.total_files += len(files)
+		report.total_bytes += sum(size for _, size in files)
+
+	with ThreadPoolExecutor(max_workers=max_workers) as pool:
+		for job, files, dirs in listed:
+			for i in range(0, len(files), _chunk_files):
+				pool.submit(remove_chunk, files[i:i + _chunk_files], report, dry_run, progress)
+
+	# folders are emptied now, remove them deepest first
+	for job, files, dirs in listed:
+		if dry_run:
+			report.deleted.append(job.path)
+			continue
+		try:
+			for d in dirs:
+				os.rmdir(d)
+			remove_manifest(job.path)
+			unmark_linked(job.path)
+			report.deleted.append(job.path)
+		except OSError as e:
+			report.failed.append((job.path, str(e)))
+	return report
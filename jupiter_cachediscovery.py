@@ -0,0 +1,90 @@
+"""Find filecache nodes by asking their node types for instances instead of walking the scene.
+
+hython jupiter_cachediscovery.py shot.hip    # benchmark against the /obj allSubChildren traversal
+"""
+import fnmatch
+import os
+import sys
+import time
+
+import hou
+
+# type name patterns of cache nodes, override with JUPITER_CACHE_NODETYPES="filecache::2.0;*filecacheprism*"
+default_cache_nodetypes = ("filecache::2.0", "*filecacheprism*")
+_session = {"types": None, "patterns": None, "callback": False}
+
+
+def cache_nodetype_patterns():
+	env = os.environ.get("JUPITER_CACHE_NODETYPES")
+	if env:
+		return tuple(p.strip() for p in env.replace(',', ';').split(';') if p.strip())
+	return default_cache_nodetypes
+
+
+def _on_hip_event(event_type):
+	# a new or merged hip can bring new HDA definitions with it
+	if event_type in (hou.hipFileEventType.AfterLoad, hou.hipFileEventType.AfterClear,
+					  hou.hipFileEventType.AfterMerge):
+		_session["types"] = None
+
+
+def cache_nodetypes(patterns=None):
+	"""Registered node types matching the patterns in every context, resolved once per hip session."""
+	patterns = tuple(patterns or cache_nodetype_patterns())
+	if _session["types"] is not None and _session["patterns"] == patterns:
+		return _session["types"]
+	types = []
+	for category in hou.nodeTypeCategories().values():
+		for name, nodetype in category.nodeTypes().items():
+			if any(fnmatch.fnmatchcase(name, p) for p in patterns):
+				types.append(nodetype)
+	_session["types"] = types
+	_session["patterns"] = patterns
+	if not _session["callback"]:
+		hou.hipFile.addEventCallback(_on_hip_event)
+		_session["callback"] = True
+	return types
+
+
+def find_cache_nodes(patterns=None):
+	"""Every cache node in the scene, all contexts, sorted by path.
+
+	Only the type lookup is cached, instances() is kept per type by Houdini so new nodes are never missed.
+	"""
+	nodes = []
+	for nodetype in cache_nodetypes(patterns):
+		nodes.extend(nodetype.instances())
+	nodes.sort(key=lambda n: n.path())
+	return nodes
+
+
+def find_cache_nodes_traversal():
+	# the original cleaner lookup, kept for the benchmark
+	found = []
+	for i in hou.node("/obj/").allSubChildren():
+		if "filecacheprism" in i.type().name() or i.type().name() == "filecache::2.0":
+			found.append(i)
+	return found
+
+
+def benchmark(repeat=5):
+	results = {}
+	for label, func in (("traversal", find_cache_nodes_traversal),
+						("instances (cold)", lambda: (_session.update(types=None), find_cache_nodes())[1]),
+						("instances (cached)", find_cache_nodes)):
+		best = None
+		for _ in range(repeat):
+			start = time.perf_counter()
+			found = func()
+			elapsed = time.perf_counter() - start
+			best = elapsed if best is None else min(best, elapsed)
+		results[label] = (best, len(found))
+		print(f"{label:20s} {best * 1000:9.2f} ms  {len(found)} cache nodes")
+	return results
+
+
+if __name__ == '__main__':
+	for hip in sys.argv[1:]:
+		hou.hipFile.load(hip, suppress_save_prompt=True, ignore_load_warnings=True)
+		print(f"{hip}: {len(hou.node('/').allSubChildren())} nodes")
+		benchmark()
@@ -0,0 +1,71 @@
+import json
+import os
+import threading
+
+from jupiter_cacheinventory import VersionInventory
+
+INDEX_NAME = '.jupiter_cacheindex.json'
+INDEX_VERSION = 3
+
+
+# Persistent version-folder metadata for the cache cleaner, stored as a sidecar under $CacheDir:
+# A:/Projects/3d/Houdini_essential/vellum_meat/88_Cache/.jupiter_cacheindex.json
+# Entries are keyed by version path and only trusted while the folder mtime is unchanged.
+# Adding, removing or renaming a frame bumps the mtime, rewriting a frame in place does not.
+class CacheIndex:
+	def __init__(self, index_file):
+		self.index_file = index_file
+		self.entries = {}
+		self.changed = 0
+		self.lock = threading.Lock()  # lookup/store are called from the scan thread pool
+		self.load()
+
+	@classmethod
+	def for_cachedir(cls, cachedir):
+		if not cachedir or not os.path.isdir(cachedir):
+			return None
+		return cls(os.path.join(cachedir, INDEX_NAME).replace('\\', '/'))
+
+	def load(self):
+		try:
+			with open(self.index_file, 'r') as f:
+				data = json.load(f)
+		except (OSError, ValueError):
+			return
+		if data.get("version") == INDEX_VERSION:
+			self.entries = data.get("entries", {})
+
+	def save(self):
+		if not self.changed:
+			return
+		tmp = f'{self.index_file}.{os.getpid()}.tmp'
+		try:
+			with self.lock:
+				data = json.dumps({"version": INDEX_VERSION, "entries": self.entries})
+			with open(tmp, 'w') as f:
+				f.write(data)
+			os.replace(tmp, self.index_file)
+			self.changed = 0
+		except OSError as e:
+			print(f'Could not write cache index {self.index_file}: {e}')
+
+	def lookup(self, name, path, mtime, filetype):
+		with self.lock:
+			entry = self.entries.get(path)
+		if entry and entry["mtime"] == mtime and entry["filetype"] == filetype:
+			return VersionInventory.from_index(name, path, entry)
+		return None
+
+	def store(self, version, filetype):
+		with self.lock:
+			self.entries[version.path] = version.to_index(filetype)
+			self.changed = 1
+
+	def prune(self, root, seen):
+		# forget version folders of this root that are gone from disk
+		prefix = root.replace('\\', '/').rstrip('/') + '/'
+		with self.lock:
+			for path in [p for p in self.entries if p.startswith(prefix) and '/' not in p[len(prefix):]]:
+				if path not in seen:
+					del self.entries[path]
+					self.changed = 1
@@ -0,0 +1,250 @@
+import os
+import time
+
+from jupiter_cachemanifest import load_manifest, save_manifest
+from jupiter_framesequence import FrameSequence, frame_re
+
+
+# Single-pass inventory of a filecache main folder, e.g.
+# A:/Projects/3d/Houdini_essential/vellum_meat/88_Cache/Shots/a-rnd/fx/Effects/Cache_geo1_filecache1
+#     v1/Cache_geo1_filecache1_v1.0001.bgeo.sc
+#     v2/Cache_geo1_filecache1_v2.0001.000.bgeo.sc
+# Every version folder is walked exactly once with os.scandir, the cleaner reads everything from here.
+def folder_size(path):
+	total = 0
+	for entry in os.scandir(path):
+		if entry.is_file():
+			total += entry.stat().st_size
+		elif entry.is_dir():
+			total += folder_size(entry.path)
+	return total
+
+
+def hardlink_info(entry, st=None):
+	"""((st_dev, st_ino), st_nlink) of a file hardlinked by jupiter_cachededup, None for a plain file.
+
+	Reuses the stat of the listing, only on Windows is a second one needed: call it for marked versions only.
+	"""
+	st = st or entry.stat(follow_symlinks=False)
+	if os.name == 'nt' and not st.st_nlink:
+		# scandir leaves st_nlink and st_ino empty on Windows
+		st = os.stat(entry.path, follow_symlinks=False)
+	return ((st.st_dev, st.st_ino), st.st_nlink) if st.st_nlink > 1 else None
+
+
+def format_size(size: int) -> str:
+	for unit in ("B", "K", "M", "G", "T"):
+		if size < 1024:
+			break
+		size /= 1024
+	return f"{size:.2f}{unit}"
+
+
+class VersionInventory:
+	def __init__(self, name, path):
+		self.name = name
+		self.path = path
+		self.mtime = 0.0
+		self.total_bytes = 0
+		self.file_count = 0  # entries directly inside the version folder
+		self.sequence = None  # jupiter_framesequence.FrameSequence, only when walked on disk
+		# summary, filled by summarize() or restored from the cache index
+		self.startfr = 0
+		self.endfr = 0
+		self.inc = 1
+		self.substep = 1
+		self.frame_count = 0
+		self.missing_frames = 0
+		self.bad_files = 0  # zero byte or truncated frames
+		self.zero_byte_files = 0  # unreadable frames only, truncated is a size heuristic
+		self.mark_dirty = 0
+		self.mark_singleframe = 0
+		self.rescanned = 0  # 1 when walked on disk, 0 when restored from the index
+
+	def summarize(self):
+		seq = self.sequence.analyze()
+		if self.file_count == 1:
+			# single frame like: Cache_box_high3_v3.bgeo.sc
+			self.mark_singleframe = 1
+			self.frame_count = 1
+			return
+		if not len(seq) or (seq.has_substep and seq.no_substep):
+			# only folder exist but no cache files, or mixed substep and no substep files
+			self.mark_dirty = 1
+			return
+		self.startfr = int(seq.start)
+		self.endfr = int(seq.end)
+		self.inc = seq.inc
+		self.substep = seq.substep
+		self.frame_count = len(seq)
+		self.missing_frames = len(seq.missing)
+		self.bad_files = len(seq.zero_byte) + len(seq.truncated)
+		self.zero_byte_files = len(seq.zero_byte)
+
+	def to_index(self, filetype):
+		return {
+			"mtime": self.mtime,
+			"filetype": filetype,
+			"size": self.total_bytes,
+			"files": self.file_count,
+			"start": self.startfr,
+			"end": self.endfr,
+			"inc": self.inc,
+			"substep": self.substep,
+			"frames": self.frame_count,
+			"missing": self.missing_frames,
+			"bad": self.bad_files,
+			"zero": self.zero_byte_files,
+			"dirty": self.mark_dirty,
+			"singleframe": self.mark_singleframe,
+		}
+
+	@classmethod
+	def from_index(cls, name, path, entry):
+		v = cls(name, path)
+		v.mtime = entry["mtime"]
+		v.total_bytes = entry["size"]
+		v.file_count = entry["files"]
+		v.startfr = entry["start"]
+		v.endfr = entry["end"]
+		v.inc = entry["inc"]
+		v.substep = entry["substep"]
+		v.frame_count = entry["frames"]
+		v.missing_frames = entry["missing"]
+		v.bad_files = entry["bad"]
+		v.zero_byte_files = entry["zero"]
+		v.mark_dirty = entry["dirty"]
+		v.mark_singleframe = entry["singleframe"]
+		return v
+
+
+class CacheInventory:
+	def __init__(self, root):
+		self.root = root
+		self.total_bytes = 0
+		self.versions = []  # VersionInventory in scandir order
+		self.rescanned = 0  # version folders actually walked, the rest came from the index
+
+	def add(self, version):
+		self.versions.append(version)
+		self.total_bytes += version.total_bytes
+		self.rescanned += version.rescanned
+
+
+def scan_version(entry, filetype, files=None):
+	"""Walk one version folder once: bytes, file count, frame sequence and summary.
+
+	files, when given, gets (name, size, mtime) of every file for the version manifest.
+	"""
+	v = VersionInventory(entry.name, entry.path.replace('\\', '/'))
+	v.mtime = entry.stat().st_mtime
+	v.sequence = FrameSequence(filetype)
+	for f in os.scandir(entry.path):
+		v.file_count += 1
+		if f.is_file():
+			st = f.stat()
+			v.total_bytes += st.st_size
+			v.sequence.add(f.name, st.st_size)
+			if files is not None:
+				files.append((f.name, st.st_size, st.st_mtime))
+		elif f.is_dir():
+			v.total_bytes += folder_size(f.path)
+	v.summarize()
+	return v
+
+
+def list_cache_root(root):
+	"""One scandir of the main folder: version folder entries and bytes of loose files and hidden folders."""
+	entries = []
+	loose_bytes = 0
+	for entry in os.scandir(root):
+		if entry.is_dir():
+			if entry.name.startswith('.'):
+				loose_bytes += folder_size(entry.path)
+			else:
+				entries.append(entry)
+		elif entry.is_file():
+			loose_bytes += entry.stat().st_size
+	return entries, loose_bytes
+
+
+def inventory_version(entry, filetype, index=None):
+	"""Version summary from the index or the version manifest when the folder mtime is unchanged,
+	walked otherwise. Thread safe."""
+	v = None
+	path = entry.path.replace('\\', '/')
+	mtime = entry.stat().st_mtime
+	if index is not None:
+		v = index.lookup(entry.name, path, mtime, filetype)
+	if v is None:
+		manifest = load_manifest(path, mtime)
+		if manifest is not None and manifest["summary"]["filetype"] == filetype:
+			v = VersionInventory.from_index(entry.name, path, manifest["summary"])
+			if index is not None:
+				index.store(v, filetype)
+	if v is None:
+		v = scan_version(entry, filetype)
+		v.rescanned = 1
+		if index is not None:
+			index.store(v, filetype)
+	return v
+
+
+def version_entry(path):
+	"""DirEntry of one version folder, None when it does not exist."""
+	parent, name = path.replace('\\', '/').rstrip('/').rsplit('/', 1)
+	try:
+		return next((e for e in os.scandir(parent) if e.name == name and e.is_dir()), None)
+	except OSError:
+		return None
+
+
+def inventory_path(path, filetype, index=None):
+	"""inventory_version of a single version folder by path, None when it does not exist."""
+	entry = version_entry(path)
+	return inventory_version(entry, filetype, index) if entry is not None else None
+
+
+def scan_cache_root(root, filetype, index=None):
+	"""Walk a cache main folder once, raises FileNotFoundError when it does not exist.
+
+	With a jupiter_cacheindex.CacheIndex only version folders whose mtime changed are walked.
+	"""
+	inventory = CacheInventory(root)
+	entries, inventory.total_bytes = list_cache_root(root)
+	for entry in entries:
+		inventory.add(inventory_version(entry, filetype, index))
+	if index is not None:
+		index.prune(root, [v.path for v in inventory.versions])
+	return inventory
+
+
+def write_manifest(info):
+	"""Walk the version a jupiter_cachenode.CacheNodeInfo just wrote and save its manifest next to it."""
+	version_path = info.cachedir.rstrip('/')
+	entry = version_entry(version_path)
+	if entry is None:
+		return None
+	files = []
+	v = scan_version(entry, info.filetype, files)
+	regex = frame_re(info.filetype)
+	frames = []
+	for filename, size, mtime in files:
+		m = regex.match(filename)
+		if m is not None:
+			frame, sub = m.group('frame', 'sub')
+			frames.append((float(frame if sub is None else f'{frame}.{sub}'), size, mtime))
+	frames.sort()
+	mtimes = [mtime for _, _, mtime in files]
+	return save_manifest(version_path, {
+		"summary": v.to_index(info.filetype),
+		"node": info.path,
+		"hipfile": info.hipfile,
+		"framerange": list(info.framerange),
+		"substeps": info.substeps,
+		"filetype": info.filetype,
+		"first_write": min(mtimes, default=0.0),
+		"last_write": max(mtimes, default=0.0),
+		"written": time.time(),
+		"frames": frames,  # (frame, bytes, mtime)
+	})
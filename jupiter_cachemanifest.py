@@ -0,0 +1,77 @@
+import json
+import os
+
+MANIFEST_VERSION = 2
+
+
+# Manifest of one cache version, written by the FileCache HDA right after a save:
+# .../Cache_geo1_filecache1/v3                       version folder, only frames inside
+# .../Cache_geo1_filecache1/.v3.jupiter_manifest.json  this manifest, next to it
+# It holds the VersionInventory summary (same fields as the cache index), the node that wrote it
+# and every frame with its size and mtime. Readers trust it while the version folder mtime is unchanged,
+# otherwise they walk the folder like before.
+def manifest_path(version_path):
+	version_path = version_path.replace('\\', '/').rstrip('/')
+	parent, name = version_path.rsplit('/', 1)
+	return f'{parent}/.{name}.jupiter_manifest.json'
+
+
+def load_manifest(version_path, mtime=None):
+	"""The manifest dict, None when there is none, it is unreadable or the folder changed since."""
+	try:
+		with open(manifest_path(version_path), 'r') as f:
+			data = json.load(f)
+		if mtime is None:
+			mtime = os.stat(version_path).st_mtime
+	except (OSError, ValueError):
+		return None
+	if data.get("version") != MANIFEST_VERSION or data.get("summary", {}).get("mtime") != mtime:
+		return None
+	return data
+
+
+def save_manifest(version_path, data):
+	data = dict(data, version=MANIFEST_VERSION)
+	path = manifest_path(version_path)
+	tmp = f'{path}.{os.getpid()}.tmp'
+	try:
+		with open(tmp, 'w') as f:
+			json.dump(data, f)
+		os.replace(tmp, path)
+	except OSError as e:
+		print(f'Could not write cache manifest {path}: {e}')
+		return None
+	return path
+
+
+def remove_manifest(version_path):
+	try:
+		os.remove(manifest_path(version_path))
+	except OSError:
+		pass
+
+
+# Marker of a version holding frames hardlinked by jupiter_cachededup, next to it like the manifest:
+# .../Cache_geo1_filecache1/.v3.jupiter_links
+# Link counts are only read for marked versions, on Windows scandir has none and every frame costs a stat.
+def links_marker_path(version_path):
+	return manifest_path(version_path)[:-len('jupiter_manifest.json')] + 'jupiter_links'
+
+
+def mark_linked(version_path):
+	try:
+		with open(links_marker_path(version_path), 'w'):
+			pass
+	except OSError as e:
+		print(f'Could not mark linked version {version_path}: {e}')
+
+
+def is_linked(version_path):
+	return os.path.exists(links_marker_path(version_path))
+
+
+def unmark_linked(version_path):
+	try:
+		os.remove(links_marker_path(version_path))
+	except OSError:
+		pass
@@ -0,0 +1,200 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from jupiter_cacheinventory import format_size
+
+_mirror_dir = os.environ.get('JUPITER_MIRROR_DIR', os.path.join(tempfile.gettempdir(), 'jupiter_mirror'))
+_mirror_bytes = int(float(os.environ.get('JUPITER_MIRROR_GB', 100)) * (1 << 30))
+_copy_threads = 2  # version folders copied at the same time
+_recheck_seconds = 10.0  # a source file is stat'ed again after this long
+_save_seconds = 30.0  # read times are written to the state file at most this often
+_store = None
+
+
+# Local mirror of cache versions read from shared storage, opt in per filecache node.
+# The first read of a frame queues a copy of its whole version folder to the local scratch dir,
+# $TEMP/jupiter_mirror/<hash>_<version> by default; reads resolve to the local copy once the folder
+# is complete and each file still has the size and mtime of its source. Frames written to the source after the
+# copy change its folder mtime, only those are copied on the next request. Least recently read versions
+# are evicted to stay under JUPITER_MIRROR_GB. State lives in <scratch>/.jupiter_mirror.json.
+class MirrorStore:
+	def __init__(self, root=_mirror_dir, max_bytes=_mirror_bytes):
+		self.root = root.replace('\\', '/').rstrip('/')
+		self.max_bytes = max_bytes
+		self.state_file = f'{self.root}/.jupiter_mirror.json'
+		self.entries = {}  # source version folder -> {"local", "bytes", "last_used", "complete", "files", "mtime"}
+		self.checked = {}  # source file or version folder -> (checked at, fresh)
+		self.copying = set()
+		self.skipped = {}  # source version folder -> folder mtime, too large to mirror
+		self.saved_at = 0.0
+		self.lock = threading.Lock()
+		self.pool = ThreadPoolExecutor(max_workers=_copy_threads)
+		self.load()
+
+	def load(self):
+		try:
+			with open(self.state_file, 'r') as f:
+				self.entries = json.load(f)
+		except (OSError, ValueError):
+			self.entries = {}
+		# copies interrupted by a crash or a closed session start over
+		self.entries = {k: v for k, v in self.entries.items() if v.get("complete") and os.path.isdir(v["local"])}
+
+	def save(self):
+		os.makedirs(self.root, exist_ok=True)
+		tmp = f'{self.state_file}.{os.getpid()}.tmp'
+		with self.lock:
+			data = json.dumps(self.entries)
+			self.saved_at = time.time()
+		try:
+			with open(tmp, 'w') as f:
+				f.write(data)
+			os.replace(tmp, self.state_file)
+		except OSError as e:
+			print(f'Could not write mirror state {self.state_file}: {e}')
+
+	def local_dir(self, source_dir):
+		digest = hashlib.sha1(source_dir.encode()).hexdigest()[:12]
+		return f'{self.root}/{digest}_{source_dir.rsplit("/", 1)[-1]}'
+
+	def resolve(self, path):
+		"""Local copy of a cache file when it is mirrored and fresh, the path itself otherwise."""
+		path = path.replace('\\', '/')
+		source_dir, name = path.rsplit('/', 1)
+		with self.lock:
+			entry = self.entries.get(source_dir)
+			record = entry["files"].get(name) if entry and entry["complete"] else None
+		if record is not None:
+			if self.fresh(path, record):
+				now = time.time()
+				with self.lock:
+					entry["last_used"] = now
+					save = now - self.saved_at > _save_seconds
+				if save:
+					# keeps the LRU order for the next session
+					self.save()
+				return f'{entry["local"]}/{name}'
+			# source was rewritten, mirror it again
+			self.drop(source_dir)
+		self.request(source_dir)
+		return path
+
+	def fresh(self, path, record):
+		now = time.time()
+		checked = self.checked.get(path)
+		if checked is not None and now - checked[0] < _recheck_seconds:
+			return checked[1]
+		try:
+			st = os.stat(path)
+			fresh = st.st_size == record[0] and st.st_mtime == record[1]
+		except OSError:
+			fresh = False
+		self.checked[path] = (now, fresh)
+		return fresh
+
+	def request(self, source_dir):
+		now = time.time()
+		with self.lock:
+			if source_dir in self.copying:
+				return
+			entry = self.entries.get(source_dir)
+			checked = self.checked.get(source_dir)
+		# the folder is stat'ed at most every _recheck_seconds, not on every frame read
+		if checked is not None and now - checked[0] < _recheck_seconds:
+			return
+		try:
+			mtime = os.stat(source_dir).st_mtime
+		except OSError:
+			return
+		with self.lock:
+			self.checked[source_dir] = (now, True)
+			if self.skipped.get(source_dir) == mtime or source_dir in self.copying:
+				return
+			if entry is not None and entry.get("mtime") == mtime:
+				return
+			# new, or frames were written since the last copy
+			self.copying.add(source_dir)
+		self.pool.submit(self.copy_version, source_dir, mtime)
+
+	def copy_version(self, source_dir, mtime=None):
+		"""Copy a version folder, or only its new and changed frames when it was mirrored before."""
+		local = self.local_dir(source_dir)
+		with self.lock:
+			previous = self.entries.get(source_dir)
+		mirrored = previous["files"] if previous else {}
+		try:
+			files = {}
+			for f in os.scandir(source_dir):
+				if f.is_file():
+					st = f.stat()
+					files[f.name] = [st.st_size, st.st_mtime]
+			size = sum(r[0] for r in files.values())
+			if size > self.max_bytes:
+				# not listed again on every frame, only once the folder changes
+				with self.lock:
+					self.skipped[source_dir] = mtime
+				self.drop(source_dir)
+				return
+			self.evict(size - (previous["bytes"] if previous else 0), keep=source_dir)
+			os.makedirs(local, exist_ok=True)
+			for name, record in files.items():
+				if mirrored.get(name) == record and os.path.exists(f'{local}/{name}'):
+					continue
+				tmp = f'{local}/{name}.part'
+				shutil.copyfile(f'{source_dir}/{name}', tmp)
+				os.replace(tmp, f'{local}/{name}')
+			for name in mirrored:
+				if name not in files and os.path.exists(f'{local}/{name}'):
+					os.remove(f'{local}/{name}')
+			with self.lock:
+				self.entries[source_dir] = {"local": local, "bytes": size, "last_used": time.time(),
+											"complete": True, "files": files, "mtime": mtime}
+			self.save()
+		except OSError as e:
+			print(f'Could not mirror {source_dir}: {e}')
+			self.drop(source_dir)
+			shutil.rmtree(local, ignore_errors=True)
+		finally:
+			with self.lock:
+				self.copying.discard(source_dir)
+
+	def used_bytes(self):
+		with self.lock:
+			return sum(e["bytes"] for e in self.entries.values())
+
+	def evict(self, needed, keep=None):
+		"""Remove least recently read versions until needed bytes fit under max_bytes, never keep."""
+		with self.lock:
+			order = sorted(self.entries, key=lambda k: self.entries[k]["last_used"])
+			total = sum(e["bytes"] for e in self.entries.values())
+		for source_dir in order:
+			if total + needed <= self.max_bytes:
+				break
+			if source_dir != keep:
+				total -= self.drop(source_dir)
+
+	def drop(self, source_dir):
+		with self.lock:
+			entry = self.entries.pop(source_dir, None)
+		if entry is None:
+			return 0
+		shutil.rmtree(entry["local"], ignore_errors=True)
+		self.save()
+		return entry["bytes"]
+
+	def summary(self):
+		return (f'{len(self.entries)} versions, {format_size(self.used_bytes())} of '
+				f'{format_size(self.max_bytes)} in {self.root}')
+
+
+def mirror_store():
+	global _store
+	if _store is None:
+		_store = MirrorStore()
+	return _store
@@ -0,0 +1,93 @@
+import os
+
+
+# Parms of a filecache node that the cache cleaner needs, and the cleaner tagging rules.
+# No hou import here: CacheNodeInfo is read from a live node (from_node) or from a json manifest
+# (from_dict) so the same rules run in the cleaner window, under hython and under plain python.
+class CacheNodeInfo:
+	fields = ("path", "nodetype", "loaded", "filetype", "timedependent", "filemethod",
+			  "version", "cachename", "framerange", "substeps", "cachedir", "hipfile")
+
+	def __init__(self, **kwargs):
+		self.path = kwargs.get("path", "")
+		self.nodetype = kwargs.get("nodetype", "")
+		self.loaded = kwargs.get("loaded", "Unload")
+		self.filetype = kwargs.get("filetype", ".bgeo.sc")
+		self.timedependent = kwargs.get("timedependent", "TimeDependent")
+		self.filemethod = kwargs.get("filemethod", "Constructed")
+		self.version = kwargs.get("version", "v1")
+		self.cachename = kwargs.get("cachename", "")
+		self.framerange = tuple(kwargs.get("framerange", (1, 1, 1)))
+		self.substeps = int(kwargs.get("substeps", 1))
+		self.cachedir = kwargs.get("cachedir", "").replace("\\", "/")
+		self.hipfile = kwargs.get("hipfile", "")
+
+	@classmethod
+	def from_node(cls, node, hipfile=""):
+		_loaded = node.parm("loadfromdisk").eval()
+		_filetype = node.parm("filetype").eval()
+		_timedependent = node.parm("timedependent").eval()
+		_filemethod = node.parm("filemethod").eval()
+		return cls(
+			path=node.path(),
+			nodetype=node.type().name(),
+			loaded=["Unload", "Loaded"][int(_loaded)],
+			filetype=[".bgeo.sc", ".vdb"][int(_filetype)],
+			timedependent=["SingleFramed", "TimeDependent"][int(_timedependent)],
+			filemethod=["Constructed", "Explicit"][int(_filemethod)],
+			version="v" + str(node.parm("version").evalAsInt()),
+			cachename=node.parm("basename").eval(),
+			framerange=node.parmTuple("f").eval(),  # float3 use __getitem__(index)
+			substeps=node.parm("substeps").evalAsInt(),
+			cachedir=node.parm("cachedir").eval(),
+			hipfile=hipfile,
+		)
+
+	@classmethod
+	def from_dict(cls, d):
+		return cls(**{k: d[k] for k in cls.fields if k in d})
+
+	def to_dict(self):
+		return {k: getattr(self, k) for k in self.fields}
+
+	@property
+	def main_folder(self):
+		# .../Cache_geo1_filecache1/v3 -> .../Cache_geo1_filecache1
+		return os.path.dirname(self.cachedir)
+
+
+def tag_version(n, v):
+	"""Tag a VersionInventory against its CacheNodeInfo.
+
+	currentversion, notcurrentversion, framesdontmatch or notsingleframe.
+	"""
+	start, end, inc = (int(f) for f in n.framerange)
+	if n.timedependent == "SingleFramed":
+		if v.mark_singleframe and (v.name == n.version):
+			# node require singleframe and version is singleframe and version matched
+			return "currentversion"
+		elif v.mark_singleframe:
+			# versions don't matched
+			return "notcurrentversion"
+		# node require singleframe and version is sequence
+		return "notsingleframe"
+	if v.name != n.version:
+		# both sequence but versions don't match
+		return "notcurrentversion"
+	elif (v.startfr == start and v.endfr + 1 == end and v.inc == inc and
+		  v.substep == n.substeps and v.inc > 1):
+		# special occasion when increments endframe = endframe_set_on_node - 1
+		return "currentversion"
+	elif v.startfr != start or v.endfr != end or v.inc != inc or v.substep != n.substeps:
+		# versions matched but sequences don't match
+		return "framesdontmatch"
+	# all match which is desired version
+	return "currentversion"
+
+
+def node_status(tags):
+	if "framesdontmatch" in tags:
+		return "Clean with Care"
+	elif "currentversion" not in tags:
+		return "Clean All"
+	return "Clean Others"
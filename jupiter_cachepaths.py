@@ -0,0 +1,92 @@
+"""Filecache base directories from a path template, resolved once per hip path.
+
+$JOB/03_Workflow/Shots/a-rnd/Scenefiles/fx/Effects/shot_a-rnd_fx_Effects_v0001__lch_.hip
+-> $CacheDir/Shots/a-rnd/fx/Effects
+
+The hip path below $JOB minus its first folder (03_Workflow), Scenefiles and the file name gives
+{area}/{shot}/{dept}/{task}, also available as a whole as {subpath}. Set JUPITER_BASEDIR_TEMPLATE, or
+basedir_template in the project's .jupiter_project.json, to change the layout,
+e.g. "{cachedir}/{area}/{shot}/{dept}/{task}" or "{cachedir}/{shot}/{hipname}".
+Folders are not created when a node is made, only collected and created together before the first write.
+"""
+import functools
+import os
+import re
+import threading
+
+from jupiter_projectconfig import load_config
+
+default_template = "{cachedir}/{subpath}"
+fields = ("job", "cachedir", "area", "shot", "dept", "task", "subpath", "hipname")
+_pending = set()
+_lock = threading.Lock()
+
+
+def basedir_template(job=None):
+	"""JUPITER_BASEDIR_TEMPLATE, else basedir_template of the project config at job, else the default."""
+	template = os.environ.get("JUPITER_BASEDIR_TEMPLATE")
+	if not template and job:
+		config = load_config(job.replace('\\', '/').rstrip('/'))
+		template = config.get("basedir_template") if config else None
+	return template or default_template
+
+
+def hip_fields(hip, job):
+	hip = hip.replace('\\', '/')
+	job = (job or '').replace('\\', '/').rstrip('/')
+	values = dict.fromkeys(fields, "")
+	values["job"] = job
+	values["hipname"] = os.path.splitext(hip.rsplit('/', 1)[-1])[0]
+	if not job or not hip.lower().startswith(job.lower() + '/'):
+		# hip outside the project, everything goes to the cache root
+		return values
+	parts = [p for p in hip[len(job) + 1:].split('/')[1:-1] if p != 'Scenefiles']
+	values.update(zip(("area", "shot", "dept", "task"), parts))
+	values["subpath"] = '/'.join(parts)
+	return values
+
+
+@functools.lru_cache(maxsize=256)
+def resolve_basedir(hip, job, cachedir, template):
+	values = hip_fields(hip, job)
+	values["cachedir"] = cachedir.replace('\\', '/').rstrip('/')
+	path = template.format(**values)
+	# empty fields leave double slashes, keep a leading // for UNC paths
+	return (path[:2] + re.sub('/{2,}', '/', path[2:])).rstrip('/')
+
+
+def basedir_for_hip(hip, job, cachedir, template=None):
+	"""Memoized, pasting 50 filecache nodes parses the hip path once."""
+	return resolve_basedir(hip, job or '', cachedir, template or basedir_template(job))
+
+
+@functools.lru_cache(maxsize=256)
+def prism_basedir(cachedir, sequence, shot, step, category):
+	"""$CacheDir/Shots/<sequence>-<shot>/<step>/<category> from the PRISM_* variables, None outside Prism."""
+	if None in (cachedir, sequence, shot, step, category):
+		# once per session, not a message box for every new node
+		print('Not a Prism workflow scene, filecache nodes write to $CacheDir/Shots')
+		return None
+	cachedir = cachedir.replace('\\', '/').rstrip('/')
+	return f'{cachedir}/Shots/{sequence}-{shot}/{step}/{category}'
+
+
+def defer_makedirs(path):
+	with _lock:
+		_pending.add(path)
+
+
+def make_pending_dirs():
+	"""Create every collected base directory in one go, call before writing or browsing a cache."""
+	with _lock:
+		paths = sorted(_pending)
+		_pending.clear()
+	created = []
+	for path in paths:
+		if not os.path.isdir(path):
+			try:
+				os.makedirs(path, exist_ok=True)
+				created.append(path)
+			except OSError as e:
+				print(f'Could not create {path}: {e}')
+	return created
@@ -0,0 +1,150 @@
+"""Read-ahead of filecache frames while the timeline plays.
+
+A playbar callback reads the next frames of a filecache's read_back node on background threads, in
+the direction of playback, so they are in the OS file cache by the time the File SOP loads them.
+The File SOP only reads from its path, so frames are warmed rather than kept in our own RAM buffer.
+Only active while loadfromdisk is on. Window size from a prefetchframes parm when the node has one,
+otherwise JUPITER_PREFETCH_FRAMES.
+
+import jupiter_cacheprefetch; jupiter_cacheprefetch.enable(hou.node('/obj/geo1/filecache1'))
+"""
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import hou
+
+_window = int(os.environ.get('JUPITER_PREFETCH_FRAMES', 8))
+_prefetch_threads = 4
+_chunk_bytes = 1 << 22
+_remember = 512  # warmed paths remembered for hit counting
+_prefetchers = {}  # node session id -> Prefetcher
+
+
+def warm(path):
+	"""Read a file once and drop the data, returns the bytes read."""
+	total = 0
+	try:
+		with open(path, 'rb', buffering=0) as f:
+			while True:
+				chunk = f.read(_chunk_bytes)
+				if not chunk:
+					break
+				total += len(chunk)
+	except OSError:
+		return 0
+	return total
+
+
+class Prefetcher:
+	def __init__(self, node, window=_window, max_workers=_prefetch_threads):
+		self.node = node
+		self.window = window
+		self.pool = ThreadPoolExecutor(max_workers=max_workers)
+		self.lock = threading.Lock()
+		self.warmed = OrderedDict()  # path -> bytes, oldest first
+		self.inflight = {}  # path -> future
+		self.last_frame = None
+		self.hits = 0
+		self.late = 0  # still being read when the frame was shown
+		self.misses = 0
+		self.bytes = 0
+
+	def frame_path(self, frame):
+		return self.node.node('read_back').parm('file').evalAtFrame(frame)
+
+	def window_frames(self, frame, direction):
+		start, end = hou.playbar.playbackRange()
+		inc = hou.playbar.frameIncrement() or 1
+		frames = []
+		for k in range(1, self.window + 1):
+			f = frame + direction * k * inc
+			if start <= f <= end:
+				frames.append(f)
+		return frames
+
+	def on_frame(self, frame):
+		"""Count the shown frame and queue the window ahead of it. Main thread, parms are evaluated here."""
+		if not self.node.evalParm('loadfromdisk'):
+			return
+		path = self.frame_path(frame)
+		with self.lock:
+			if path in self.warmed:
+				self.hits += 1
+			elif path in self.inflight:
+				self.late += 1
+			else:
+				self.misses += 1
+		direction = -1 if self.last_frame is not None and frame < self.last_frame else 1
+		self.last_frame = frame
+		for f in self.window_frames(frame, direction):
+			self.submit(self.frame_path(f))
+
+	def submit(self, path):
+		with self.lock:
+			if path in self.warmed or path in self.inflight:
+				return
+			self.inflight[path] = self.pool.submit(self.read, path)
+
+	def read(self, path):
+		size = warm(path)
+		with self.lock:
+			del self.inflight[path]
+			self.warmed[path] = size
+			self.bytes += size
+			while len(self.warmed) > _remember:
+				self.warmed.popitem(last=False)
+
+	def stats(self):
+		with self.lock:
+			shown = self.hits + self.late + self.misses
+			return {"hits": self.hits, "late": self.late, "misses": self.misses, "bytes": self.bytes,
+					"hit_rate": self.hits / shown if shown else 0.0}
+
+	def stop(self):
+		self.pool.shutdown(wait=False)
+
+
+def _on_playbar(event_type, frame):
+	if event_type != hou.playbarEvent.FrameChanged:
+		return
+	for key, prefetcher in list(_prefetchers.items()):
+		try:
+			prefetcher.on_frame(frame)
+		except hou.ObjectWasDeleted:
+			disable_id(key)
+
+
+def enable(node, window=None):
+	if window is None:
+		window = node.evalParm('prefetchframes') if node.parm('prefetchframes') else _window
+	disable(node)
+	if not _prefetchers:
+		hou.playbar.addEventCallback(_on_playbar)
+	_prefetchers[node.sessionId()] = Prefetcher(node, window)
+	return _prefetchers[node.sessionId()]
+
+
+def disable_id(key):
+	prefetcher = _prefetchers.pop(key, None)
+	if prefetcher is None:
+		return None
+	prefetcher.stop()
+	if not _prefetchers:
+		# the last prefetcher is gone, only then the playbar callback
+		try:
+			hou.playbar.removeEventCallback(_on_playbar)
+		except hou.OperationFailed:
+			pass
+	return prefetcher
+
+
+def disable(node):
+	"""Stop prefetching for node, returns its Prefetcher for the counters or None."""
+	return disable_id(node.sessionId())
+
+
+def stats(node):
+	prefetcher = _prefetchers.get(node.sessionId())
+	return prefetcher.stats() if prefetcher is not None else None
@@ -0,0 +1,270 @@
+"""Background cache queue for filecache nodes.
+
+Any number of filecache nodes are cooked through their own PDG TOP network, at most max_procs at a time.
+A node waits for queued filecaches upstream of it, independent nodes cook in parallel. Each node gets
+hardenBaseName/enableLoadFromDisk as soon as its own cook is done.
+
+import jupiter_cachequeue; jupiter_cachequeue.enqueue_selected()
+"""
+import os
+
+import hdefereval
+import hou
+import pdg
+from hutil.Qt import QtCore, QtGui, QtWidgets
+
+from jupiter_cachedag import store_fingerprint, upstream_paths
+from jupiter_cachededup import unshare_version
+from jupiter_cacheinventory import write_manifest
+from jupiter_cachepaths import make_pending_dirs
+from jupiter_cachenode import CacheNodeInfo
+
+# filecache nodes cooking at the same time, each one cooks its own targettopnetwork through PDG
+_max_procs = int(os.environ.get('JUPITER_CACHE_MAXPROCS', max(1, (os.cpu_count() or 4) // 4)))
+_queue = None
+_panel = None  # one panel per session, raised again instead of opening another window
+
+_state_color = {
+	'queued': (40, 44, 52),
+	'waiting': (40, 44, 52),
+	'cooking': (39, 80, 130),
+	'done': (5, 98, 75),
+	'failed': (98, 48, 84),
+}
+
+
+def is_filecache_node(node):
+	return node.parm('targettopnetwork') is not None and node.parm('basename') is not None
+
+
+class QueueItem(object):
+	def __init__(self, node):
+		self.node = node
+		self.path = node.path()
+		self.state = 'queued'
+		self.total = 0
+		self.cooked = 0
+		self.failed = 0
+		self.upstream = []  # QueueItem that feed this node and have to finish first
+		self.context = None
+		self.handlers = []
+
+	def progress(self):
+		return int(100 * self.cooked / self.total) if self.total else 0
+
+
+class CacheQueue(QtCore.QObject):
+	# Scheduler for background caches: PDG events arrive on PDG threads, everything touching
+	# hou nodes runs deferred on the main thread, the panel listens to itemChanged.
+	itemChanged = QtCore.Signal(object)
+
+	def __init__(self, max_procs=_max_procs):
+		super(CacheQueue, self).__init__()
+		self.items = []
+		self.max_procs = max_procs
+
+	def enqueue(self, nodes):
+		queued = set(item.path for item in self.items if item.state in ('queued', 'waiting', 'cooking'))
+		for node in nodes:
+			if is_filecache_node(node) and node.path() not in queued:
+				item = QueueItem(node)
+				self.items.append(item)
+				queued.add(item.path)
+				self.itemChanged.emit(item)
+		self.link_upstream()
+		self.schedule()
+
+	def link_upstream(self):
+		# a node waits for queued filecaches in its input chain, independent ones cook in parallel
+		pending = [item for item in self.items if item.state in ('queued', 'waiting', 'cooking')]
+		for item in pending:
+			ancestors = upstream_paths(item.node)
+			item.upstream = [other for other in pending if other.path in ancestors]
+
+	def running(self):
+		return [item for item in self.items if item.state == 'cooking']
+
+	def schedule(self):
+		for item in self.items:
+			if len(self.running()) >= self.max_procs:
+				return
+			if item.state not in ('queued', 'waiting'):
+				continue
+			if any(up.state == 'failed' for up in item.upstream):
+				self.finish(item, False)
+			elif all(up.state == 'done' for up in item.upstream):
+				self.start(item)
+			elif item.state != 'waiting':
+				item.state = 'waiting'
+				self.itemChanged.emit(item)
+
+	def start(self, item):
+		topnet = item.node.parm('targettopnetwork').evalAsNode()
+		if topnet is None:
+			self.finish(item, False)
+			return
+		top = topnet.displayNode() or topnet
+		make_pending_dirs()
+		if item.node.evalParm('filemethod') == 0:
+			# frames linked to other versions by jupiter_cachededup must not be rewritten in place
+			unshare_version(item.node.parm('cachedir').eval())
+		item.state = 'cooking'
+		item.total = item.cooked = item.failed = 0
+		item.context = top.getPDGGraphContext()
+		item.handlers = [
+			item.context.addEventHandler(lambda e, i=item: self.onWorkItemAdd(i, e), pdg.EventType.WorkItemAdd),
+			item.context.addEventHandler(lambda e, i=item: self.onWorkItemState(i, e),
+										 pdg.EventType.WorkItemStateChange),
+			item.context.addEventHandler(lambda e, i=item: self.onCookDone(i, True), pdg.EventType.CookComplete),
+			item.context.addEventHandler(lambda e, i=item: self.onCookDone(i, False), pdg.EventType.CookError),
+		]
+		self.itemChanged.emit(item)
+		top.dirtyAllWorkItems(False)
+		top.cookOutputWorkItems(block=False)
+
+	# PDG threads ######################################################
+	def onWorkItemAdd(self, item, event):
+		item.total += 1
+		self.itemChanged.emit(item)
+
+	def onWorkItemState(self, item, event):
+		if event.currentState == pdg.workItemState.CookedSuccess:
+			item.cooked += 1
+		elif event.currentState == pdg.workItemState.CookedFail:
+			item.failed += 1
+		self.itemChanged.emit(item)
+
+	def onCookDone(self, item, ok):
+		hdefereval.executeDeferred(lambda: self.finish(item, ok and not item.failed))
+
+	# main thread ######################################################
+	def finish(self, item, ok):
+		if item.state in ('done', 'failed'):
+			return
+		for handler in item.handlers:
+			item.context.removeEventHandler(handler)
+		item.handlers = []
+		item.state = 'done' if ok else 'failed'
+		if ok:
+			# same as the HDA saveToDisk button, per node as soon as it is cached
+			module = item.node.hdaModule()
+			module.hardenBaseName(item.node)
+			module.enableLoadFromDisk(item.node)
+			item.node.node('read_back').parm('reload').pressButton()
+			item.node.setColor(hou.Color((0.435, 0.921, 0.360)))
+			store_fingerprint(item.node)
+			info = CacheNodeInfo.from_node(item.node, hou.hipFile.path())
+			if info.filemethod == "Constructed":
+				write_manifest(info)
+		self.itemChanged.emit(item)
+		self.schedule()
+
+	def clear_finished(self):
+		self.items = [item for item in self.items if item.state not in ('done', 'failed')]
+
+	def set_max_procs(self, value):
+		self.max_procs = max(1, int(value))
+		self.schedule()
+
+
+class CacheQueuePanel(QtWidgets.QWidget):
+	def __init__(self, cache_queue):
+		super(CacheQueuePanel, self).__init__()
+		self.setParent(hou.ui.mainQtWindow(), QtCore.Qt.Window)
+		self.setWindowTitle('Jupiter Cache Queue')
+		self.queue = cache_queue
+		self.rows = {}
+
+		self.table = QtWidgets.QTableWidget(0, 3)
+		self.table.setHorizontalHeaderLabels(['Node', 'State', 'Progress'])
+		self.table.horizontalHeader().setSectionResizeMode(0, QtWidgets.QHeaderView.Stretch)
+		self.table.verticalHeader().hide()
+		self.spin_procs = QtWidgets.QSpinBox()
+		self.spin_procs.setRange(1, max(64, self.queue.max_procs))
+		self.spin_procs.setValue(self.queue.max_procs)
+		self.spin_procs.valueChanged.connect(self.queue.set_max_procs)
+		self.btn_add = QtWidgets.QPushButton('Add Selected')
+		self.btn_add.clicked.connect(lambda: self.queue.enqueue(hou.selectedNodes()))
+		self.btn_clear = QtWidgets.QPushButton('Clear Finished')
+		self.btn_clear.clicked.connect(self.clearFinished)
+
+		top = QtWidgets.QHBoxLayout()
+		top.addWidget(QtWidgets.QLabel('Max Concurrent'))
+		top.addWidget(self.spin_procs)
+		top.addStretch()
+		top.addWidget(self.btn_add)
+		top.addWidget(self.btn_clear)
+		layout = QtWidgets.QVBoxLayout(self)
+		layout.addLayout(top)
+		layout.addWidget(self.table)
+		self.resize(600, 300)
+
+		self.queue.itemChanged.connect(self.updateItem, QtCore.Qt.QueuedConnection)
+		for item in self.queue.items:
+			self.updateItem(item)
+
+	def updateItem(self, item):
+		row = self.rows.get(item)
+		if row is None:
+			row = self.rows[item] = self.table.rowCount()
+			self.table.insertRow(row)
+			self.table.setItem(row, 0, QtWidgets.QTableWidgetItem(item.path))
+			self.table.setItem(row, 1, QtWidgets.QTableWidgetItem())
+			bar = QtWidgets.QProgressBar()
+			bar.setRange(0, 100)
+			self.table.setCellWidget(row, 2, bar)
+		state = self.table.item(row, 1)
+		state.setText(item.state if not item.total else f'{item.state} {item.cooked}/{item.total}')
+		state.setBackground(QtGui.QColor(*_state_color[item.state]))
+		self.table.cellWidget(row, 2).setValue(100 if item.state == 'done' else item.progress())
+
+	def clearFinished(self):
+		self.queue.clear_finished()
+		self.rows = {}
+		self.table.setRowCount(0)
+		for item in self.queue.items:
+			self.updateItem(item)
+
+
+def when_cooked(node, callback):
+	"""Call callback() on the main thread once the next cook of the node's TOP network succeeds.
+	Register it before starting the cook."""
+	topnet = node.parm('targettopnetwork').evalAsNode()
+	context = (topnet.displayNode() or topnet).getPDGGraphContext()
+	handlers = []
+
+	def done(event, ok):
+		for handler in handlers:
+			context.removeEventHandler(handler)
+		del handlers[:]
+		if ok:
+			hdefereval.executeDeferred(callback)
+
+	handlers.append(context.addEventHandler(lambda e: done(e, True), pdg.EventType.CookComplete))
+	handlers.append(context.addEventHandler(lambda e: done(e, False), pdg.EventType.CookError))
+
+
+def cache_queue():
+	global _queue
+	if _queue is None:
+		_queue = CacheQueue()
+	return _queue
+
+
+def show_queue_panel():
+	global _panel
+	if _panel is None:
+		_panel = CacheQueuePanel(cache_queue())
+	if _panel.isMinimized():
+		_panel.showNormal()
+	_panel.show()
+	_panel.raise_()
+	_panel.activateWindow()
+	return _panel
+
+
+def enqueue_selected(nodes=None):
+	"""Queue the given or selected filecache nodes and show the panel."""
+	panel = show_queue_panel()
+	cache_queue().enqueue(nodes if nodes is not None else hou.selectedNodes())
+	return panel
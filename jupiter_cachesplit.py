@@ -0,0 +1,255 @@
+"""Write the frames of a filecache node with N hython processes at once.
+
+Only for caches where every frame cooks on its own (deformers, meshing, VDB conversion). Nodes fed by a
+solver, a DOP network or substeps are refused, their frames depend on the frames cooked before.
+The scene is saved to a backup hip, moved out of $HIP/backup into a temp folder that is removed once the last
+worker exited. Each worker loads it, renames it back to the real hip so $HIP stays the same, and renders its
+own contiguous part of f1-f2 by f3 through the node's ROP.
+
+Workers are jupiter_cachesplit_worker.py, started by SplitWriter through QProcess.
+"""
+import os
+import re
+import shutil
+import tempfile
+
+import hou
+from hutil.Qt import QtCore, QtWidgets
+
+from jupiter_cachedag import upstream_paths
+from jupiter_cachededup import unshare_version
+from jupiter_cachepaths import make_pending_dirs
+
+# same progress lines as dummy_process.py / snippet_pyside_qprocess.simple_percent_parser
+progress_re = re.compile(r"Total complete: (\d+)%")
+frame_done_re = re.compile(r"Frame done: (-?[\d.]+)")
+frame_failed_re = re.compile(r"Frame failed: (-?[\d.]+)")
+
+_worker = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'jupiter_cachesplit_worker.py')
+_split_procs = int(os.environ.get('JUPITER_SPLIT_PROCS', max(1, (os.cpu_count() or 2) // 2)))
+# upstream node types whose result depends on earlier frames
+_history_types = re.compile(r'solver|^dopnet$|^dopimport|^popnet$|^particlefluid|^vellumsolver|^rbd.*solver')
+
+
+def default_procs():
+	"""Worker processes when the node has no splitprocs parm, JUPITER_SPLIT_PROCS or half the cores."""
+	return _split_procs
+
+
+def frame_key(frame):
+	# frames as the file names pad them, fpadzero(4, 3, $FF): 1001.333 printed by a worker is 1001 + 1/3 here
+	return round(frame * 1000)
+
+
+def split_lines(buffer, data):
+	"""(complete lines, rest) of buffer + data, a line cut between two reads stays in rest."""
+	text = buffer + data
+	end = text.rfind('\n')
+	if end < 0:
+		return [], text
+	return text[:end].splitlines(), text[end + 1:]
+
+
+def simple_percent_parser(output):
+	m = progress_re.search(output)
+	if m:
+		return int(m.group(1))
+
+
+def frame_list(f1, f2, f3):
+	f3 = f3 or 1
+	count = int((f2 - f1) / f3) + 1
+	return [f1 + i * f3 for i in range(max(count, 0))]
+
+
+def partition_range(f1, f2, f3, procs):
+	"""Contiguous (first, last, inc) chunks, at most procs of them, sizes differ by one frame at most."""
+	frames = frame_list(f1, f2, f3)
+	procs = max(1, min(procs, len(frames)))
+	chunks = []
+	start = 0
+	for i in range(procs):
+		size = len(frames) // procs + (i < len(frames) % procs)
+		if size:
+			chunks.append((frames[start], frames[start + size - 1], f3))
+		start += size
+	return chunks
+
+
+def history_reason(node):
+	"""Why the node must be cooked in one session in frame order, None when its frames are independent."""
+	if not node.evalParm('timedependent'):
+		return "not time dependent, nothing to split"
+	if node.evalParm('substeps') > 1:
+		return "substeps are only used by simulations"
+	for path in upstream_paths(node):
+		upstream = hou.node(path)
+		if upstream is None:
+			continue
+		for n in [upstream] + list(upstream.allSubChildren()):
+			if n.type().category() == hou.dopNodeTypeCategory() or _history_types.search(n.type().name()):
+				return f"{n.path()} ({n.type().name()}) keeps history between frames"
+	return None
+
+
+def find_rop(node):
+	return next((n for n in node.allSubChildren() if isinstance(n, hou.RopNode)), None)
+
+
+class SplitWriter(QtCore.QObject):
+	progressChanged = QtCore.Signal(int)
+	message = QtCore.Signal(str)
+	finished = QtCore.Signal(list)  # failed frames
+
+	def __init__(self, node, procs=_split_procs):
+		super(SplitWriter, self).__init__()
+		self.node = node
+		self.procs = procs
+		self.workers = []  # [QProcess, frames in chunk, percent, stdout rest, stderr rest]
+		self.done_frames = []
+		self.failed_frames = []
+		self.running = 0
+		self.hip_dir = None  # temp folder of the hip the workers load
+
+	def save_worker_hip(self):
+		# saveAsBackup keeps the session name and unsaved state, the file must not stay among the user backups
+		backup = hou.hipFile.saveAsBackup()
+		self.hip_dir = tempfile.mkdtemp(prefix='jupiter_split_')
+		hip = os.path.join(self.hip_dir, os.path.basename(backup))
+		shutil.move(backup, hip)
+		return hip
+
+	def remove_worker_hip(self):
+		if self.hip_dir is not None:
+			shutil.rmtree(self.hip_dir, ignore_errors=True)
+			self.hip_dir = None
+
+	def start(self):
+		real_hip = hou.hipFile.path()
+		backup_hip = self.save_worker_hip()
+		hython = os.path.join(hou.getenv('HFS'), 'bin', 'hython.exe' if os.name == 'nt' else 'hython')
+		env = QtCore.QProcessEnvironment.systemEnvironment()
+		for var in ('JOB', 'CacheDir'):
+			if hou.getenv(var):
+				env.insert(var, hou.getenv(var))
+		f1, f2, f3 = self.node.parmTuple('f').eval()
+		for first, last, inc in partition_range(f1, f2, f3, self.procs):
+			p = QtCore.QProcess()
+			p.setProcessEnvironment(env)
+			worker = [p, len(frame_list(first, last, inc)), 0, '', '']
+			p.readyReadStandardOutput.connect(lambda w=worker: self.handle_stdout(w))
+			p.readyReadStandardError.connect(lambda w=worker: self.handle_stderr(w))
+			p.finished.connect(lambda *args, w=worker: self.process_finished(w))
+			# no finished signal for a worker that never started
+			p.errorOccurred.connect(
+				lambda e, w=worker: e == QtCore.QProcess.FailedToStart and self.process_finished(w))
+			self.workers.append(worker)
+			self.running += 1
+			p.start(hython, [_worker, backup_hip, real_hip, self.node.path(), str(first), str(last), str(inc)])
+			self.message.emit(f"worker {len(self.workers)}: frames {first:g}-{last:g} by {inc:g}")
+
+	def handle_stdout(self, worker):
+		lines, worker[3] = split_lines(worker[3], bytes(worker[0].readAllStandardOutput()).decode("utf8", "replace"))
+		self.parse_stdout(lines)
+
+	def parse_stdout(self, lines):
+		for line in lines:
+			m = frame_failed_re.search(line)
+			if m:
+				self.failed_frames.append(float(m.group(1)))
+				self.message.emit(line)
+				continue
+			m = frame_done_re.search(line)
+			if m:
+				self.done_frames.append(float(m.group(1)))
+
+	def handle_stderr(self, worker):
+		lines, worker[4] = split_lines(worker[4], bytes(worker[0].readAllStandardError()).decode("utf8", "replace"))
+		self.parse_stderr(worker, lines)
+
+	def parse_stderr(self, worker, lines):
+		for line in lines:
+			progress = simple_percent_parser(line)
+			if progress is None:
+				self.message.emit(line)
+				continue
+			worker[2] = progress
+			total = sum(w[1] for w in self.workers)
+			self.progressChanged.emit(int(sum(w[1] * w[2] for w in self.workers) / total))
+
+	def process_finished(self, worker):
+		self.running -= 1
+		# last line without a newline
+		self.handle_stdout(worker)
+		self.handle_stderr(worker)
+		self.parse_stdout(worker[3].splitlines())
+		self.parse_stderr(worker, worker[4].splitlines())
+		worker[3] = worker[4] = ''
+		if worker[0].exitStatus() != QtCore.QProcess.NormalExit:
+			self.message.emit(f"worker crashed: {worker[0].program()}")
+		if not self.running:
+			self.remove_worker_hip()
+			# frames of crashed workers never reported done
+			f1, f2, f3 = self.node.parmTuple('f').eval()
+			expected = {frame_key(f): f for f in frame_list(f1, f2, f3)}
+			reported = {frame_key(f) for f in self.done_frames + self.failed_frames}
+			missing = [f for key, f in expected.items() if key not in reported]
+			failed = {frame_key(f): f for f in self.failed_frames + missing}
+			self.failed_frames = sorted(failed.values())
+			self.finished.emit(self.failed_frames)
+
+	def kill(self):
+		for worker in self.workers:
+			worker[0].kill()
+
+
+class SplitWriterPanel(QtWidgets.QWidget):
+	def __init__(self, writer):
+		super(SplitWriterPanel, self).__init__()
+		self.setParent(hou.ui.mainQtWindow(), QtCore.Qt.Window)
+		self.setWindowTitle(f"Split Write - {writer.node.path()}")
+		self.writer = writer
+		self.progress = QtWidgets.QProgressBar()
+		self.progress.setRange(0, 100)
+		self.text = QtWidgets.QPlainTextEdit()
+		self.text.setReadOnly(True)
+		self.btn_cancel = QtWidgets.QPushButton("Cancel")
+		self.btn_cancel.clicked.connect(writer.kill)
+		layout = QtWidgets.QVBoxLayout(self)
+		layout.addWidget(self.progress)
+		layout.addWidget(self.text)
+		layout.addWidget(self.btn_cancel)
+		self.resize(500, 300)
+		writer.progressChanged.connect(self.progress.setValue)
+		writer.message.connect(self.text.appendPlainText)
+		writer.finished.connect(self.onFinished)
+
+	def onFinished(self, failed):
+		self.btn_cancel.setEnabled(False)
+		if failed:
+			self.text.appendPlainText(f"{len(failed)} frames failed: {', '.join(f'{f:g}' for f in failed)}")
+		else:
+			self.progress.setValue(100)
+			self.text.appendPlainText("All frames written")
+
+
+def split_write(node, procs=_split_procs):
+	"""Start the split write of node and show its panel, None and a message when the node is refused."""
+	reason = history_reason(node)
+	if reason:
+		hou.ui.displayMessage(f"Can not split {node.path()} across processes:\n{reason}",
+							  severity=hou.severityType.Warning)
+		return None
+	if find_rop(node) is None:
+		hou.ui.displayMessage(f"No ROP inside {node.path()}", severity=hou.severityType.Warning)
+		return None
+	make_pending_dirs()
+	if node.evalParm('filemethod') == 0:
+		unshare_version(node.parm('cachedir').eval())
+	writer = SplitWriter(node, procs)
+	panel = SplitWriterPanel(writer)
+	# same as a foreground save once every frame is on disk
+	writer.finished.connect(lambda failed: failed or node.hdaModule().saveToDisk({'node': node}))
+	panel.show()
+	writer.start()
+	return panel
@@ -0,0 +1,34 @@
+"""hython worker of jupiter_cachesplit, renders one contiguous part of a filecache frame range.
+
+hython jupiter_cachesplit_worker.py <backup.hip> <real.hip> <node path> <first> <last> <inc>
+
+Prints "Frame done: F" / "Frame failed: F: error" on stdout and "Total complete: N%" on stderr.
+"""
+import sys
+
+import hou
+
+from jupiter_cachesplit import find_rop, frame_list
+
+
+def run_worker(backup_hip, real_hip, node_path, first, last, inc):
+	hou.hipFile.load(backup_hip, suppress_save_prompt=True, ignore_load_warnings=True)
+	hou.hipFile.setName(real_hip)
+	rop = find_rop(hou.node(node_path))
+	frames = frame_list(first, last, inc)
+	failed = 0
+	for i, frame in enumerate(frames):
+		try:
+			rop.render(frame_range=(frame, frame, 1), ignore_inputs=True)
+			print(f"Frame done: {frame}", flush=True)
+		except hou.OperationFailed as e:
+			failed += 1
+			print(f"Frame failed: {frame}: {e}", flush=True)
+		sys.stderr.write(f"Total complete: {int(100 * (i + 1) / len(frames))}%\n")
+		sys.stderr.flush()
+	return int(bool(failed))
+
+
+if __name__ == '__main__':
+	_backup, _real, _node, _first, _last, _inc = sys.argv[1:7]
+	sys.exit(run_worker(_backup, _real, _node, float(_first), float(_last), float(_inc)))
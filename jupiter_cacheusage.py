@@ -0,0 +1,197 @@
+"""Project wide cache usage under $CacheDir, for shots nobody has open.
+
+Layout built by FileCacheHDA_getbasedir / FileCacheHDA_onCreated:
+    $CacheDir/Shots/<shot>/<dept>/<task>/<cachename>/v<ver>/<cachename>_v<ver>.<frame>.bgeo.sc
+
+python jupiter_cacheusage.py A:/Projects/3d/vellum_meat/88_Cache --level shot
+python jupiter_cacheusage.py $CacheDir --older-than 30 --unreferenced nodes.json --sort size
+"""
+import argparse
+import csv
+import json
+import os
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from jupiter_cacheinventory import format_size, hardlink_info
+from jupiter_cachemanifest import is_linked
+
+levels = ("area", "shot", "dept", "task", "cache", "version")
+version_re = re.compile(r'^v\d+$')
+_walk_threads = 32
+_max_depth = 8  # stop descending into folders that never reach a v<ver> folder
+
+
+class UsageRow:
+	def __init__(self, key, path):
+		self.key = key  # (area, shot, dept, task, cache, version), shorter when rolled up
+		self.path = path
+		self.bytes = 0
+		self.files = 0
+		self.versions = 0
+		self.newest = 0.0  # newest file mtime
+
+	def merge(self, other):
+		self.bytes += other.bytes
+		self.files += other.files
+		self.versions += other.versions
+		self.newest = max(self.newest, other.newest)
+
+	def age_days(self, now=None):
+		return ((now or time.time()) - self.newest) / 86400.0 if self.newest else 0.0
+
+
+class UsageWalker:
+	# Parallel walker: one pool task per directory above the version level, one per version folder.
+	# Only a UsageRow per version is kept, DirEntry objects are dropped as soon as a directory is read.
+	def __init__(self, max_workers=_walk_threads):
+		self.max_workers = max_workers
+		self.rows = {}
+		self.errors = []
+		self.lock = threading.Lock()
+		self.linked = set()  # (st_dev, st_ino) of hardlinked files already counted
+		self.pending = 0
+		self.done = threading.Event()
+
+	def walk(self, cachedir):
+		cachedir = cachedir.replace('\\', '/').rstrip('/')
+		self.pool = ThreadPoolExecutor(max_workers=self.max_workers)
+		self.submit(cachedir, ())
+		self.done.wait()
+		self.pool.shutdown()
+		return list(self.rows.values())
+
+	def submit(self, path, components):
+		with self.lock:
+			self.pending += 1
+		self.pool.submit(self.visit, path, components)
+
+	def visit(self, path, components):
+		try:
+			if components and version_re.match(components[-1]):
+				self.sum_version(path, components)
+			elif len(components) < _max_depth:
+				with os.scandir(path) as it:
+					subdirs = [(e.path, e.name) for e in it if e.is_dir(follow_symlinks=False)
+							   and not e.name.startswith('.')]
+				for sub_path, name in subdirs:
+					self.submit(sub_path.replace('\\', '/'), components + (name,))
+		except OSError as e:
+			with self.lock:
+				self.errors.append((path, str(e)))
+		finally:
+			with self.lock:
+				self.pending -= 1
+				if not self.pending:
+					self.done.set()
+
+	def sum_version(self, path, components):
+		row = UsageRow(components, path)
+		row.versions = 1
+		# link counts cost a stat per frame on Windows, only versions marked by jupiter_cachededup have links
+		linked = is_linked(path)
+		stack = [path]
+		while stack:
+			with os.scandir(stack.pop()) as it:
+				for entry in it:
+					if entry.is_dir(follow_symlinks=False):
+						stack.append(entry.path)
+					else:
+						st = entry.stat(follow_symlinks=False)
+						row.files += 1
+						row.newest = max(row.newest, st.st_mtime)
+						link = hardlink_info(entry, st) if linked else None
+						if link is not None:
+							# frames shared by jupiter_cachededup count once, in the first version walked
+							with self.lock:
+								if link[0] in self.linked:
+									continue
+								self.linked.add(link[0])
+						row.bytes += st.st_size
+		with self.lock:
+			self.rows[path] = row
+
+
+def referenced_versions(manifests):
+	"""Version folders used by filecache nodes, from jupiter_cachecleaner_cli --dump-manifest files."""
+	paths = set()
+	for manifest in manifests:
+		with open(manifest, 'r') as f:
+			for node in json.load(f):
+				paths.add(node.get("cachedir", "").replace('\\', '/').rstrip('/'))
+	return paths
+
+
+def rollup(rows, level):
+	"""Sum version rows up to one of levels, the cache level is always the folder above the version."""
+	if level == "version":
+		return list(rows)
+	groups = {}
+	for row in rows:
+		key = row.key[:-1] if level == "cache" else row.key[:levels.index(level) + 1]
+		group = groups.get(key)
+		if group is None:
+			group = groups[key] = UsageRow(key, row.path.rsplit('/', len(row.key) - len(key))[0])
+		group.merge(row)
+	return list(groups.values())
+
+
+def usage_report(cachedir, level="version", older_than=None, manifests=None, max_workers=_walk_threads):
+	"""Version rows filtered by age and, with node manifests, to versions no hip references, then rolled up."""
+	walker = UsageWalker(max_workers)
+	rows = walker.walk(cachedir)
+	for path, error in walker.errors:
+		print(f"could not read {path}: {error}", file=sys.stderr)
+	if manifests:
+		used = referenced_versions(manifests)
+		rows = [row for row in rows if row.path not in used]
+	if older_than is not None:
+		now = time.time()
+		rows = [row for row in rows if row.age_days(now) > older_than]
+	return rollup(rows, level)
+
+
+sort_keys = {
+	"size": lambda r: -r.bytes,
+	"files": lambda r: -r.files,
+	"age": lambda r: r.newest,
+	"path": lambda r: r.path,
+}
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description="Cache usage per shot, department, cache and version")
+	parser.add_argument('cachedir', nargs='?', default=os.environ.get('CacheDir'))
+	parser.add_argument('--level', choices=levels, default="version")
+	parser.add_argument('--older-than', type=float, help="only versions not written for this many days")
+	parser.add_argument('--unreferenced', nargs='+', metavar='MANIFEST',
+						help="node manifests of every hip, only versions none of them reference")
+	parser.add_argument('--sort', choices=tuple(sort_keys), default="size")
+	parser.add_argument('--csv', help="write the table to a csv file instead of stdout")
+	parser.add_argument('--workers', type=int, default=_walk_threads)
+	args = parser.parse_args(argv)
+	if not args.cachedir:
+		parser.error("no cachedir given and $CacheDir is not set")
+
+	rows = usage_report(args.cachedir, args.level, args.older_than, args.unreferenced, args.workers)
+	rows.sort(key=sort_keys[args.sort])
+	now = time.time()
+	if args.csv:
+		with open(args.csv, 'w', newline='') as f:
+			writer = csv.writer(f)
+			writer.writerow(("path", "bytes", "files", "versions", "age_days"))
+			for row in rows:
+				writer.writerow((row.path, row.bytes, row.files, row.versions, f"{row.age_days(now):.1f}"))
+	else:
+		for row in rows:
+			print(f"{format_size(row.bytes):>10} {row.files:>9} {row.versions:>5}v "
+				  f"{row.age_days(now):7.1f}d  {row.path}")
+		print(f"{format_size(sum(r.bytes for r in rows)):>10} total in {len(rows)} rows")
+	return 0
+
+
+if __name__ == '__main__':
+	sys.exit(main())
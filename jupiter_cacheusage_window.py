@@ -0,0 +1,115 @@
+import threading
+import time
+
+from hutil.Qt import QtCore, QtWidgets
+
+import hou
+
+from jupiter_cacheinventory import format_size
+from jupiter_cacheusage import levels, usage_report
+
+_columns = ("Path", "Size", "Files", "Versions", "Age (days)")
+# raw value per column, age ascending means newest first
+_sort_keys = (lambda r: r.path, lambda r: r.bytes, lambda r: r.files, lambda r: r.versions, lambda r: -r.newest)
+
+
+class UsageTableModel(QtCore.QAbstractTableModel):
+	def __init__(self, parent=None):
+		super(UsageTableModel, self).__init__(parent)
+		self.rows = []
+		self.now = time.time()
+
+	def set_rows(self, rows):
+		self.beginResetModel()
+		self.rows = rows
+		self.now = time.time()
+		self.endResetModel()
+
+	def rowCount(self, parent=QtCore.QModelIndex()):
+		return 0 if parent.isValid() else len(self.rows)
+
+	def columnCount(self, parent=QtCore.QModelIndex()):
+		return len(_columns)
+
+	def headerData(self, section, orientation, role=QtCore.Qt.DisplayRole):
+		if orientation == QtCore.Qt.Horizontal and role == QtCore.Qt.DisplayRole:
+			return _columns[section]
+		return None
+
+	def data(self, index, role=QtCore.Qt.DisplayRole):
+		if not index.isValid() or role not in (QtCore.Qt.DisplayRole, QtCore.Qt.ToolTipRole):
+			return None
+		row = self.rows[index.row()]
+		return (row.path, format_size(row.bytes), str(row.files), str(row.versions),
+				f"{row.age_days(self.now):.1f}")[index.column()]
+
+	def sort(self, column, order=QtCore.Qt.AscendingOrder):
+		# sort on the raw values, not the formatted text
+		self.layoutAboutToBeChanged.emit()
+		self.rows.sort(key=_sort_keys[column], reverse=order == QtCore.Qt.DescendingOrder)
+		self.layoutChanged.emit()
+
+
+class UsageWindow(QtWidgets.QWidget):
+	scanned = QtCore.Signal(object)
+
+	def __init__(self, cachedir):
+		super(UsageWindow, self).__init__()
+		self.setParent(hou.ui.mainQtWindow(), QtCore.Qt.Window)
+		self.setWindowTitle(f"Jupiter Cache Usage - {cachedir}")
+		self.cachedir = cachedir
+
+		self.level = QtWidgets.QComboBox()
+		self.level.addItems(levels)
+		self.level.setCurrentText("shot")
+		self.older_than = QtWidgets.QSpinBox()
+		self.older_than.setRange(0, 3650)
+		self.older_than.setSuffix(" days")
+		self.older_than.setSpecialValueText("any age")
+		self.btn_scan = QtWidgets.QPushButton("Scan")
+		self.btn_scan.clicked.connect(self.scan)
+		self.label_total = QtWidgets.QLabel()
+
+		self.model = UsageTableModel(self)
+		self.view = QtWidgets.QTableView()
+		self.view.setModel(self.model)
+		self.view.setSortingEnabled(True)
+		self.view.horizontalHeader().setStretchLastSection(False)
+		self.view.horizontalHeader().setSectionResizeMode(0, QtWidgets.QHeaderView.Stretch)
+
+		top = QtWidgets.QHBoxLayout()
+		top.addWidget(QtWidgets.QLabel("Level"))
+		top.addWidget(self.level)
+		top.addWidget(QtWidgets.QLabel("Older than"))
+		top.addWidget(self.older_than)
+		top.addWidget(self.btn_scan)
+		top.addStretch()
+		top.addWidget(self.label_total)
+		layout = QtWidgets.QVBoxLayout(self)
+		layout.addLayout(top)
+		layout.addWidget(self.view)
+		self.resize(900, 600)
+
+		self.scanned.connect(self.onScanned, QtCore.Qt.QueuedConnection)
+
+	def scan(self):
+		# the walk runs off the UI thread, the table is filled when it is done
+		self.btn_scan.setEnabled(False)
+		self.label_total.setText("Scanning...")
+		level = self.level.currentText()
+		older_than = self.older_than.value() or None
+		threading.Thread(target=lambda: self.scanned.emit(usage_report(self.cachedir, level, older_than)),
+						 daemon=True).start()
+
+	def onScanned(self, rows):
+		self.model.set_rows(rows)
+		self.view.sortByColumn(1, QtCore.Qt.DescendingOrder)
+		self.label_total.setText(f"{format_size(sum(r.bytes for r in rows))} in {len(rows)} rows")
+		self.btn_scan.setEnabled(True)
+
+
+def show_usage_window(cachedir=None):
+	win = UsageWindow(cachedir or hou.getenv('CacheDir'))
+	win.show()
+	win.scan()
+	return win
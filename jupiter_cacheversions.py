@@ -0,0 +1,118 @@
+import os
+import re
+import threading
+
+from jupiter_cacheindex import CacheIndex
+from jupiter_cacheinventory import format_size, inventory_version, version_entry
+
+version_name_re = re.compile(r'^v(\d+)$')
+_listings = {}  # (cache main folder, filetype) -> VersionListing, for the whole session
+_indexes = {}  # $CacheDir -> CacheIndex, loaded once per session
+_lock = threading.Lock()
+
+
+# Versions present in a filecache main folder, for the HDA version navigator.
+# The folder is only listed again when its mtime changed (a version was added, removed or renamed, or a
+# manifest written), and that listing only reads names: next_free and latest never walk a version.
+# Summaries for the menu are kept per version and only rebuilt for new folders, or with deep=True for
+# folders whose mtime changed, through the cache index when there is one.
+class VersionListing:
+	def __init__(self, root, filetype):
+		self.root = root
+		self.filetype = filetype
+		self.mtime = None
+		self.entries = {}  # version number -> DirEntry from the last listing
+		self.versions = {}  # version number -> VersionInventory, filled by summaries()
+		self.numbers = []  # sorted version numbers
+		self.latest = 0
+
+	def refresh(self):
+		"""Names only, one stat of the main folder when nothing changed."""
+		try:
+			mtime = os.stat(self.root).st_mtime
+		except OSError:
+			mtime = None
+		if mtime == self.mtime:
+			return self
+		self.mtime = mtime
+		entries = {}
+		if mtime is not None:
+			for entry in os.scandir(self.root):
+				m = version_name_re.match(entry.name)
+				if m and entry.is_dir():
+					entries[int(m.group(1))] = entry
+		self.entries = entries
+		self.numbers = sorted(entries)
+		self.latest = self.numbers[-1] if self.numbers else 0
+		# versions gone from disk
+		for number in [n for n in self.versions if n not in entries]:
+			del self.versions[number]
+		return self
+
+	def summaries(self, index=None, deep=False):
+		"""Inventory of new version folders, deep also of folders whose mtime changed (versions being written)."""
+		for number, entry in self.entries.items():
+			v = self.versions.get(number)
+			if v is not None and not deep:
+				continue
+			if v is not None:
+				try:
+					if os.stat(entry.path).st_mtime == v.mtime:
+						continue
+				except OSError:
+					continue
+				# DirEntry keeps the stat of the listing, get one with the new mtime
+				entry = version_entry(entry.path)
+				if entry is None:
+					continue
+			try:
+				self.versions[number] = inventory_version(entry, self.filetype, index)
+			except OSError:
+				self.versions.pop(number, None)
+		if index is not None:
+			index.save()
+		return self
+
+	def next_free(self):
+		# above every existing version, never one that is on disk
+		return self.latest + 1
+
+	def exists(self, number):
+		return number in self.entries
+
+	def menu_items(self):
+		"""(number, label) newest first: v12  1.24G  1001-1240"""
+		items = []
+		for number in reversed(self.numbers):
+			v = self.versions.get(number)
+			if v is None:
+				items.append((number, f"v{number}"))
+				continue
+			frames = "single frame" if v.mark_singleframe else f"{v.startfr}-{v.endfr}"
+			if v.mark_dirty:
+				frames = "no frames"
+			items.append((number, f"v{number}  {format_size(v.total_bytes)}  {frames}"))
+		return items
+
+
+def cache_index(cachedir):
+	if not cachedir:
+		return None
+	with _lock:
+		if cachedir not in _indexes:
+			_indexes[cachedir] = CacheIndex.for_cachedir(cachedir)
+		return _indexes[cachedir]
+
+
+def version_listing(root, filetype, cachedir=None, summaries=False, deep=False):
+	"""Listing of a cache main folder. summaries also inventories versions for the menu, using the cache
+	index of cachedir ($CacheDir) when given."""
+	root = root.replace('\\', '/').rstrip('/')
+	with _lock:
+		listing = _listings.get((root, filetype))
+		if listing is None:
+			listing = _listings[(root, filetype)] = VersionListing(root, filetype)
+	listing.refresh()
+	if summaries:
+		listing.summaries(cache_index(cachedir), deep)
+	return listing
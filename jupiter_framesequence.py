@@ -0,0 +1,134 @@
+import math
+import re
+from array import array
+from fractions import Fraction
+
+_truncated_ratio = 0.1  # frames smaller than this fraction of the median size count as truncated
+_max_missing = 1000000  # stop listing missing frames after this many
+_max_substeps = 16  # deltas snap to k/n for n up to this, .333 is a third not 333/1000
+_frame_re_cache = {}
+
+
+# Frame sequence analyzer for filecache version folders, files look like
+#     Cache_geo1_filecache1_v3.0006.bgeo.sc        (no substeps)
+#     Cache_geo1_filecache1_v3.0006.250.bgeo.sc    (substeps, fpadzero(4, 3, $FF))
+#     Cache_geo1_filecache1_v3.bgeo.sc             (single frame, not part of a sequence)
+# Files are fed one by one while the folder is scanned, frames are kept in array('d') not lists of str.
+def frame_re(filetype):
+	regex = _frame_re_cache.get(filetype)
+	if regex is None:
+		regex = re.compile(r'^(?P<name>.+?)\.(?P<frame>-?\d+)(?:\.(?P<sub>\d+))?' + re.escape(filetype) + '$')
+		_frame_re_cache[filetype] = regex
+	return regex
+
+
+def snap_delta(delta, tolerance):
+	"""Closest k/n with a small n, fpadzero rounds substep frames to the padding of the file name."""
+	d = Fraction(delta).limit_denominator(_max_substeps)
+	if abs(float(d) - delta) <= tolerance:
+		return d
+	return Fraction(delta).limit_denominator(1000)
+
+
+def fraction_gcd(a, b):
+	return Fraction(math.gcd(a.numerator * b.denominator, b.numerator * a.denominator),
+					a.denominator * b.denominator)
+
+
+class FrameSequence:
+	def __init__(self, filetype):
+		self.regex = frame_re(filetype)
+		self.frames = array('d')
+		self.sizes = array('q')
+		self.has_substep = 0
+		self.no_substep = 0
+		self.unmatched = 0
+		self.precision = 0  # most substep digits in a file name
+		# filled by analyze()
+		self.start = 0.0
+		self.end = 0.0
+		self.step = Fraction(1)
+		self.ranges = []  # contiguous (start, end) pairs
+		self.missing = array('d')
+		self.zero_byte = array('d')
+		self.truncated = array('d')
+
+	def add(self, filename, size):
+		m = self.regex.match(filename)
+		if m is None:
+			self.unmatched += 1
+			return 0
+		frame, sub = m.group('frame', 'sub')
+		if sub is None:
+			self.frames.append(float(frame))
+			self.no_substep = 1
+		else:
+			self.frames.append(float(f'{frame}.{sub}'))
+			self.has_substep = 1
+			if len(sub) > self.precision:
+				self.precision = len(sub)
+		self.sizes.append(size)
+		return 1
+
+	def __len__(self):
+		return len(self.frames)
+
+	@property
+	def inc(self):
+		return self.step.numerator
+
+	@property
+	def substep(self):
+		return self.step.denominator
+
+	@property
+	def tolerance(self):
+		# two frames each rounded to the file name padding, the delta is off by up to one last digit
+		return 10.0 ** -self.precision + 1e-9 if self.precision else 1e-6
+
+	def analyze(self):
+		if not self.frames:
+			return self
+		self.find_bad_files()
+		self.frames = array('d', sorted(set(self.frames)))
+		self.start = self.frames[0]
+		self.end = self.frames[-1]
+		# true step is the gcd across every delta, not the first two entries in scandir order
+		deltas = array('d', (b - a for a, b in zip(self.frames, self.frames[1:])))
+		step = None
+		tolerance = self.tolerance
+		for delta in set(deltas):
+			d = snap_delta(delta, tolerance)
+			step = d if step is None else fraction_gcd(step, d)
+		self.step = step or Fraction(1)
+		self.find_ranges(deltas)
+		return self
+
+	def find_ranges(self, deltas):
+		step = float(self.step)
+		self.ranges = []
+		self.missing = array('d')
+		range_start = self.frames[0]
+		for i, delta in enumerate(deltas):
+			steps = int(round(delta / step))
+			if steps > 1:
+				self.ranges.append((range_start, self.frames[i]))
+				range_start = self.frames[i + 1]
+				gap = min(steps, _max_missing - len(self.missing))
+				for k in range(1, gap):
+					self.missing.append(self.frames[i] + k * step)
+		self.ranges.append((range_start, self.frames[-1]))
+
+	def find_bad_files(self):
+		median = sorted(self.sizes)[len(self.sizes) // 2]
+		for frame, size in zip(self.frames, self.sizes):
+			if not size:
+				self.zero_byte.append(frame)
+			elif size < median * _truncated_ratio:
+				self.truncated.append(frame)
+
+	def format_ranges(self):
+		# 1-100, 102-240 style, substep ranges keep their decimals
+		def fmt(f):
+			return str(int(f)) if f.is_integer() else f'{f:g}'
+		return ', '.join(fmt(a) if a == b else f'{fmt(a)}-{fmt(b)}' for a, b in self.ranges)
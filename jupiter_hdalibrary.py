@@ -0,0 +1,159 @@
+"""Incremental install of the Jupiter HDA library.
+
+An index of every HDA file in <lib>/otls (size, mtime, content hash, node types and definition versions)
+is kept in $HOUDINI_USER_PREF_DIR/jupiter_hdaindex.json. A sync only installs files that are new,
+reloads files whose content changed and uninstalls files that are gone, without any message per file.
+A touched file with the same content hash is only updated in the index. While the otls folder mtime is
+unchanged (no file added, removed or renamed) the indexed files are only stat'ed, the folder is not listed,
+so the check is cheap enough for every scene load and still sees HDAs overwritten in place.
+"""
+import hashlib
+import json
+import os
+import time
+
+import hou
+
+from jupiter_libindex import scan_otls
+
+INDEX_NAME = 'jupiter_hdaindex.json'
+INDEX_VERSION = 2
+oplibraries = 'Scanned Asset Library Directories'
+
+
+def index_file():
+	return f"{hou.getenv('HOUDINI_USER_PREF_DIR')}/{INDEX_NAME}"
+
+
+def load_index(lib_path):
+	"""(files, otls folder mtime) of the last sync."""
+	try:
+		with open(index_file(), 'r') as f:
+			data = json.load(f)
+	except (OSError, ValueError):
+		return {}, None
+	if data.get("version") != INDEX_VERSION or data.get("lib_path") != lib_path:
+		# another library was installed before, everything counts as new
+		return {}, None
+	return data.get("files", {}), data.get("otls_mtime")
+
+
+def save_index(lib_path, files, otls_mtime):
+	path = index_file()
+	tmp = f'{path}.{os.getpid()}.tmp'
+	with open(tmp, 'w') as f:
+		json.dump({"version": INDEX_VERSION, "lib_path": lib_path, "otls_mtime": otls_mtime, "files": files},
+				  f, indent=1)
+	os.replace(tmp, path)
+
+
+def stat_files(paths):
+	"""{file path: (size, mtime)} of the indexed files, without listing the folder."""
+	files = {}
+	for path in paths:
+		try:
+			st = os.stat(path)
+		except OSError:
+			continue
+		files[path] = (st.st_size, st.st_mtime)
+	return files
+
+
+def content_hash(path):
+	h = hashlib.blake2b(digest_size=16)
+	with open(path, 'rb') as f:
+		for chunk in iter(lambda: f.read(1 << 20), b''):
+			h.update(chunk)
+	return h.hexdigest()
+
+
+def describe(path):
+	definitions = hou.hda.definitionsInFile(path)
+	return {f'{d.nodeTypeCategory().name()}/{d.nodeTypeName()}': d.version() for d in definitions}
+
+
+class SyncReport:
+	def __init__(self):
+		self.added = []
+		self.changed = []
+		self.removed = []
+		self.touched = 0  # mtime changed, same content
+		self.failed = []  # (path, error)
+		self.seconds = 0.0
+
+	def changes(self):
+		return len(self.added) + len(self.changed) + len(self.removed) + len(self.failed)
+
+	def summary(self):
+		lines = [f"{len(self.added)} added, {len(self.changed)} changed, {len(self.removed)} removed, "
+				 f"{self.touched} unchanged after touch, in {self.seconds:.2f}s"]
+		for path, error in self.failed:
+			lines.append(f"failed {path}: {error}")
+		return "\n".join(lines)
+
+
+def sync_library(lib_path):
+	"""Bring the installed HDAs of this session in line with <lib>/otls, touching only what differs."""
+	start = time.perf_counter()
+	lib_path = lib_path.replace('\\', '/').rstrip('/')
+	report = SyncReport()
+	index, otls_mtime = load_index(lib_path)
+	current_mtime = os.stat(f'{lib_path}/otls').st_mtime
+	if index and otls_mtime == current_mtime:
+		# same files as last time, only their size and mtime can differ
+		on_disk = stat_files(index)
+	else:
+		on_disk = scan_otls(lib_path)
+	installed = set(f.replace('\\', '/') for f in hou.hda.loadedFiles())
+	files = {}
+	for path, (size, mtime) in sorted(on_disk.items()):
+		entry = index.get(path)
+		try:
+			if entry is not None and entry["size"] == size and entry["mtime"] == mtime and path in installed:
+				files[path] = entry
+				continue
+			digest = content_hash(path)
+			if entry is not None and entry["hash"] == digest and path in installed:
+				report.touched += 1
+				files[path] = dict(entry, size=size, mtime=mtime)
+				continue
+			if path in installed:
+				hou.hda.reloadFile(path)
+				report.changed.append(path)
+			else:
+				hou.hda.installFile(path, oplibraries_file=oplibraries)
+				report.added.append(path)
+			files[path] = {"size": size, "mtime": mtime, "hash": digest, "types": describe(path)}
+		except (OSError, hou.OperationFailed) as e:
+			report.failed.append((path, str(e)))
+	for path in index:
+		if path not in on_disk:
+			try:
+				if path in installed:
+					hou.hda.uninstallFile(path, oplibraries_file=oplibraries)
+				report.removed.append(path)
+			except hou.OperationFailed as e:
+				report.failed.append((path, str(e)))
+	# a failed file is not indexed, list the folder again next time to retry it
+	saved_mtime = None if report.failed else current_mtime
+	if files != index or saved_mtime != otls_mtime:
+		save_index(lib_path, files, saved_mtime)
+	report.seconds = time.perf_counter() - start
+	return report
+
+
+def uninstall_library(lib_path):
+	"""Uninstall every indexed HDA file, falls back to <lib>/otls when there is no index."""
+	lib_path = lib_path.replace('\\', '/').rstrip('/')
+	paths = list(load_index(lib_path)[0]) or list(scan_otls(lib_path))
+	failed = []
+	for path in paths:
+		try:
+			hou.hda.uninstallFile(path, oplibraries_file=oplibraries)
+		except hou.OperationFailed as e:
+			failed.append((path, str(e)))
+	try:
+		os.remove(index_file())
+	except OSError:
+		pass
+	return failed
@@ -0,0 +1,136 @@
+"""Startup index of the Jupiter library, one file per category instead of directory scans.
+
+With the library on HOUDINI_PATH every launch lists otls/, toolbar/ and scripts/ on the share, and every
+script lookup walks the library too. The installer writes a local index instead:
+
+$HOUDINI_USER_PREF_DIR/jupiter_index/otls/OPlibraries           absolute paths of the library HDAs
+$HOUDINI_USER_PREF_DIR/jupiter_index/toolbar/jupiter.shelf      every library shelf merged into one file
+$HOUDINI_USER_PREF_DIR/jupiter_index/.stamp.json                library folder mtimes the index was built from
+
+and a package json with the index root as hpath, plus <lib>/scripts and <lib>/scripts/python. Houdini reads
+OPlibraries files from the otls/ folder of every HOUDINI_PATH entry (not from HOUDINI_OTLSCAN_PATH folders) and
+shelves from its toolbar/ folder, the otls/ scan of the index only finds the OPlibraries file.
+The library itself is not on HOUDINI_PATH any more, so anything else it holds (viewer_states, icons, the OCIO
+config, presets, OPcustomize, menus) is not found: opt in per user with JUPITER_LIB_INDEX=1, the installer writes
+the hpath package from JSON_TEMPLATE otherwise. Edits to the merged shelf are overwritten by the next build,
+change the shelves in the library instead.
+"""
+import json
+import os
+import xml.etree.ElementTree as ET
+
+INDEX_FOLDER = 'jupiter_index'
+STAMP_VERSION = 1
+hda_extensions = ('.hda', '.otl', '.hdanc', '.hdalc', '.otlnc', '.otllc')
+merged_shelf = 'jupiter.shelf'
+_categories = ('otls', 'toolbar')
+
+
+def index_dir(userpref_path):
+	return f"{userpref_path.replace(chr(92), '/').rstrip('/')}/{INDEX_FOLDER}"
+
+
+def scan_otls(lib_path):
+	"""{file path: (size, mtime)} of every HDA file directly in <lib>/otls, one scandir."""
+	files = {}
+	otls = f'{lib_path}/otls'
+	for entry in os.scandir(otls):
+		if entry.is_file() and entry.name.lower().endswith(hda_extensions):
+			st = entry.stat()
+			files[f'{otls}/{entry.name}'] = (st.st_size, st.st_mtime)
+	return files
+
+
+def folder_mtimes(lib_path):
+	# adding, removing or renaming a file changes the folder mtime, two stats tell if the index is stale
+	mtimes = {}
+	for category in _categories:
+		try:
+			mtimes[category] = os.stat(f'{lib_path}/{category}').st_mtime
+		except OSError:
+			mtimes[category] = None
+	return mtimes
+
+
+def read_stamp(index):
+	try:
+		with open(f'{index}/.stamp.json', 'r') as f:
+			return json.load(f)
+	except (OSError, ValueError):
+		return {}
+
+
+def write_atomic(path, text):
+	tmp = f'{path}.{os.getpid()}.tmp'
+	with open(tmp, 'w', encoding='utf-8') as f:
+		f.write(text)
+	os.replace(tmp, path)
+
+
+def index_stale(lib_path, userpref_path):
+	lib_path = lib_path.replace('\\', '/').rstrip('/')
+	stamp = read_stamp(index_dir(userpref_path))
+	return (stamp.get("version") != STAMP_VERSION or stamp.get("lib_path") != lib_path
+			or stamp.get("mtimes") != folder_mtimes(lib_path))
+
+
+def write_oplibraries(lib_path, index):
+	os.makedirs(f'{index}/otls', exist_ok=True)
+	# generated from <lib>/otls on every build, do not edit
+	lines = sorted(scan_otls(lib_path))
+	write_atomic(f'{index}/otls/OPlibraries', '\n'.join(lines) + '\n')
+	return len(lines)
+
+
+def merge_shelves(lib_path, index):
+	"""Every <lib>/toolbar/*.shelf in one shelfDocument, later files win for duplicate tool names."""
+	os.makedirs(f'{index}/toolbar', exist_ok=True)
+	root = ET.Element('shelfDocument')
+	seen = {}
+	toolbar = f'{lib_path}/toolbar'
+	try:
+		names = sorted(e.name for e in os.scandir(toolbar) if e.is_file() and e.name.endswith('.shelf'))
+	except OSError:
+		names = []
+	for name in names:
+		try:
+			document = ET.parse(f'{toolbar}/{name}').getroot()
+		except (OSError, ET.ParseError) as e:
+			print(f'Skipped shelf {name}: {e}')
+			continue
+		for child in document:
+			key = (child.tag, child.get('name'))
+			if key[1] is not None and key in seen:
+				root.remove(seen[key])
+			seen[key] = child
+			root.append(child)
+	text = '<?xml version="1.0" encoding="UTF-8"?>\n' + ET.tostring(root, encoding='unicode')
+	write_atomic(f'{index}/toolbar/{merged_shelf}', text)
+	return len(names)
+
+
+def build_index(lib_path, userpref_path):
+	"""Write the OPlibraries file, the merged shelf and the stamp. Returns (hda files, shelf files)."""
+	lib_path = lib_path.replace('\\', '/').rstrip('/')
+	index = index_dir(userpref_path)
+	mtimes = folder_mtimes(lib_path)
+	hdas = write_oplibraries(lib_path, index)
+	shelves = merge_shelves(lib_path, index)
+	stamp = {"version": STAMP_VERSION, "lib_path": lib_path, "mtimes": mtimes}
+	write_atomic(f'{index}/.stamp.json', json.dumps(stamp, indent=1))
+	return hdas, shelves
+
+
+def package_json(lib_path, userpref_path):
+	"""Package contents putting the index on HOUDINI_PATH instead of the library."""
+	lib_path = lib_path.replace('\\', '/').rstrip('/')
+	index = index_dir(userpref_path)
+	package = {
+		"hpath": index,
+		"env": [
+			{"JUPITER_LIB": lib_path},
+			{"HOUDINI_SCRIPT_PATH": f"{lib_path}/scripts;&"},
+			{"PYTHONPATH": {"value": f"{lib_path}/scripts/python", "method": "prepend"}},
+		]
+	}
+	return json.dumps(package, indent=4) + '\n'
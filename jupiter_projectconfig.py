@@ -0,0 +1,104 @@
+import functools
+import json
+import os
+import threading
+
+CONFIG_NAME = '.jupiter_project.json'
+CONFIG_VERSION = 1
+default_cachefolder = '88_Cache'
+_memo = {}  # job -> (config file mtime, config dict)
+_lock = threading.Lock()
+
+
+# Project layout resolved once and kept at the job root, shared by the Jupiter HDAs and the filecache scripts:
+# A:/Projects/3d/Houdini_essential/vellum_meat/.jupiter_project.json
+#     {"job": ".../vellum_meat", "cachedir": ".../vellum_meat/88_Cache", "workflow": "03_Workflow",
+#      "basedir_template": "{cachedir}/{subpath}"}
+# Opening a shot reads this file once per session (again only when its mtime changes) and checks that the
+# cache folder still exists, instead of listing the project root on the file server.
+@functools.lru_cache(maxsize=64)
+def job_from_hip(hip):
+	"""A:/.../Tiktok_mini/03_Workflow/Shots/... -> (A:/.../Tiktok_mini, 03_Workflow), ValueError outside a project."""
+	parts = hip.replace('\\', '/').split('/')
+	for i, part in enumerate(parts):
+		if 'Workflow' in part:
+			return '/'.join(parts[:i]), part
+	raise ValueError(f'no *Workflow* folder in {hip}')
+
+
+def config_path(job):
+	return f'{job.replace(chr(92), "/").rstrip("/")}/{CONFIG_NAME}'
+
+
+def load_config(job):
+	path = config_path(job)
+	try:
+		mtime = os.stat(path).st_mtime
+	except OSError:
+		return None
+	with _lock:
+		cached = _memo.get(job)
+	if cached is not None and cached[0] == mtime:
+		return cached[1]
+	try:
+		with open(path, 'r') as f:
+			config = json.load(f)
+	except (OSError, ValueError):
+		return None
+	if config.get("version") != CONFIG_VERSION:
+		return None
+	with _lock:
+		_memo[job] = (mtime, config)
+	return config
+
+
+def save_config(job, config):
+	path = config_path(job)
+	config = dict(config, version=CONFIG_VERSION)
+	try:
+		with open(path, 'w') as f:
+			json.dump(config, f, indent=2)
+		mtime = os.stat(path).st_mtime
+	except OSError as e:
+		# read only project root, keep it for this session
+		print(f'Could not write project config {path}: {e}')
+		mtime = None
+	with _lock:
+		_memo[job] = (mtime, config)
+	return config
+
+
+def find_cachedir(job):
+	"""The *Cache* folder at the job root, created as 88_Cache when there is none. Lists the project root."""
+	job = job.replace('\\', '/').rstrip('/')
+	folders = sorted(name for name in os.listdir(job) if 'Cache' in name and os.path.isdir(f'{job}/{name}'))
+	if folders:
+		return f'{job}/{folders[0]}'
+	cachedir = f'{job}/{default_cachefolder}'
+	os.makedirs(cachedir, exist_ok=True)
+	return cachedir
+
+
+def resolve_project(job, workflow=None):
+	"""Config of the project at job, resolved and written the first time only."""
+	job = job.replace('\\', '/').rstrip('/')
+	with _lock:
+		cached = _memo.get(job)
+	config = cached[1] if cached is not None and cached[0] is None else load_config(job)
+	if config is not None and os.path.isdir(config.get("cachedir", "")):
+		if workflow and config.get("workflow") != workflow:
+			config = save_config(job, dict(config, workflow=workflow))
+		return config
+	# first shot opened in this project, or the cache folder moved
+	previous = config or {}
+	return save_config(job, {
+		"job": job,
+		"cachedir": find_cachedir(job),
+		"workflow": workflow or previous.get("workflow", ""),
+		"basedir_template": previous.get("basedir_template", ""),
+	})
+
+
+def project_for_hip(hip):
+	job, workflow = job_from_hip(hip)
+	return resolve_project(job, workflow)